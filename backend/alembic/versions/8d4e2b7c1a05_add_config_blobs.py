@@ -0,0 +1,49 @@
+"""Add config_blobs and task_config_refs tables
+
+Revision ID: 8d4e2b7c1a05
+Revises: 3c1f8a2d9b47
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d4e2b7c1a05'
+down_revision: Union[str, None] = '3c1f8a2d9b47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'config_blobs',
+        sa.Column('id', sa.String(64), nullable=False),
+        sa.Column('storage', sa.String(10), nullable=False),
+        sa.Column('object_key', sa.String(500), nullable=False),
+        sa.Column('url', sa.String(500), nullable=False),
+        sa.Column('filename', sa.String(255), nullable=True),
+        sa.Column('size', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('url')
+    )
+    op.create_table(
+        'task_config_refs',
+        sa.Column('task_id', sa.String(36), nullable=False),
+        sa.Column('blob_id', sa.String(64), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['task_id'], ['tasks.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['blob_id'], ['config_blobs.id']),
+        sa.PrimaryKeyConstraint('task_id')
+    )
+    op.create_index(op.f('ix_task_config_refs_blob_id'), 'task_config_refs', ['blob_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_task_config_refs_blob_id'), table_name='task_config_refs')
+    op.drop_table('task_config_refs')
+    op.drop_table('config_blobs')
@@ -9,6 +9,7 @@ from app.api.v1.dashboard import router as dashboard_router
 from app.api.v1.webhook import router as webhook_router
 from app.api.v1.sse import router as sse_router
 from app.api.v1.resources import router as resources_router
+from app.api.v1.admin import router as admin_router
 
 router = APIRouter(prefix="/api/v1")
 
@@ -19,3 +20,4 @@ router.include_router(dashboard_router)
 router.include_router(webhook_router)
 router.include_router(sse_router)
 router.include_router(resources_router)
+router.include_router(admin_router)
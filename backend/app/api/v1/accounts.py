@@ -2,20 +2,31 @@
 Account API endpoints
 """
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import get_settings
 from app.core.database import get_db
+from app.services.import_service import ImportService
 from app.services.account_service import AccountService
 from app.schemas.account import (
     AccountCreate,
     AccountUpdate,
     AccountResponse,
     AccountListResponse,
+    AccountBatchCreate,
+    AccountBatchUpdate,
+    AccountBatchCreateResponse,
+)
+from app.schemas.common import (
+    MessageResponse,
+    BatchDeleteRequest,
+    BatchOperationResponse,
+    ImportResult,
 )
-from app.schemas.common import MessageResponse
 
 router = APIRouter(prefix="/accounts", tags=["Accounts"])
+settings = get_settings()
 
 
 @router.get("", response_model=AccountListResponse)
@@ -25,6 +36,7 @@ async def list_accounts(
     search: Optional[str] = Query(default=None, description="Search keyword"),
     status: Optional[str] = Query(default=None, description="Filter by status"),
     host_ip: Optional[str] = Query(default=None, description="Filter by host IP"),
+    exact_count: bool = Query(default=True, description="Exact total; false stops counting at LIST_COUNT_CAP"),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -37,10 +49,69 @@ async def list_accounts(
         search=search,
         status=status,
         host_ip=host_ip,
+        count_cap=None if exact_count else settings.LIST_COUNT_CAP,
     )
     return AccountListResponse(**result)
 
 
+@router.post("/batch", response_model=AccountBatchCreateResponse, status_code=201)
+async def batch_create_accounts(
+    batch_in: AccountBatchCreate,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Create many accounts in one transaction
+
+    All-or-nothing: any duplicate task_control rejects the whole batch (409).
+    """
+    service = AccountService(db)
+    accounts = await service.bulk_create_accounts(batch_in.items)
+    return AccountBatchCreateResponse(total=len(accounts), items=accounts)
+
+
+@router.put("/batch", response_model=BatchOperationResponse)
+async def batch_update_accounts(
+    batch_in: AccountBatchUpdate,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Update many accounts by ID in one transaction
+    """
+    service = AccountService(db)
+    result = await service.bulk_update_accounts(batch_in.items)
+    return BatchOperationResponse(message="Accounts updated successfully", **result)
+
+
+@router.post("/batch/delete", response_model=BatchOperationResponse)
+async def batch_delete_accounts(
+    batch_in: BatchDeleteRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Delete many accounts by ID in one transaction
+    """
+    service = AccountService(db)
+    result = await service.bulk_delete_accounts(batch_in.ids)
+    return BatchOperationResponse(message="Accounts deleted successfully", **result)
+
+
+@router.post("/import", response_model=ImportResult)
+async def import_accounts(
+    file: UploadFile = File(..., description="CSV or XLSX file, first row is the header"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Import accounts from a CSV / XLSX spreadsheet
+
+    Rows are parsed in chunks, validated with AccountCreate and upserted on
+    task_control, one transaction per chunk. Headers may use field names or
+    the Chinese column names (e.g. 影刀账号). Returns a per-row error report.
+    """
+    service = ImportService(db)
+    result = await service.import_accounts(file.file, file.filename)
+    return ImportResult(**result)
+
+
 @router.get("/{account_id}", response_model=AccountResponse)
 async def get_account(
     account_id: str,
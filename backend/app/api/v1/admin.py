@@ -0,0 +1,85 @@
+"""
+Admin diagnostics API endpoints (require X-Admin-Token)
+"""
+import threading
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from app.core import query_stats
+from app.core.profiler import ProfilerError, get_loop_monitor, get_profiler
+from app.core.security import require_admin
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/query-stats")
+async def get_query_stats(
+    reset: bool = Query(False, description="返回后清空累计数据"),
+):
+    """
+    SQL 查询的按路由累计统计（请求数、查询数、数据库耗时、慢查询数）
+
+    queries_per_request 明显偏高的路由通常存在 N+1 查询。
+    """
+    routes = query_stats.route_stats()
+    if reset:
+        query_stats.reset_route_stats()
+    return {"routes": routes}
+
+
+# ==================== 性能分析 ====================
+
+
+@router.get("/profiler")
+async def get_profiler_status():
+    """
+    采样分析器状态（运行中时返回已采样数，否则返回上一次的结果）
+    """
+    return get_profiler().status()
+
+
+@router.post("/profiler/start")
+async def start_profiler(
+    interval_ms: float = Query(5, ge=1, le=100, description="采样间隔（毫秒）"),
+    max_seconds: int = Query(60, ge=1, le=600, description="最长采样时长（秒），到时自动停止采样"),
+):
+    """
+    开始对事件循环线程采样
+
+    采样在后台线程中进行，对请求处理几乎没有影响；调用 /profiler/stop 写出结果。
+    """
+    try:
+        # 请求在事件循环线程中处理，当前线程即采样目标
+        get_profiler().start(threading.get_ident(), interval_ms / 1000, max_seconds)
+    except ProfilerError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"code": "PROFILER_RUNNING", "message": str(e)},
+        )
+    return get_profiler().status()
+
+
+@router.post("/profiler/stop")
+async def stop_profiler():
+    """
+    停止采样并保存火焰图数据（folded 格式，可用 speedscope / flamegraph.pl 打开）
+    """
+    try:
+        result = get_profiler().stop()
+    except ProfilerError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"code": "PROFILER_NOT_RUNNING", "message": str(e)},
+        )
+    return {**result, "url": f"/static/profiles/{result['file']}"}
+
+
+@router.get("/loop-lag")
+async def get_loop_lag():
+    """
+    事件循环延迟与最近的阻塞记录（含阻塞时事件循环线程的调用栈）
+    """
+    monitor = get_loop_monitor()
+    if monitor is None:
+        return {"running": False}
+    return monitor.status()
@@ -8,6 +8,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 import csv
 import io
 
+from app.core.config import get_settings
 from app.core.database import get_db
 from app.services.execution_log_service import ExecutionLogService
 from app.schemas.execution_log import (
@@ -17,6 +18,7 @@ from app.schemas.execution_log import (
 from app.schemas.common import LogStatus
 
 router = APIRouter(prefix="/logs", tags=["Execution Logs"])
+settings = get_settings()
 
 
 @router.get("", response_model=ExecutionLogListResponse)
@@ -32,6 +34,7 @@ async def list_logs(
     end_date: Optional[datetime] = Query(default=None, description="End date filter"),
     sort_by: Optional[str] = Query(default="start_time", description="Sort field: start_time, created_at, duration"),
     order: Optional[str] = Query(default="desc", description="Sort order: asc, desc"),
+    exact_count: bool = Query(default=True, description="Exact total; false stops counting at LIST_COUNT_CAP"),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -50,6 +53,7 @@ async def list_logs(
         end_date=end_date,
         sort_by=sort_by,
         order=order,
+        count_cap=None if exact_count else settings.LIST_COUNT_CAP,
     )
     return ExecutionLogListResponse(**result)
 
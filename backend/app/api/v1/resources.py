@@ -3,45 +3,181 @@
 用于代理请求外部资源（如 OSS 文件），解决浏览器 CORS 问题
 同时提供 HTTP 缓存支持，减少 OSS 请求流量
 """
+import os
+import tempfile
+import uuid
+from pathlib import Path
+from typing import Dict, Optional
+
+import anyio
 import httpx
-from fastapi import APIRouter, Query, Response
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
 from pydantic import HttpUrl
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+
+from app.core.database import STATIC_DIR
+from app.core.http_client import get_http_client
+from app.core.static_files import schedule_precompress
+from app.services.proxy_cache import CacheEntry, ProxyCache, UpstreamResponse, get_proxy_cache
+from app.services.storage_service import (
+    LOCAL_UPLOAD_DIR,
+    is_artifact_key,
+    verify_local_upload,
+)
+from app.services.thumbnail_service import THUMBNAIL_SIZES, get_thumbnail_service
+from app.utils.file_range import (
+    RangeNotSatisfiable,
+    parse_range_header,
+    read_range,
+    read_tail,
+)
 
 # 缓存时间：15 天
 CACHE_DURATION_SECONDS = 15 * 24 * 60 * 60
 
+# 流式转发的块大小（单个下载的内存占用上限约为此值）
+PROXY_CHUNK_SIZE = 64 * 1024
+
+# 透传给上游的请求头（Range / 条件请求）
+PASSTHROUGH_REQUEST_HEADERS = ("range", "if-range", "if-none-match", "if-modified-since")
+
+# 从上游原样转发的响应头
+PASSTHROUGH_RESPONSE_HEADERS = (
+    "content-length",
+    "content-range",
+    "content-encoding",
+    "accept-ranges",
+    "etag",
+    "last-modified",
+)
+
+# 日志查看：默认 / 单次最大返回字节数
+LOG_VIEW_DEFAULT_LENGTH = 64 * 1024
+LOG_VIEW_MAX_LENGTH = 1024 * 1024
+
+# 本地上传文件目录（与 main.py 中挂载的 /static 一致）
+STATIC_ROOT = STATIC_DIR
+
 router = APIRouter(prefix="/resources", tags=["Resources"])
 
 
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in (tag.removeprefix("W/") for tag in candidates)
+
+
+def _cached_response(
+    entry: CacheEntry,
+    request: Request,
+    headers: Dict[str, str],
+) -> Response:
+    """Serve a cache hit from disk, answering 304 when the browser copy is current"""
+    validators = {}
+    if entry.etag:
+        validators["ETag"] = entry.etag
+    if entry.last_modified:
+        validators["Last-Modified"] = entry.last_modified
+
+    if entry.etag and _etag_matches(request.headers.get("if-none-match"), entry.etag):
+        return Response(status_code=304, headers={**validators, **headers})
+
+    return FileResponse(
+        get_proxy_cache().blob_path(entry),
+        media_type=entry.content_type,
+        headers={**validators, **headers},
+    )
+
+
+def _forwarded_request_headers(request: Request) -> Dict[str, str]:
+    """Range / conditional headers from the browser, passed to the upstream"""
+    return {
+        name: request.headers[name]
+        for name in PASSTHROUGH_REQUEST_HEADERS
+        if name in request.headers
+    }
+
+
+def _stream_upstream(
+    upstream: UpstreamResponse,
+    default_media_type: str,
+    headers: Dict[str, str],
+) -> StreamingResponse:
+    """Relay the upstream body chunk by chunk, closing it when done"""
+    response = upstream.response
+    forwarded = {
+        name: response.headers[name]
+        for name in PASSTHROUGH_RESPONSE_HEADERS
+        if name in response.headers
+    }
+    return StreamingResponse(
+        upstream.body,
+        status_code=response.status_code,
+        media_type=response.headers.get("content-type", default_media_type),
+        headers={**forwarded, **headers},
+        # 客户端断开时同样执行：关闭上游连接并结束缓存写入
+        background=BackgroundTask(upstream.aclose),
+    )
+
+
 @router.get("/proxy")
-async def proxy_resource(url: str = Query(..., description="要代理的资源 URL")):
+async def proxy_resource(
+    request: Request,
+    url: str = Query(..., description="要代理的资源 URL（size 模式下也可以是 /static/... 本地路径）"),
+    size: Optional[str] = Query(
+        None,
+        pattern=f"^({'|'.join(THUMBNAIL_SIZES)})$",
+        description="返回缩略图: thumb(160px) / small(480px) / medium(1280px)",
+    ),
+):
     """
     代理请求外部资源，解决 CORS 问题
 
     用于前端直接请求 OSS 等外部资源时，绕过浏览器的 CORS 限制。
     后端没有 CORS 限制，可以自由请求外部资源。
+    响应按块流式转发，支持 Range 请求（206）。
+
+    命中本地磁盘缓存时直接从磁盘返回（见 app/services/proxy_cache.py）。
+
+    指定 size 时返回图片的缩略图（WebP，浏览器支持时为 AVIF），
+    见 app/services/thumbnail_service.py；非图片或无法生成时返回原文件。
 
     使用示例:
         GET /api/v1/resources/proxy?url=https://example.com/file.txt
+        GET /api/v1/resources/proxy?url=/static/uploads/screenshots/a.png&size=thumb
     """
+    headers = {
+        # 允许跨域访问
+        "Access-Control-Allow-Origin": "*",
+        # HTTP 缓存 15 天
+        "Cache-Control": f"public, max-age={CACHE_DURATION_SECONDS}",
+        "Content-Disposition": "inline",
+    }
+
     try:
-        # trust_env=False 禁用系统代理设置，避免 SOCKS 代理问题
-        async with httpx.AsyncClient(follow_redirects=True, trust_env=False) as client:
-            response = await client.get(
-                url,
-                timeout=30.0,  # 30秒超时
-            )
-            return Response(
-                content=response.content,
-                media_type=response.headers.get("content-type", "text/plain; charset=utf-8"),
-                headers={
-                    # 允许跨域访问
-                    "Access-Control-Allow-Origin": "*",
-                    # HTTP 缓存 15 天
-                    "Cache-Control": f"public, max-age={CACHE_DURATION_SECONDS}",
-                    "Content-Disposition": "inline",
-                },
-            )
+        if size:
+            thumbnails = get_thumbnail_service()
+            fmt = thumbnails.negotiate_format(request.headers.get("accept"))
+            path = await thumbnails.get(url, size, fmt)
+            if path:
+                return FileResponse(
+                    path,
+                    media_type=f"image/{fmt}",
+                    headers={**headers, "Vary": "Accept"},
+                )
+            local_path = _local_static_path(url)
+            if local_path:
+                return FileResponse(local_path, headers=headers)
+
+        # 未命中时边转发边写入缓存；不可缓存（非 200、大小未知或超过单文件上限、
+        # 缓存关闭）时直接流式转发
+        result = await get_proxy_cache().fetch(url, _forwarded_request_headers(request))
+        if isinstance(result, CacheEntry):
+            return _cached_response(result, request, headers)
     except httpx.RequestError as e:
         return Response(
             content=f"请求失败: {str(e)}",
@@ -55,9 +191,12 @@ async def proxy_resource(url: str = Query(..., description="要代理的资源 U
             media_type="text/plain; charset=utf-8",
         )
 
+    return _stream_upstream(result, "text/plain; charset=utf-8", headers)
+
 
 @router.get("/proxy/download")
 async def proxy_download(
+    request: Request,
     url: str = Query(..., description="要下载的资源 URL"),
     filename: str = Query(default="download.txt", description="下载文件名"),
 ):
@@ -65,24 +204,23 @@ async def proxy_download(
     代理下载外部资源，强制触发下载
 
     用于需要直接下载而不是预览的场景（如截图、日志文件下载）。
-    下载请求不缓存，确保获取最新版本。
+    下载请求不使用浏览器缓存；本地磁盘缓存每次都向上游做条件请求，
+    确保获取最新版本；支持 Range 断点续传。
     """
+    headers = {
+        "Access-Control-Allow-Origin": "*",
+        # 下载不缓存，确保每次获取最新版本
+        "Cache-Control": "no-store, must-revalidate",
+        "Content-Disposition": f'attachment; filename="{filename}"',
+    }
+
     try:
-        # trust_env=False 禁用系统代理设置，避免 SOCKS 代理问题
-        async with httpx.AsyncClient(follow_redirects=True, trust_env=False) as client:
-            response = await client.get(
-                url,
-                timeout=30.0,
-            )
-            return Response(
-                content=response.content,
-                media_type=response.headers.get("content-type", "application/octet-stream"),
-                headers={
-                    "Access-Control-Allow-Origin": "*",
-                    # 下载不缓存，确保每次获取最新版本
-                    "Cache-Control": "no-store, must-revalidate",
-                    "Content-Disposition": f'attachment; filename="{filename}"',
-                },
+        result = await get_proxy_cache().fetch(url, _forwarded_request_headers(request), max_age=0)
+        if isinstance(result, CacheEntry):
+            return FileResponse(
+                get_proxy_cache().blob_path(result),
+                media_type=result.content_type,
+                headers=headers,
             )
     except httpx.RequestError as e:
         return Response(
@@ -91,6 +229,241 @@ async def proxy_download(
             media_type="text/plain; charset=utf-8",
         )
 
+    return _stream_upstream(result, "application/octet-stream", headers)
+
+
+# ==================== 日志查看 ====================
+
+
+def _local_static_path(path: str) -> Optional[Path]:
+    """Map a /static/... URL path to a file under the static directory"""
+    if not path.startswith("/static/"):
+        return None
+    root = STATIC_ROOT.resolve()
+    file_path = (root / path[len("/static/"):]).resolve()
+    if not file_path.is_relative_to(root) or not file_path.is_file():
+        return None
+    return file_path
+
+
+async def _read_log_slice(
+    file_path: Path,
+    range_header: Optional[str],
+    tail: Optional[int],
+    offset: Optional[int],
+    length: int,
+) -> Response:
+    """Return the requested byte slice of a local file (mmap backed)"""
+    size = file_path.stat().st_size
+    start, end = 0, size
+
+    try:
+        if range_header:
+            byte_range = parse_range_header(range_header, size)
+            if byte_range:
+                start, end = byte_range
+                end = min(end, start + LOG_VIEW_MAX_LENGTH)
+                data = await run_in_threadpool(read_range, file_path, start, end)
+            else:
+                data = await run_in_threadpool(read_range, file_path, 0, min(size, LOG_VIEW_MAX_LENGTH))
+                end = len(data)
+        elif offset is not None:
+            if offset >= size and size > 0:
+                raise RangeNotSatisfiable(str(offset))
+            start, end = offset, min(offset + length, size)
+            data = await run_in_threadpool(read_range, file_path, start, end)
+        else:
+            start, data = await run_in_threadpool(read_tail, file_path, size, tail or length)
+            end = size
+    except RangeNotSatisfiable:
+        return Response(status_code=416, headers={"Content-Range": f"bytes */{size}"})
+
+    headers = {
+        "Access-Control-Allow-Origin": "*",
+        "Access-Control-Expose-Headers": "Content-Range, Accept-Ranges",
+        "Accept-Ranges": "bytes",
+        "Cache-Control": "no-cache",
+    }
+    partial = start > 0 or end < size
+    if partial:
+        headers["Content-Range"] = f"bytes {start}-{end - 1}/{size}"
+    return Response(
+        content=data,
+        status_code=206 if partial else 200,
+        media_type="text/plain; charset=utf-8",
+        headers=headers,
+    )
+
+
+async def _slice_full_body(
+    cache: ProxyCache,
+    url: str,
+    upstream: UpstreamResponse,
+    range_header: Optional[str],
+    tail: Optional[int],
+    offset: Optional[int],
+    length: int,
+) -> Response:
+    """Read a complete upstream log (into the cache, or a temp file) and slice it"""
+    try:
+        if upstream.filling:
+            async for _ in upstream.body:
+                pass
+        else:
+            # 无法缓存（大小未知或过大）：写入临时文件，切片后删除
+            fd, name = tempfile.mkstemp(prefix="rpa-log-")
+            os.close(fd)
+            spool_path = Path(name)
+            try:
+                async with await anyio.open_file(spool_path, "wb") as f:
+                    async for chunk in upstream.response.aiter_bytes(PROXY_CHUNK_SIZE):
+                        await f.write(chunk)
+                return await _read_log_slice(spool_path, range_header, tail, offset, length)
+            finally:
+                await anyio.to_thread.run_sync(spool_path.unlink)
+    finally:
+        await upstream.aclose()
+
+    entry = await cache.fetch(url)
+    if not isinstance(entry, CacheEntry):
+        # 缓存项刚写入即被淘汰的极端情况：直接转发
+        return _stream_upstream(entry, "text/plain; charset=utf-8", {"Cache-Control": "no-cache"})
+    return await _read_log_slice(cache.blob_path(entry), range_header, tail, offset, length)
+
+
+@router.get("/log")
+async def view_log(
+    request: Request,
+    url: str = Query(..., description="日志 URL（云端 URL 或 /static/... 本地路径）"),
+    tail: Optional[int] = Query(None, ge=1, le=LOG_VIEW_MAX_LENGTH, description="返回最后 N 个字节（从整行开始）"),
+    offset: Optional[int] = Query(None, ge=0, description="起始字节偏移"),
+    length: int = Query(LOG_VIEW_DEFAULT_LENGTH, ge=1, le=LOG_VIEW_MAX_LENGTH, description="读取字节数"),
+):
+    """
+    分段查看执行日志（大文件无需完整下载）
+
+    - 默认返回最后 length 字节（tail 模式，从完整的一行开始）
+    - offset + length: 返回指定区间，用于向前翻页
+    - 也支持标准 HTTP Range 请求头
+
+    部分内容返回 206，Content-Range 中包含实际区间和文件总大小。
+    云端日志命中本地磁盘缓存时按区间读取；未命中时向上游发送 Range 请求，
+    同时在后台把完整日志下载进缓存，供后续翻页使用。上游不支持 Range
+    （返回 200 完整内容）时读取完整内容后再按区间返回。
+
+    使用示例:
+        GET /api/v1/resources/log?url=https://.../log.txt&tail=65536
+        GET /api/v1/resources/log?url=https://.../log.txt&offset=0&length=65536
+    """
+    range_header = request.headers.get("range")
+
+    file_path = _local_static_path(url)
+    if file_path:
+        return await _read_log_slice(file_path, range_header, tail, offset, length)
+
+    if not url.startswith(("http://", "https://")):
+        raise HTTPException(
+            status_code=404,
+            detail={"code": "NOT_FOUND", "message": f"日志文件不存在: {url}"},
+        )
+
+    # 无本地副本时把区间请求交给上游（OSS 支持 Range）
+    upstream_range = range_header
+    if not upstream_range:
+        if offset is not None:
+            upstream_range = f"bytes={offset}-{offset + length - 1}"
+        else:
+            upstream_range = f"bytes=-{tail or length}"
+
+    try:
+        cache = get_proxy_cache()
+        result = await cache.fetch(url, {"range": upstream_range})
+        if isinstance(result, CacheEntry):
+            return await _read_log_slice(
+                cache.blob_path(result), range_header, tail, offset, length
+            )
+        if result.response.status_code == 206:
+            # 同一日志通常会继续翻页：后台下载完整文件，之后的请求从磁盘读取
+            cache.prefetch(url)
+        elif result.response.status_code == 200:
+            # 上游忽略了 Range，返回的是完整日志：保存后按区间读取
+            return await _slice_full_body(cache, url, result, range_header, tail, offset, length)
+    except httpx.RequestError as e:
+        return Response(
+            content=f"请求失败: {str(e)}",
+            status_code=500,
+            media_type="text/plain; charset=utf-8",
+        )
+
+    return _stream_upstream(
+        result,
+        "text/plain; charset=utf-8",
+        {
+            "Access-Control-Allow-Origin": "*",
+            "Access-Control-Expose-Headers": "Content-Range, Accept-Ranges",
+            "Cache-Control": "no-cache",
+        },
+    )
+
+
+# ==================== 本地签名上传（OSS 直传的本地替身） ====================
+
+
+@router.put("/objects/{object_key:path}")
+async def put_object(
+    object_key: str,
+    request: Request,
+    expires: int = Query(..., description="过期时间（Unix 时间戳）"),
+    signature: str = Query(..., description="签名"),
+):
+    """
+    接收预签名 URL 的 PUT 上传（未配置 OSS 时使用）
+
+    URL 由 /webhook/upload-urls 签发，行为与 OSS 预签名 PUT 一致：
+    签名覆盖对象 key 和过期时间，请求体即文件内容，写入
+    /static/uploads/{object_key}。配置 OSS 后机器人直接上传到 OSS，不经过此接口。
+    """
+    if not is_artifact_key(object_key) or not verify_local_upload(object_key, expires, signature):
+        raise HTTPException(
+            status_code=403,
+            detail={"code": "SIGNATURE_INVALID", "message": "上传签名无效或已过期"},
+        )
+
+    content_length = request.headers.get("content-length")
+    if content_length is not None and not content_length.isdigit():
+        raise HTTPException(
+            status_code=400,
+            detail={"code": "INVALID_CONTENT_LENGTH", "message": f"Content-Length 无效: {content_length[:32]}"},
+        )
+    if content_length and int(content_length) > settings.LOCAL_UPLOAD_MAX_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail={"code": "FILE_TOO_LARGE", "message": "文件超过大小上限"},
+        )
+
+    dest = STATIC_ROOT / LOCAL_UPLOAD_DIR / object_key
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = dest.with_name(f".{uuid.uuid4().hex}.tmp")
+
+    size = 0
+    try:
+        async with await anyio.open_file(tmp_path, "wb") as f:
+            async for chunk in request.stream():
+                size += len(chunk)
+                if size > settings.LOCAL_UPLOAD_MAX_BYTES:
+                    raise HTTPException(
+                        status_code=413,
+                        detail={"code": "FILE_TOO_LARGE", "message": "文件超过大小上限"},
+                    )
+                await f.write(chunk)
+        os.replace(tmp_path, dest)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+    # 日志等文本文件在后台生成 .br/.gz，供 /static 直接返回压缩版本
+    schedule_precompress(dest)
+    return Response(status_code=200)
+
 
 # ==================== 内网穿透代理 ====================
 
@@ -126,19 +499,18 @@ async def proxy_intranet(
     }
 
     try:
-        # trust_env=False 禁用系统代理设置
-        async with httpx.AsyncClient(follow_redirects=True, trust_env=False) as client:
-            response = await client.get(
-                intranet_base_url,
-                params=params,
-                timeout=10.0,  # 10秒超时
-            )
-            return {
-                "success": True,
-                "message": "控制请求已发送",
-                "url": f"{intranet_base_url}?{httpx.URL(params=params).query.decode()}",
-                "response_status": response.status_code,
-            }
+        # 共享连接池（trust_env=False，禁用系统代理设置）
+        response = await get_http_client().get(
+            intranet_base_url,
+            params=params,
+            timeout=10.0,  # 10秒超时
+        )
+        return {
+            "success": True,
+            "message": "控制请求已发送",
+            "url": f"{intranet_base_url}?{httpx.URL(params=params).query.decode()}",
+            "response_status": response.status_code,
+        }
     except httpx.RequestError as e:
         return {
             "success": False,
@@ -149,18 +521,24 @@ async def proxy_intranet(
 
 # ==================== 任务配置管理 ====================
 
+import hashlib
 import oss2
 import uuid
 import os
 from datetime import datetime
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Depends
-from typing import Optional
+from functools import lru_cache
+from urllib.parse import quote
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Depends, Header
+from typing import Dict, List, Optional, Tuple
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.config import get_settings
 from app.core.database import get_db
-from app.services.task_service import TaskService
+from app.core.security import require_admin
+from app.schemas.common import BATCH_MAX_ITEMS
+from app.services.config_storage_service import ConfigStorageService
+from app.services.directory_cache import TaskEntry, get_directory_cache
 
 settings = get_settings()
 
@@ -179,19 +557,29 @@ class ConfigGetResponse(BaseModel):
     config_json: Optional[str] = None
 
 
+class ConfigBatchRequest(BaseModel):
+    """批量获取任务配置的请求"""
+    shadow_bot_account: str = Field(..., min_length=1, description="机器人账号")
+    app_names: List[str] = Field(..., min_length=1, max_length=BATCH_MAX_ITEMS, description="应用名称列表")
+
+
+class ConfigBatchItem(ConfigGetResponse):
+    """批量响应中的单个应用配置"""
+    etag: str
+
+
+class ConfigBatchResponse(BaseModel):
+    """批量获取任务配置的响应"""
+    configs: Dict[str, ConfigBatchItem]
+    not_found: List[str] = []
+
+
 class ConfigUploadResponse(BaseModel):
     """配置文件上传响应"""
     success: bool
     file_url: Optional[str] = None
     message: str
-
-
-def get_oss_bucket():
-    """获取 OSS Bucket 实例"""
-    if not settings.OSS_ACCESS_KEY_ID or not settings.OSS_ACCESS_KEY_SECRET:
-        return None
-    auth = oss2.Auth(settings.OSS_ACCESS_KEY_ID, settings.OSS_ACCESS_KEY_SECRET)
-    return oss2.Bucket(auth, settings.OSS_ENDPOINT, settings.OSS_BUCKET_NAME)
+    deduplicated: bool = False
 
 
 @router.post("/upload/config", response_model=ConfigUploadResponse)
@@ -202,10 +590,11 @@ async def upload_config_file(
     db: AsyncSession = Depends(get_db),
 ):
     """
-    上传配置文件到 OSS
+    上传配置文件到 OSS（未配置 OSS 时保存到本地）
 
-    用于前端上传任务配置文件，上传后返回 OSS 文件 URL。
-    文件保存路径: config/{shadow_bot_account}/{app_name}/{timestamp}_{filename}
+    用于前端上传任务配置文件，上传后返回文件 URL。
+    文件按内容 SHA-256 去重存储：相同内容只保存一次，重复上传直接返回已有 URL。
+    文件保存路径: config/blobs/{sha256}/{filename}（本地为 /static/configs/blobs/...）
 
     使用示例 (前端):
         const formData = new FormData();
@@ -214,54 +603,8 @@ async def upload_config_file(
         formData.append('app_name', '测试应用');
         fetch('/api/v1/resources/upload/config', { method: 'POST', body: formData })
     """
-    # 验证 OSS 配置
-    bucket = get_oss_bucket()
-    if bucket is None:
-        # OSS 未配置，使用本地存储
-        from app.core.database import STATIC_DIR
-        upload_dir = STATIC_DIR / "configs"
-        upload_dir.mkdir(parents=True, exist_ok=True)
-
-        # 生成文件名
-        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-        filename = f"{timestamp}_{file.filename}"
-        file_path = upload_dir / filename
-
-        # 保存文件
-        content = await file.read()
-        with open(file_path, "wb") as f:
-            f.write(content)
-
-        file_url = f"/static/configs/{filename}"
-        return ConfigUploadResponse(
-            success=True,
-            file_url=file_url,
-            message="文件已保存到本地存储"
-        )
-
     try:
-        # 生成 OSS 文件名
-        timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
-        ext = os.path.splitext(file.filename)[1] if file.filename else ""
-        object_name = f"config/{shadow_bot_account}/{app_name}/{timestamp}{ext}"
-
-        # 读取文件内容并上传
-        content = await file.read()
-        result = bucket.put_object(object_name, content)
-
-        if result.status == 200:
-            file_url = f"https://{settings.OSS_BUCKET_NAME}.{settings.OSS_ENDPOINT}/{object_name}"
-            return ConfigUploadResponse(
-                success=True,
-                file_url=file_url,
-                message="文件上传成功"
-            )
-        else:
-            raise HTTPException(
-                status_code=500,
-                detail=f"上传失败，HTTP状态码: {result.status}"
-            )
-
+        blob, deduplicated = await ConfigStorageService(db).store_upload(file)
     except oss2.exceptions.OssError as e:
         raise HTTPException(
             status_code=500,
@@ -273,16 +616,78 @@ async def upload_config_file(
             detail=f"上传失败: {str(e)}"
         )
 
+    if deduplicated:
+        message = "文件内容已存在，复用已上传的文件"
+    elif blob.storage == "local":
+        message = "文件已保存到本地存储"
+    else:
+        message = "文件上传成功"
+
+    return ConfigUploadResponse(
+        success=True,
+        file_url=blob.url,
+        message=message,
+        deduplicated=deduplicated,
+    )
+
+
+@router.post("/config/gc", dependencies=[Depends(require_admin)])
+async def collect_config_garbage(
+    min_age_hours: int = Query(24, ge=1, description="只回收早于该时长的文件（小时）"),
+    dry_run: bool = Query(True, description="只列出可回收文件，不删除"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    回收没有任务引用的配置文件（需要 X-Admin-Token）
+
+    默认 dry_run=true 只返回可回收列表；dry_run=false 时删除存储文件和记录。
+    """
+    return await ConfigStorageService(db).collect_garbage(
+        min_age_hours=min_age_hours,
+        dry_run=dry_run,
+    )
+
+
+@lru_cache(maxsize=4096)
+def _resolve_config(task: TaskEntry) -> Tuple[ConfigGetResponse, str]:
+    """
+    Build the config response and its ETag for a cached task entry
+
+    TaskEntry is immutable and replaced whenever the task changes, so the
+    result can be memoized on the entry itself.
+    """
+    # 将 OSS URL 转换为代理 URL，解决跨域问题
+    config_file_url = None
+    if task.config_file_path:
+        # 如果是 OSS URL，添加代理前缀
+        if task.config_file_path.startswith('http://') or task.config_file_path.startswith('https://'):
+            config_file_url = quote(task.config_file_path, safe=':/?&=')
+        else:
+            # 本地路径，保持原样
+            config_file_url = task.config_file_path
+
+    config = ConfigGetResponse(
+        config_file=task.config_file,
+        config_file_url=config_file_url,
+        config_info=task.config_info,
+        config_json=task.config_json,
+    )
+    digest = hashlib.sha256(config.model_dump_json().encode()).hexdigest()[:32]
+    return config, f'"{digest}"'
+
 
 @router.post("/config/get", response_model=ConfigGetResponse)
 async def get_task_config(
     payload: ConfigGetRequest,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
     db: AsyncSession = Depends(get_db),
 ):
     """
     获取任务配置信息（供影刀调用）
 
     影刀应用启动时调用此接口获取配置信息。
+    响应带 ETag，客户端携带 If-None-Match 且配置未变化时返回 304。
 
     请求参数:
         - shadow_bot_account: 机器人账号
@@ -294,15 +699,12 @@ async def get_task_config(
         - config_info: 是否使用配置信息
         - config_json: 配置信息 JSON (如有)
     """
-    from urllib.parse import quote
-
-    task_service = TaskService(db)
-
     try:
-        # 通过 shadow_bot_account 和 app_name 查找任务
-        task = await task_service.repo.get_by_account_and_app(
+        # 通过 shadow_bot_account 和 app_name 查找任务（走目录缓存）
+        task = await get_directory_cache().get_task(
+            db,
             shadow_bot_account=payload.shadow_bot_account,
-            app_name=payload.app_name
+            app_name=payload.app_name,
         )
 
         if not task:
@@ -314,22 +716,12 @@ async def get_task_config(
                 }
             )
 
-        # 将 OSS URL 转换为代理 URL，解决跨域问题
-        config_file_url = None
-        if task.config_file_path:
-            # 如果是 OSS URL，添加代理前缀
-            if task.config_file_path.startswith('http://') or task.config_file_path.startswith('https://'):
-                config_file_url = quote(task.config_file_path, safe=':/?&=')
-            else:
-                # 本地路径，保持原样
-                config_file_url = task.config_file_path
-
-        return ConfigGetResponse(
-            config_file=task.config_file,
-            config_file_url=config_file_url,
-            config_info=task.config_info,
-            config_json=task.config_json,
-        )
+        config, etag = _resolve_config(task)
+        if _etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+
+        response.headers["ETag"] = etag
+        return config
 
     except HTTPException:
         raise
@@ -338,3 +730,43 @@ async def get_task_config(
             status_code=500,
             detail=f"获取配置失败: {str(e)}"
         )
+
+
+@router.post("/config/batch", response_model=ConfigBatchResponse)
+async def get_task_configs(
+    payload: ConfigBatchRequest,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    批量获取同一机器人账号下多个应用的配置（供影刀调用）
+
+    整体 ETag 由各应用配置的 ETag 组合而成，任一配置变化都会改变。
+
+    使用示例:
+        POST /api/v1/resources/config/batch
+        {"shadow_bot_account": "redballoon", "app_names": ["应用A", "应用B"]}
+    """
+    directory = get_directory_cache()
+    configs: Dict[str, ConfigBatchItem] = {}
+    not_found: List[str] = []
+    etags: List[str] = []
+
+    for app_name in dict.fromkeys(payload.app_names):
+        task = await directory.get_task(db, payload.shadow_bot_account, app_name)
+        if not task:
+            not_found.append(app_name)
+            continue
+        config, etag = _resolve_config(task)
+        configs[app_name] = ConfigBatchItem(**config.model_dump(), etag=etag)
+        etags.append(f"{app_name}={etag}")
+
+    etags.extend(f"{app_name}=" for app_name in not_found)
+    digest = hashlib.sha256("\n".join(etags).encode()).hexdigest()[:32]
+    etag = f'"{digest}"'
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+
+    response.headers["ETag"] = etag
+    return ConfigBatchResponse(configs=configs, not_found=not_found)
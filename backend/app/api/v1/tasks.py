@@ -2,10 +2,12 @@
 Task API endpoints
 """
 from typing import Optional
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.config import get_settings
 from app.core.database import get_db
+from app.services.import_service import ImportService
 from app.services.task_service import TaskService
 from app.schemas.task import (
     TaskCreate,
@@ -14,10 +16,20 @@ from app.schemas.task import (
     TaskStartResponse,
     TaskStopResponse,
     TaskListResponse,
+    TaskBatchCreate,
+    TaskBatchUpdate,
+    TaskBatchCreateResponse,
+)
+from app.schemas.common import (
+    MessageResponse,
+    TaskStatus,
+    BatchDeleteRequest,
+    BatchOperationResponse,
+    ImportResult,
 )
-from app.schemas.common import MessageResponse, TaskStatus
 
 router = APIRouter(prefix="/tasks", tags=["Tasks"])
+settings = get_settings()
 
 
 @router.get("", response_model=TaskListResponse)
@@ -28,6 +40,7 @@ async def list_tasks(
     status: Optional[TaskStatus] = Query(default=None, description="Filter by status"),
     app_name: Optional[str] = Query(default=None, description="Filter by app name"),
     shadow_bot_account: Optional[str] = Query(default=None, description="Filter by ShadowBot account"),
+    exact_count: bool = Query(default=True, description="Exact total; false stops counting at LIST_COUNT_CAP"),
     db: AsyncSession = Depends(get_db),
 ):
     """
@@ -41,10 +54,67 @@ async def list_tasks(
         status=status.value if status else None,
         app_name=app_name,
         shadow_bot_account=shadow_bot_account,
+        count_cap=None if exact_count else settings.LIST_COUNT_CAP,
     )
     return TaskListResponse(**result)
 
 
+@router.post("/batch", response_model=TaskBatchCreateResponse, status_code=201)
+async def batch_create_tasks(
+    batch_in: TaskBatchCreate,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Create many tasks in one transaction
+    """
+    service = TaskService(db)
+    tasks = await service.bulk_create_tasks(batch_in.items)
+    return TaskBatchCreateResponse(total=len(tasks), items=tasks)
+
+
+@router.put("/batch", response_model=BatchOperationResponse)
+async def batch_update_tasks(
+    batch_in: TaskBatchUpdate,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Update many tasks by ID in one transaction
+    """
+    service = TaskService(db)
+    result = await service.bulk_update_tasks(batch_in.items)
+    return BatchOperationResponse(message="Tasks updated successfully", **result)
+
+
+@router.post("/batch/delete", response_model=BatchOperationResponse)
+async def batch_delete_tasks(
+    batch_in: BatchDeleteRequest,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Delete many tasks by ID in one transaction
+    """
+    service = TaskService(db)
+    result = await service.bulk_delete_tasks(batch_in.ids)
+    return BatchOperationResponse(message="Tasks deleted successfully", **result)
+
+
+@router.post("/import", response_model=ImportResult)
+async def import_tasks(
+    file: UploadFile = File(..., description="CSV or XLSX file, first row is the header"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Import tasks from a CSV / XLSX spreadsheet
+
+    Rows are parsed in chunks, validated with TaskCreate and upserted on
+    shadow_bot_account + app_name, one transaction per chunk. Headers may use field names or
+    the Chinese column names (e.g. 影刀账号). Returns a per-row error report.
+    """
+    service = ImportService(db)
+    result = await service.import_tasks(file.file, file.filename)
+    return ImportResult(**result)
+
+
 @router.get("/{task_id}", response_model=TaskResponse)
 async def get_task(
     task_id: str,
@@ -2,20 +2,35 @@
 Webhook API endpoints for external app callbacks (e.g., ShadowBot/影刀)
 """
 import uuid
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timedelta
+from pathlib import PurePath
+from typing import List, Literal, Optional
 from fastapi import APIRouter, HTTPException, Depends, Request
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, field_validator
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.config import get_settings
+from app.core.database import get_db, unit_of_work
 from app.services.execution_log_service import ExecutionLogService
 from app.services.account_service import AccountService
+from app.services.directory_cache import get_directory_cache
 from app.services.task_service import TaskService
+from app.services.thumbnail_service import get_thumbnail_service
+from app.services.storage_service import (
+    artifact_object_key,
+    artifact_url,
+    is_artifact_key,
+    presign_put,
+)
 from app.schemas.common import LogStatus
 
+settings = get_settings()
+
 router = APIRouter(prefix="/webhook", tags=["Webhook"])
 
+# 单次申请上传 URL 的文件数上限
+UPLOAD_URLS_MAX_FILES = 500
+
 
 class ResultSummary(BaseModel):
     """执行结果汇总"""
@@ -45,6 +60,57 @@ class WebhookExecutionComplete(BaseModel):
     screenshot_url: Optional[str] = Field(default=None, description="截图云端 OSS URL")
     log_url: Optional[str] = Field(default=None, description="日志云端 OSS URL")
 
+    # 通过 /webhook/upload-urls 直传后的对象 key（优先于上面的 URL）
+    screenshot_key: Optional[str] = Field(default=None, description="截图对象 key")
+    log_key: Optional[str] = Field(default=None, description="日志对象 key")
+
+    @field_validator("screenshot_key", "log_key")
+    @classmethod
+    def check_object_key(cls, value: Optional[str]) -> Optional[str]:
+        if value is not None and not is_artifact_key(value):
+            raise ValueError("object key was not issued by /webhook/upload-urls")
+        return value
+
+
+class UploadFileSpec(BaseModel):
+    """待上传的单个文件"""
+    kind: Literal["screenshot", "log"] = Field(..., description="文件类型: screenshot / log")
+    filename: str = Field(..., min_length=1, max_length=200, description="文件名")
+    content_type: str = Field(default="application/octet-stream", description="上传时使用的 Content-Type")
+
+    @field_validator("filename")
+    @classmethod
+    def check_filename(cls, value: str) -> str:
+        name = PurePath(value.replace("\\", "/")).name.strip()
+        if not name or name in (".", ".."):
+            raise ValueError("invalid filename")
+        return name
+
+
+class UploadUrlsRequest(BaseModel):
+    """申请预签名上传 URL"""
+    shadow_bot_account: str = Field(..., min_length=1, description="影刀机器人账号")
+    app_name: str = Field(..., min_length=1, description="影刀应用名称")
+    files: List[UploadFileSpec] = Field(..., min_length=1, max_length=UPLOAD_URLS_MAX_FILES)
+
+
+class UploadUrlItem(BaseModel):
+    """单个文件的上传方式"""
+    kind: str
+    filename: str
+    object_key: str
+    method: str
+    upload_url: str
+    headers: dict
+    url: str
+
+
+class UploadUrlsResponse(BaseModel):
+    """预签名上传 URL 列表"""
+    execution_id: str
+    expires_at: datetime
+    uploads: List[UploadUrlItem]
+
 
 class WebhookResponse(BaseModel):
     """Response for webhook calls"""
@@ -97,18 +163,17 @@ async def confirm_execution(
         else:
             new_status = payload.action.lower()
 
-        # 更新任务状态
-        updated_count = await task_service.update_task_status_by_app(
-            shadow_bot_account=payload.shadow_bot_account,
-            app_name=payload.app_name,
-            new_status=new_status,
-        )
+        async with unit_of_work(db):
+            # 更新任务状态
+            updated_count = await task_service.update_task_status_by_app(
+                shadow_bot_account=payload.shadow_bot_account,
+                app_name=payload.app_name,
+                new_status=new_status,
+            )
 
-        # 获取关联账号并更新状态
-        accounts = await account_service.get_accounts_by_shadow_bot(payload.shadow_bot_account)
-        for account in accounts:
-            await account_service.update_account(
-                account.id,
+            # 更新关联账号状态（单条 UPDATE，不回读）
+            await account_service.update_accounts_by_shadow_bot(
+                payload.shadow_bot_account,
                 {
                     "status": new_status,
                     "recent_app": payload.app_name,
@@ -153,6 +218,53 @@ async def confirm_execution(
         )
 
 
+@router.post("/upload-urls", response_model=UploadUrlsResponse)
+async def create_upload_urls(payload: UploadUrlsRequest, request: Request):
+    """
+    为一次执行签发截图/日志的预签名上传 URL
+
+    影刀按返回的 method / upload_url / headers 并行直传到 OSS，文件内容不经过
+    后端；上传完成后在 execution-complete 中只回传 object_key。
+    URL 在 UPLOAD_URL_EXPIRE_SECONDS 秒后失效。未配置 OSS 时 upload_url 指向
+    本地签名上传接口（PUT /api/v1/resources/objects/...）。
+
+    使用示例:
+        POST /api/v1/webhook/upload-urls
+        {"shadow_bot_account": "redballoon", "app_name": "云仓收藏",
+         "files": [{"kind": "screenshot", "filename": "step1.png", "content_type": "image/png"}]}
+    """
+    execution_id = uuid.uuid4().hex
+    date = datetime.now().strftime("%Y%m%d")
+    expires_in = settings.UPLOAD_URL_EXPIRE_SECONDS
+    base_url = str(request.base_url)
+
+    uploads = []
+    used_keys = set()
+    for spec in payload.files:
+        object_key = artifact_object_key(spec.kind, date, execution_id, spec.filename)
+        # 同一次执行中的重名文件加序号
+        n = 1
+        while object_key in used_keys:
+            path = PurePath(spec.filename)
+            object_key = artifact_object_key(spec.kind, date, execution_id, f"{path.stem}_{n}{path.suffix}")
+            n += 1
+        used_keys.add(object_key)
+
+        uploads.append(UploadUrlItem(
+            kind=spec.kind,
+            filename=object_key.rsplit("/", 1)[-1],
+            object_key=object_key,
+            url=artifact_url(object_key),
+            **presign_put(object_key, spec.content_type, expires_in, base_url),
+        ))
+
+    return UploadUrlsResponse(
+        execution_id=execution_id,
+        expires_at=datetime.now() + timedelta(seconds=expires_in),
+        uploads=uploads,
+    )
+
+
 @router.post("/execution-complete", response_model=WebhookResponse)
 async def execution_complete(
     payload: WebhookExecutionComplete,
@@ -184,42 +296,37 @@ async def execution_complete(
 
         log_text = f"执行 {payload.app_name} 完成，状态: {payload.status}{result_info}"
 
-        # 获取 host_ip (从关联账号中获取)
-        accounts = await account_service.get_accounts_by_shadow_bot(payload.shadow_bot_account)
-        host_ip = accounts[0].host_ip if accounts else ""
-
-        # 先创建日志（获取 log_id）
-        log = await log_service.create_log(
-            text=log_text,
-            app_name=payload.app_name,
-            shadow_bot_account=payload.shadow_bot_account,
-            status=payload.status,
-            start_time=payload.start_time,
-            end_time=payload.end_time,
-            duration=payload.duration_seconds,
-            host_ip=host_ip,
-            log_info=payload.log_info,
-            screenshot=payload.screenshot,
-        )
-
-        log_id = log.id
-
-        # 保存云端资源 URL
-        screenshot_path = None
-        log_content_path = None
-
-        if payload.screenshot_url:
-            screenshot_path = payload.screenshot_url
-            await log_service.update_log(log_id, {"screenshot_path": screenshot_path})
+        # 日志、账号、任务在同一事务中写入，一次提交
+        async with unit_of_work(db):
+            # 获取 host_ip (从关联账号中获取，走目录缓存)
+            accounts = await get_directory_cache().get_accounts(db, payload.shadow_bot_account)
+            host_ip = accounts[0].host_ip if accounts else ""
+
+            # 保存云端资源 URL（直传的对象 key 换算为 URL）
+            screenshot_path = artifact_url(payload.screenshot_key) if payload.screenshot_key else payload.screenshot_url
+            log_content_path = artifact_url(payload.log_key) if payload.log_key else payload.log_url
+
+            # 创建日志（云端资源 URL 一并写入）
+            log = await log_service.create_log(
+                text=log_text,
+                app_name=payload.app_name,
+                shadow_bot_account=payload.shadow_bot_account,
+                status=payload.status,
+                start_time=payload.start_time,
+                end_time=payload.end_time,
+                duration=payload.duration_seconds,
+                host_ip=host_ip,
+                log_info=payload.log_info or bool(payload.log_key),
+                screenshot=payload.screenshot or bool(payload.screenshot_key),
+                screenshot_path=screenshot_path,
+                log_content=log_content_path,
+            )
 
-        if payload.log_url:
-            log_content_path = payload.log_url
-            await log_service.update_log(log_id, {"log_content": payload.log_url})
+            log_id = log.id
 
-        # Update account's recent_app, status, and end_time
-        for account in accounts:
-            await account_service.update_account(
-                account.id,
+            # Update account's recent_app, status, and end_time
+            await account_service.update_accounts_by_shadow_bot(
+                payload.shadow_bot_account,
                 {
                     "recent_app": payload.app_name,
                     "status": payload.status,
@@ -227,14 +334,18 @@ async def execution_complete(
                 }
             )
 
-        # 【核心修复】更新对应任务的状态为 pending
-        # 根据 shadow_bot_account + app_name 查找并更新任务状态
-        task_status = "pending" if payload.status in ["completed", "failed"] else payload.status
-        await task_service.update_task_status_by_app(
-            shadow_bot_account=payload.shadow_bot_account,
-            app_name=payload.app_name,
-            new_status=task_status,
-        )
+            # 【核心修复】更新对应任务的状态为 pending
+            # 根据 shadow_bot_account + app_name 查找并更新任务状态
+            task_status = "pending" if payload.status in ["completed", "failed"] else payload.status
+            await task_service.update_task_status_by_app(
+                shadow_bot_account=payload.shadow_bot_account,
+                app_name=payload.app_name,
+                new_status=task_status,
+            )
+
+        # 后台预生成截图缩略图（不阻塞回调）
+        if screenshot_path:
+            get_thumbnail_service().schedule(screenshot_path)
 
         # SSE 广播事件 (如果 SSE 服务已注册)
         from app.main import sse_service
@@ -311,15 +422,13 @@ async def heartbeat(
     account_service = AccountService(db)
 
     try:
-        accounts = await account_service.get_accounts_by_shadow_bot(payload.shadow_bot_account)
-        for account in accounts:
-            await account_service.update_account(
-                account.id,
-                {
-                    "status": "running",
-                    "recent_app": payload.app_name,
-                }
-            )
+        await account_service.update_accounts_by_shadow_bot(
+            payload.shadow_bot_account,
+            {
+                "status": "running",
+                "recent_app": payload.app_name,
+            }
+        )
 
         return WebhookResponse(
             success=True,
@@ -0,0 +1,219 @@
+"""
+Response compression middleware (Brotli / gzip)
+
+List endpoints (/logs, /tasks, /accounts) return up to 100 verbose JSON
+items per page; compressed they shrink 5-10x, which matters over the LAN
+and WSL port forwarding.
+
+- The encoding is negotiated from Accept-Encoding: br (when the optional
+  ``brotli`` package is installed), then gzip.
+- Bodies below ``minimum_size`` are sent as-is.
+- Streaming responses are compressed chunk by chunk.
+- Responses that are already encoded (precompressed static files, proxied
+  OSS bodies), partial (206), or of excluded types are passed through
+  untouched. ``text/event-stream`` is always excluded, because buffering
+  inside a compressor would hold back SSE events.
+"""
+import zlib
+from typing import Optional, Tuple
+
+import anyio
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli 可选：未安装时只使用 gzip
+    brotli = None
+
+# 不压缩的内容类型（已压缩的格式和流式事件）
+EXCLUDED_CONTENT_TYPES = (
+    "text/event-stream",
+    "image/",
+    "audio/",
+    "video/",
+    "font/woff",
+    "application/zip",
+    "application/gzip",
+    "application/x-gzip",
+    "application/octet-stream",
+    "application/vnd.openxmlformats",
+)
+
+# 超过该大小的单次响应体在线程中压缩，避免阻塞事件循环
+THREAD_MINIMUM_SIZE = 256 * 1024
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick br or gzip from an Accept-Encoding header (None for identity)"""
+    weights = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        name, _, value = params.strip().partition("=")
+        try:
+            q = float(value) if name.strip().lower() == "q" else 1.0
+        except ValueError:
+            q = 0.0
+        weights[coding.strip().lower()] = q
+
+    candidates = ["br", "gzip"] if brotli is not None else ["gzip"]
+    best = max(candidates, key=lambda coding: weights.get(coding, weights.get("*", 0.0)))
+    return best if weights.get(best, weights.get("*", 0.0)) > 0 else None
+
+
+class _Compressor:
+    """Incremental compressor with a common interface for gzip and br"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=brotli_quality)
+        else:
+            # wbits=31: gzip 容器格式
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._br.process(data)
+        return self._zlib.compress(data)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._br.finish()
+        return self._zlib.flush()
+
+
+class CompressionMiddleware:
+    """
+    Negotiated Brotli / gzip compression for HTTP responses
+
+    使用示例:
+        app.add_middleware(CompressionMiddleware, minimum_size=1024)
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 4,
+        excluded_content_types: Tuple[str, ...] = EXCLUDED_CONTENT_TYPES,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.excluded_content_types = excluded_content_types
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        responder = _CompressionResponder(self, encoding, send)
+        await self.app(scope, receive, responder.send)
+
+
+class _CompressionResponder:
+    """Per-request send wrapper that decides whether and how to compress"""
+
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self.downstream = send
+        self.start_message: Optional[Message] = None
+        # None: 尚未决定；True: 压缩；False: 原样转发
+        self.compressing: Optional[bool] = None
+        self.compressor: Optional[_Compressor] = None
+
+    def _compressible(self, message: Message) -> bool:
+        headers = Headers(raw=message["headers"])
+        if message["status"] in (204, 206, 304) or "content-encoding" in headers:
+            return False
+        content_type = headers.get("content-type", "")
+        return bool(content_type) and not content_type.startswith(self.middleware.excluded_content_types)
+
+    async def send(self, message: Message) -> None:
+        message_type = message["type"]
+
+        if message_type == "http.response.start":
+            self.start_message = message
+            if not self._compressible(message):
+                self.compressing = False
+                await self.downstream(message)
+            return
+
+        if self.compressing is False:
+            await self.downstream(message)
+            return
+
+        if message_type != "http.response.body":
+            # 其它扩展消息（如 pathsend）无法压缩，按原样发送
+            self.compressing = False
+            await self.downstream(self.start_message)
+            await self.downstream(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressing is None:
+            if not more_body and len(body) < self.middleware.minimum_size:
+                self.compressing = False
+                await self.downstream(self.start_message)
+                await self.downstream(message)
+                return
+            self.compressing = True
+            self.compressor = _Compressor(
+                self.encoding, self.middleware.gzip_level, self.middleware.brotli_quality
+            )
+            await self._send_start(body if not more_body else None)
+            if not more_body:
+                return
+
+        await self._send_body(body, more_body)
+
+    async def _send_start(self, complete_body: Optional[bytes]) -> None:
+        """Send the rewritten start message (and the whole body if complete)"""
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        # 压缩后的表示与原表示字节不同，强 ETag 改为弱 ETag
+        etag = headers.get("etag")
+        if etag and not etag.startswith("W/"):
+            headers["ETag"] = f"W/{etag}"
+
+        if complete_body is not None:
+            compressed = await self._compress(complete_body, final=True)
+            headers["Content-Length"] = str(len(compressed))
+            await self.downstream(self.start_message)
+            await self.downstream({"type": "http.response.body", "body": compressed})
+            return
+
+        # 流式响应：长度未知，去掉 Content-Length 走 chunked
+        if "content-length" in headers:
+            del headers["content-length"]
+        await self.downstream(self.start_message)
+
+    async def _send_body(self, body: bytes, more_body: bool) -> None:
+        compressed = await self._compress(body, final=not more_body)
+        if compressed or not more_body:
+            await self.downstream({
+                "type": "http.response.body",
+                "body": compressed,
+                "more_body": more_body,
+            })
+
+    async def _compress(self, data: bytes, final: bool) -> bytes:
+        def run() -> bytes:
+            out = self.compressor.compress(data) if data else b""
+            return out + self.compressor.finish() if final else out
+
+        if len(data) >= THREAD_MINIMUM_SIZE:
+            return await anyio.to_thread.run_sync(run)
+        return run()
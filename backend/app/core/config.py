@@ -24,6 +24,16 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 1440  # 24 hours
 
+    # Admin token for maintenance endpoints (X-Admin-Token); empty disables them
+    ADMIN_TOKEN: str = ""
+
+    # Bearer token required by /metrics; empty leaves it open (internal network only)
+    METRICS_TOKEN: str = ""
+
+    # Directory cache: how often (seconds) each worker checks the shared
+    # cache_versions table for changes made by other workers
+    DIRECTORY_CACHE_CHECK_INTERVAL: float = 1.0
+
     # Security
     ALLOWED_HOSTS: list[str] = ["*"]
 
@@ -39,6 +49,39 @@ class Settings(BaseSettings):
     OSS_BUCKET_NAME: str = "rpa-workbench"
     OSS_ENDPOINT: str = "oss-cn-shenzhen.aliyuncs.com"
 
+    # Pre-signed artifact uploads (截图/日志直传，URL 有效期及本地存储时的大小上限)
+    UPLOAD_URL_EXPIRE_SECONDS: int = 900
+    LOCAL_UPLOAD_MAX_BYTES: int = 100 * 1024 * 1024  # 100 MB
+
+    # Proxy Cache (代理资源磁盘缓存，PROXY_CACHE_MAX_BYTES=0 关闭)
+    PROXY_CACHE_DIR: str = "app/cache/proxy"
+    PROXY_CACHE_MAX_BYTES: int = 1024 * 1024 * 1024  # 1 GB
+    PROXY_CACHE_MAX_OBJECT_BYTES: int = 100 * 1024 * 1024  # 100 MB
+    PROXY_CACHE_REVALIDATE_SECONDS: int = 300
+
+    # Screenshot thumbnails (缩略图缓存目录和渲染进程数，THUMBNAIL_WORKERS=0 关闭)
+    THUMBNAIL_CACHE_DIR: str = "app/cache/thumbnails"
+    THUMBNAIL_CACHE_MAX_BYTES: int = 256 * 1024 * 1024  # 256 MB
+    THUMBNAIL_WORKERS: int = 2
+
+    # List pagination (exact_count=false 时总数最多计到该值，超出显示为 "10000+")
+    LIST_COUNT_CAP: int = 10000
+
+    # Query instrumentation (超过该耗时的 SQL 连同参数记录为 WARNING，0 关闭)
+    SLOW_QUERY_MS: float = 200
+
+    # SSE: 每个客户端最多缓存的未发送事件数，超出时丢弃最旧的事件
+    SSE_CLIENT_QUEUE_SIZE: int = 1000
+
+    # SSE broker (多 worker 部署时事件的跨进程分发): local | unix | redis
+    SSE_BROKER: str = "local"
+    SSE_BROKER_PATH: str = "/tmp/rpa-workbench-sse"
+    SSE_BROKER_URL: str = "redis://localhost:6379/0"
+    SSE_BROKER_CHANNEL: str = "rpa:sse"
+
+    # Event loop monitor (事件循环被阻塞超过该毫秒数时记录调用栈，0 关闭)
+    LOOP_BLOCK_THRESHOLD_MS: float = 100
+
     model_config = SettingsConfigDict(
         env_file=".env",
         case_sensitive=True,
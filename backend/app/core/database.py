@@ -1,22 +1,28 @@
 """
 Database configuration and connection management
 """
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Callable
 
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase, declarative_base
 from sqlalchemy import event
 
+from app.core import metrics, query_stats
 from app.core.config import get_settings
 
 settings = get_settings()
 
+# 连接池记录 checkout 等待时间（内存 SQLite 保持默认的 StaticPool）
+_pool_options = {} if ":memory:" in settings.DATABASE_URL else {"poolclass": metrics.TimedAsyncAdaptedQueuePool}
+
 # Create async engine
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=True,  # Set to False in production
     future=True,
+    **_pool_options,
 )
 
 # Create async session factory
@@ -48,6 +54,68 @@ async def get_db() -> AsyncGenerator[AsyncSession, None]:
             await session.close()
 
 
+# session.info 中记录 unit of work 嵌套深度 / 提交后回调的键
+_UNIT_OF_WORK_DEPTH = "unit_of_work_depth"
+_AFTER_COMMIT = "after_commit_callbacks"
+
+
+def in_unit_of_work(session: AsyncSession) -> bool:
+    """
+    Whether the session is currently inside a unit of work
+    """
+    return session.info.get(_UNIT_OF_WORK_DEPTH, 0) > 0
+
+
+def run_after_commit(session: AsyncSession, callback: Callable[[], None]) -> None:
+    """
+    Run callback once the outermost unit of work has committed
+
+    Callbacks are dropped if the unit of work rolls back. Outside a unit of
+    work the callback runs immediately.
+    """
+    if in_unit_of_work(session):
+        session.info.setdefault(_AFTER_COMMIT, []).append(callback)
+    else:
+        callback()
+
+
+@asynccontextmanager
+async def unit_of_work(session: AsyncSession) -> AsyncGenerator[AsyncSession, None]:
+    """
+    Run several repository writes as one transaction
+
+    Inside the block repository methods only flush; the outermost block
+    commits once on success and rolls back on any exception. Nested blocks
+    join the outer transaction.
+
+    使用示例:
+        async with unit_of_work(self.db):
+            await self.repo.update(task_id, {...})
+            await self.account_repo.update(account_id, {...})
+    """
+    depth = session.info.get(_UNIT_OF_WORK_DEPTH, 0)
+    session.info[_UNIT_OF_WORK_DEPTH] = depth + 1
+    try:
+        yield session
+        if depth == 0:
+            await session.commit()
+    except BaseException:
+        if depth == 0:
+            session.info.pop(_AFTER_COMMIT, None)
+            await session.rollback()
+        raise
+    finally:
+        session.info[_UNIT_OF_WORK_DEPTH] = depth
+
+    if depth == 0:
+        for callback in session.info.pop(_AFTER_COMMIT, []):
+            callback()
+
+
+# SQLite 写锁等待时间（毫秒）
+SQLITE_BUSY_TIMEOUT_MS = 5000
+
+
 # SQLite specific configuration
 @event.listens_for(engine.sync_engine, "connect")
 def set_sqlite_pragma(dbapi_connection, connection_record):
@@ -56,4 +124,25 @@ def set_sqlite_pragma(dbapi_connection, connection_record):
     """
     cursor = dbapi_connection.cursor()
     cursor.execute("PRAGMA foreign_keys=ON")
+    if ":memory:" not in settings.DATABASE_URL:
+        # 多 worker 同时写入：WAL 让读不阻塞写，写锁冲突时等待而不是立即报 database is locked
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
     cursor.close()
+
+
+# 按请求统计 SQL 次数/耗时，并记录慢查询
+query_stats.install(engine.sync_engine, settings.SLOW_QUERY_MS)
+
+
+def _collect_pool_checked_out():
+    checkedout = getattr(engine.sync_engine.pool, "checkedout", None)
+    if checkedout is not None:
+        yield (), checkedout()
+
+
+metrics.gauge(
+    "rpa_db_pool_checked_out",
+    "Database connections currently checked out of the pool",
+    _collect_pool_checked_out,
+)
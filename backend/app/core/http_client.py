@@ -0,0 +1,99 @@
+"""
+Shared outbound HTTP client
+
+One pooled httpx.AsyncClient per process instead of a new client (and new
+TCP/TLS connections) per proxied request. Its transport records upstream
+latency (time to response headers), errors and body bytes per host.
+"""
+import time
+from typing import AsyncIterator, Optional
+
+import httpx
+
+from app.core import metrics
+
+UPSTREAM_LATENCY = metrics.histogram(
+    "rpa_proxy_upstream_latency_seconds",
+    "Time until the upstream response headers arrive, by host",
+    ("host",),
+)
+UPSTREAM_ERRORS = metrics.counter(
+    "rpa_proxy_upstream_errors_total",
+    "Upstream requests that failed before a response, by host",
+    ("host",),
+)
+UPSTREAM_BYTES = metrics.counter(
+    "rpa_proxy_upstream_bytes_total",
+    "Response body bytes received from upstreams, by host",
+    ("host",),
+)
+
+
+class _CountingStream(httpx.AsyncByteStream):
+    """Response body stream that counts the bytes read from it"""
+
+    def __init__(self, stream: httpx.AsyncByteStream, host: str):
+        self._stream = stream
+        self._host = host
+
+    async def __aiter__(self) -> AsyncIterator[bytes]:
+        async for chunk in self._stream:
+            UPSTREAM_BYTES.inc(self._host, amount=len(chunk))
+            yield chunk
+
+    async def aclose(self) -> None:
+        await self._stream.aclose()
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """Wrap a transport and record upstream metrics"""
+
+    def __init__(self, transport: httpx.AsyncBaseTransport):
+        self._transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        host = request.url.host
+        started = time.perf_counter()
+        try:
+            response = await self._transport.handle_async_request(request)
+        except Exception:
+            UPSTREAM_ERRORS.inc(host)
+            raise
+        UPSTREAM_LATENCY.observe(time.perf_counter() - started, host)
+        response.stream = _CountingStream(response.stream, host)
+        return response
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+
+# trust_env=False 禁用系统代理设置，避免 SOCKS 代理问题
+_CLIENT_OPTIONS = {
+    "follow_redirects": True,
+    "trust_env": False,
+    "timeout": httpx.Timeout(30.0, connect=10.0),
+}
+
+# 自定义 transport 时连接数限制要设置在 transport 上
+_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=20)
+
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """获取全局 HTTP 客户端（首次调用时创建）"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            transport=InstrumentedTransport(httpx.AsyncHTTPTransport(limits=_LIMITS)),
+            **_CLIENT_OPTIONS,
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """关闭全局 HTTP 客户端（应用关闭时调用）"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
@@ -0,0 +1,316 @@
+"""
+Prometheus metrics (text exposition format, served at /metrics)
+
+A small in-process registry instead of the prometheus_client dependency:
+counters, histograms and gauges whose values are read from a callback at
+scrape time. Every worker process keeps its own registry, so with several
+uvicorn workers each one has to be scraped (or the series summed).
+
+Exported series:
+
+- ``rpa_http_requests_total`` / ``rpa_http_request_duration_seconds`` by
+  method, route template and status. Webhook ingest rate and errors, e.g.
+  ``rate(rpa_http_requests_total{route=~"/api/v1/webhook/.*",status=~"5.."}[5m])``
+- ``rpa_db_query_duration_seconds`` by statement type and
+  ``rpa_db_pool_checkout_wait_seconds`` (see ``TimedAsyncAdaptedQueuePool``)
+- SSE clients, per-client queue depth and dropped events (sse_service)
+- proxy upstream latency, errors and bytes (http_client)
+"""
+import time
+from bisect import bisect_left
+from threading import Lock
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# 请求耗时（秒）
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# SQL 执行 / 连接池等待（秒），比请求耗时细一个量级
+DB_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = Lock()
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonic counter; label values are passed positionally"""
+    type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *labelvalues: str, amount: float = 1) -> None:
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues: str) -> float:
+        return self._values.get(labelvalues, 0)
+
+    def _samples(self) -> Iterable[str]:
+        with self._lock:
+            items = list(self._values.items())
+        for labels, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Histogram(_Metric):
+    """Cumulative histogram with fixed buckets"""
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+        # 每组标签：[各桶计数..., +Inf 计数], 总和
+        self._values: Dict[LabelValues, Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, *labelvalues: str) -> None:
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._values.setdefault(labelvalues, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def count(self, *labelvalues: str) -> int:
+        counts, _ = self._values.get(labelvalues, ([0], [0.0]))
+        return sum(counts)
+
+    def _samples(self) -> Iterable[str]:
+        with self._lock:
+            items = [(labels, list(counts), total[0]) for labels, (counts, total) in self._values.items()]
+        for labels, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, labels, le)} {cumulative}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, labels)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, labels)} {cumulative}"
+
+
+class Gauge(_Metric):
+    """Gauge read from a callback at scrape time"""
+    type = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        collect: Callable[[], Iterable[Tuple[LabelValues, float]]],
+        labelnames: Sequence[str] = (),
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._collect = collect
+
+    def _samples(self) -> Iterable[str]:
+        for labels, value in self._collect():
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Registry:
+    """Metrics in registration order"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Duplicate metric: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def histogram(
+    name: str,
+    documentation: str,
+    labelnames: Sequence[str] = (),
+    buckets: Sequence[float] = DEFAULT_BUCKETS,
+) -> Histogram:
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+def gauge(
+    name: str,
+    documentation: str,
+    collect: Callable[[], Iterable[Tuple[LabelValues, float]]],
+    labelnames: Sequence[str] = (),
+) -> Gauge:
+    return REGISTRY.register(Gauge(name, documentation, collect, labelnames))
+
+
+def render() -> str:
+    """All registered metrics in the Prometheus text format"""
+    return REGISTRY.render()
+
+
+# ==================== HTTP ====================
+
+HTTP_REQUESTS = counter(
+    "rpa_http_requests_total",
+    "HTTP requests by method, route template and status",
+    ("method", "route", "status"),
+)
+HTTP_DURATION = histogram(
+    "rpa_http_request_duration_seconds",
+    "HTTP request latency by method and route template",
+    ("method", "route"),
+)
+
+# 未匹配任何路由的请求（404 扫描等）归为一类，避免按路径产生大量序列
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+def route_template(scope: Scope) -> str:
+    """Route template of a handled request (/api/v1/tasks/{task_id})"""
+    path = scope.get("path", "")
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    regex = getattr(route, "path_regex", None)
+    if template is None or regex is None:
+        return path
+
+    # 新版 FastAPI 嵌套 include_router 时 route.path 不含上级前缀，从请求路径中补齐
+    for i, char in enumerate(path):
+        if char == "/" and regex.match(path[i:]):
+            return path[:i] + template
+    return template
+
+
+class MetricsMiddleware:
+    """
+    Record request count and latency per route template
+
+    SSE streams (text/event-stream) are counted but not timed: their
+    duration is the length of the connection.
+
+    使用示例:
+        app.add_middleware(MetricsMiddleware)
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+        streaming = False
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code, streaming
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                content_type = Headers(raw=message.get("headers", [])).get("content-type", "")
+                streaming = content_type.startswith("text/event-stream")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            method = scope.get("method", "")
+            route = route_template(scope) if "route" in scope else UNMATCHED_ROUTE
+            HTTP_REQUESTS.inc(method, route, str(status_code))
+            if not streaming:
+                HTTP_DURATION.observe(time.perf_counter() - started, method, route)
+
+
+# ==================== 数据库 ====================
+
+DB_QUERY_DURATION = histogram(
+    "rpa_db_query_duration_seconds",
+    "SQL statement execution time by statement type",
+    ("operation",),
+    DB_BUCKETS,
+)
+DB_POOL_CHECKOUT_WAIT = histogram(
+    "rpa_db_pool_checkout_wait_seconds",
+    "Time spent waiting for a pooled database connection",
+    (),
+    DB_BUCKETS,
+)
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records how long each checkout waited"""
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(time.perf_counter() - started)
+
+
+def statement_operation(statement: str) -> str:
+    """SELECT / INSERT / UPDATE / ... from a SQL statement"""
+    words = statement.lstrip().split(None, 1)
+    return words[0].upper() if words else ""
+
+
+def observe_query(statement: str, seconds: float) -> None:
+    DB_QUERY_DURATION.observe(seconds, statement_operation(statement))
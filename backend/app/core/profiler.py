@@ -0,0 +1,298 @@
+"""
+Sampling profiler and event-loop lag monitor
+
+Both work from a background thread, so the event loop pays almost nothing:
+
+- ``SamplingProfiler`` samples the event-loop thread's stack with
+  ``sys._current_frames()`` every few milliseconds and writes the result
+  in the collapsed-stack ("folded") format read by flamegraph.pl,
+  speedscope and inferno. Started and stopped by an admin over
+  /api/v1/admin/profiler; profiles are saved under app/static/profiles
+  with an unguessable file name.
+- ``LoopMonitor`` schedules a tick on the loop at a fixed interval. The lag
+  of each tick goes into ``rpa_event_loop_lag_seconds``; a watchdog thread
+  that sees no tick for longer than the threshold captures the loop's
+  stack at that moment, which names the blocking call (a synchronous
+  oss2 request, a large json.dumps, ...).
+"""
+import asyncio
+import logging
+import os
+import secrets
+import sys
+import threading
+import time
+import traceback
+from collections import Counter as StackCounter, deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+
+from app.core import metrics
+from app.core.database import STATIC_DIR
+
+logger = logging.getLogger(__name__)
+
+# 采样时忽略的栈深度上限（防止递归过深的栈拖慢采样线程）
+MAX_STACK_DEPTH = 128
+
+# 事件循环监控的心跳间隔（秒）
+LOOP_TICK_INTERVAL = 0.1
+
+# 阻塞记录中保留的栈帧数 / 最近阻塞记录条数
+BLOCK_STACK_LIMIT = 30
+RECENT_BLOCKS = 50
+
+LOOP_LAG = metrics.histogram(
+    "rpa_event_loop_lag_seconds",
+    "Delay between a scheduled event-loop tick and when it ran",
+    (),
+    metrics.DB_BUCKETS,
+)
+LOOP_BLOCKED = metrics.counter(
+    "rpa_event_loop_blocked_total",
+    "Times the event loop was blocked for longer than the threshold",
+)
+
+
+class ProfilerError(Exception):
+    """Profiler started twice, or stopped while not running"""
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    filename = code.co_filename
+    # 缩短路径：项目内文件相对当前目录，第三方库从 site-packages 之后开始
+    if filename.startswith(os.getcwd()):
+        filename = os.path.relpath(filename)
+    elif "site-packages" in filename:
+        filename = filename.split("site-packages" + os.sep, 1)[-1]
+    # ";" 是 folded 格式的栈帧分隔符
+    return f"{code.co_name} ({filename}:{frame.f_lineno})".replace(";", ":")
+
+
+def _fold(frame) -> str:
+    labels = []
+    while frame is not None and len(labels) < MAX_STACK_DEPTH:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class SamplingProfiler:
+    """
+    Sample one thread's stack at a fixed interval
+
+    使用示例:
+        profiler.start(threading.get_ident(), interval=0.005, max_seconds=60)
+        ...
+        result = profiler.stop()
+    """
+
+    def __init__(self, output_dir: Path):
+        self.output_dir = Path(output_dir)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._stacks: StackCounter = StackCounter()
+        self._started_at: Optional[float] = None
+        self._interval = 0.0
+        self._max_seconds = 0.0
+        self._last_result: Optional[Dict[str, Any]] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            if not self.running:
+                return {"running": False, "last_profile": self._last_result}
+            return {
+                "running": True,
+                # 达到 max_seconds 后停止采样，等待 stop() 写出结果
+                "sampling": self._thread.is_alive(),
+                "interval_ms": self._interval * 1000,
+                "max_seconds": self._max_seconds,
+                "elapsed_seconds": round(time.monotonic() - self._started_at, 1),
+                "samples": sum(self._stacks.values()),
+            }
+
+    def start(self, thread_id: int, interval: float, max_seconds: float) -> None:
+        with self._lock:
+            if self.running:
+                raise ProfilerError("Profiler is already running")
+            self._stacks = StackCounter()
+            self._stop.clear()
+            self._interval = interval
+            self._max_seconds = max_seconds
+            self._started_at = time.monotonic()
+            self._thread = threading.Thread(
+                target=self._sample,
+                args=(thread_id,),
+                name="sampling-profiler",
+                daemon=True,
+            )
+            self._thread.start()
+        logger.info(f"Sampling profiler started (interval {interval * 1000:.1f} ms, max {max_seconds} s)")
+
+    def stop(self) -> Dict[str, Any]:
+        """Stop sampling and write the folded stacks; returns the profile info"""
+        with self._lock:
+            if not self.running:
+                raise ProfilerError("Profiler is not running")
+            thread, self._thread = self._thread, None
+            self._stop.set()
+        thread.join()
+
+        duration = time.monotonic() - self._started_at
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        # /static 无需登录即可访问：文件名带随机后缀，只有拿到 stop 返回值的管理员知道地址
+        path = self.output_dir / f"profile-{datetime.now():%Y%m%d-%H%M%S}-{secrets.token_hex(16)}.folded"
+        lines = [f"{stack} {count}" for stack, count in self._stacks.most_common()]
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+        result = {
+            "file": path.name,
+            "path": str(path),
+            "samples": sum(self._stacks.values()),
+            "unique_stacks": len(self._stacks),
+            "duration_seconds": round(duration, 1),
+            "interval_ms": self._interval * 1000,
+        }
+        self._last_result = result
+        logger.info(f"Sampling profiler stopped: {result['samples']} samples written to {path}")
+        return result
+
+    def _sample(self, thread_id: int) -> None:
+        deadline = time.monotonic() + self._max_seconds
+        while not self._stop.wait(self._interval):
+            frame = sys._current_frames().get(thread_id)
+            if frame is None:
+                break
+            self._stacks[_fold(frame)] += 1
+            del frame
+            if time.monotonic() >= deadline:
+                break
+        # 超过最长时长后自动停止采样；数据保留到 stop() 写出
+        self._stop.set()
+
+
+class LoopMonitor:
+    """
+    Measure event-loop lag and report blocking callbacks
+
+    使用示例:
+        monitor = LoopMonitor(interval=LOOP_TICK_INTERVAL, threshold=0.1)
+        monitor.start()  # 在事件循环中调用
+        ...
+        await monitor.stop()
+    """
+
+    def __init__(self, interval: float, threshold: float):
+        self.interval = interval
+        self.threshold = threshold
+        self.max_lag = 0.0
+        self.blocked = 0
+        self.recent_blocks: Deque[Dict[str, Any]] = deque(maxlen=RECENT_BLOCKS)
+        self._last_tick = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._last_tick = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.get_running_loop().create_task(self._tick())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self) -> None:
+        if not self.running:
+            return
+        self._stop.set()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._watchdog.join()
+        self._watchdog = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "interval_ms": self.interval * 1000,
+            "threshold_ms": self.threshold * 1000,
+            "max_lag_ms": round(self.max_lag * 1000, 1),
+            "blocked": self.blocked,
+            "recent_blocks": list(self.recent_blocks),
+        }
+
+    async def _tick(self) -> None:
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - expected)
+            self._last_tick = now
+            self.max_lag = max(self.max_lag, lag)
+            LOOP_LAG.observe(lag)
+
+    def _watch(self) -> None:
+        reported_tick = None
+        while not self._stop.wait(self.threshold / 2):
+            last_tick = self._last_tick
+            stalled = time.monotonic() - last_tick - self.interval
+            # 同一次阻塞只报告一次
+            if stalled < self.threshold or last_tick == reported_tick:
+                continue
+            reported_tick = last_tick
+            self._report_block(stalled)
+
+    def _report_block(self, stalled: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack: List[str] = traceback.format_stack(frame, limit=BLOCK_STACK_LIMIT) if frame else []
+        del frame
+        self.blocked += 1
+        LOOP_BLOCKED.inc()
+        self.recent_blocks.append({
+            "detected_at": datetime.now().isoformat(timespec="seconds"),
+            "blocked_ms": round(stalled * 1000, 1),
+            "stack": [line.rstrip() for line in stack],
+        })
+        logger.warning(
+            f"Event loop blocked for more than {stalled * 1000:.0f} ms:\n" + "".join(stack)
+        )
+
+
+_profiler: Optional[SamplingProfiler] = None
+_loop_monitor: Optional[LoopMonitor] = None
+
+
+def get_profiler() -> SamplingProfiler:
+    """获取全局采样分析器（首次调用时创建）"""
+    global _profiler
+    if _profiler is None:
+        _profiler = SamplingProfiler(STATIC_DIR / "profiles")
+    return _profiler
+
+
+def get_loop_monitor() -> Optional[LoopMonitor]:
+    """获取全局事件循环监控（未启用时为 None）"""
+    return _loop_monitor
+
+
+def set_loop_monitor(monitor: Optional[LoopMonitor]) -> None:
+    """设置全局事件循环监控"""
+    global _loop_monitor
+    _loop_monitor = monitor
@@ -0,0 +1,186 @@
+"""
+Request-scoped SQL instrumentation
+
+SQLAlchemy cursor events attribute every query to the HTTP request that
+issued it (through a ContextVar, which follows the request into the
+AsyncSession greenlet):
+
+- ``Server-Timing: db;dur=12.5;desc="7 queries", app;dur=30.1`` on every
+  response, visible in the browser's network panel.
+- Queries slower than ``SLOW_QUERY_MS`` are logged with their parameters.
+- Running totals per route (``GET /api/v1/logs``) are kept in
+  ``route_stats``, so N+1 patterns show up as a high queries/request ratio.
+"""
+import logging
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from threading import Lock
+from typing import Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core import metrics
+
+logger = logging.getLogger(__name__)
+
+# 慢查询日志中参数的最大长度（避免把大段日志内容写进日志）
+MAX_LOGGED_PARAMS = 500
+
+# conn.info 中保存查询开始时间的键（支持嵌套执行）
+_START_TIMES = "query_stats_start_times"
+
+
+@dataclass
+class RequestQueryStats:
+    """Queries issued while handling one request"""
+    count: int = 0
+    seconds: float = 0.0
+    slow: int = 0
+
+
+@dataclass
+class RouteQueryStats:
+    """Running totals for one route"""
+    requests: int = 0
+    queries: int = 0
+    db_seconds: float = 0.0
+    max_queries: int = 0
+    slow: int = 0
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "requests": self.requests,
+            "queries": self.queries,
+            "queries_per_request": round(self.queries / self.requests, 2) if self.requests else 0,
+            "max_queries": self.max_queries,
+            "db_ms": round(self.db_seconds * 1000, 1),
+            "db_ms_per_request": round(self.db_seconds * 1000 / self.requests, 2) if self.requests else 0,
+            "slow_queries": self.slow,
+        }
+
+
+_current: ContextVar[Optional[RequestQueryStats]] = ContextVar("request_query_stats", default=None)
+
+_route_stats: Dict[str, RouteQueryStats] = {}
+_route_lock = Lock()
+
+# 慢查询阈值（秒），install() 时设置；0 表示不记录
+_slow_seconds = 0.0
+
+
+def _format_params(parameters) -> str:
+    text = repr(parameters)
+    if len(text) > MAX_LOGGED_PARAMS:
+        return text[:MAX_LOGGED_PARAMS] + "..."
+    return text
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(_START_TIMES, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info[_START_TIMES].pop()
+    metrics.observe_query(statement, elapsed)
+    slow = _slow_seconds > 0 and elapsed >= _slow_seconds
+
+    stats = _current.get()
+    if stats is not None:
+        stats.count += 1
+        stats.seconds += elapsed
+        stats.slow += slow
+
+    if slow:
+        logger.warning(
+            f"Slow query ({elapsed * 1000:.1f} ms): {statement} | params: {_format_params(parameters)}"
+        )
+
+
+def install(engine: Engine, slow_query_ms: float) -> None:
+    """
+    Attach the cursor event listeners to a (sync) engine
+
+    使用示例:
+        install(engine.sync_engine, settings.SLOW_QUERY_MS)
+    """
+    global _slow_seconds
+    _slow_seconds = slow_query_ms / 1000
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def current_stats() -> Optional[RequestQueryStats]:
+    """Stats of the request being handled (None outside a request)"""
+    return _current.get()
+
+
+def route_stats() -> List[Dict[str, float]]:
+    """Running totals per route, highest total database time first"""
+    with _route_lock:
+        rows = [{"route": route, **stats.to_dict()} for route, stats in _route_stats.items()]
+    return sorted(rows, key=lambda row: row["db_ms"], reverse=True)
+
+
+def reset_route_stats() -> None:
+    """Clear the running totals"""
+    with _route_lock:
+        _route_stats.clear()
+
+
+def _route_key(scope: Scope) -> str:
+    # 使用路由模板（/api/v1/tasks/{task_id}），避免按具体 ID 分散统计
+    return f"{scope.get('method', '')} {metrics.route_template(scope)}"
+
+
+def _record(scope: Scope, stats: RequestQueryStats) -> None:
+    key = _route_key(scope)
+    with _route_lock:
+        totals = _route_stats.setdefault(key, RouteQueryStats())
+        totals.requests += 1
+        totals.queries += stats.count
+        totals.db_seconds += stats.seconds
+        totals.max_queries = max(totals.max_queries, stats.count)
+        totals.slow += stats.slow
+
+
+class QueryStatsMiddleware:
+    """
+    Track queries per request, add Server-Timing and update route totals
+
+    使用示例:
+        app.add_middleware(QueryStatsMiddleware)
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                app_ms = (time.perf_counter() - started) * 1000
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing",
+                    f'db;dur={stats.seconds * 1000:.1f};desc="{stats.count} queries", app;dur={app_ms:.1f}',
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            # 响应发送后才执行的后台任务（BackgroundTasks）也计入路由统计
+            _record(scope, stats)
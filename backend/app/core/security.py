@@ -1,10 +1,11 @@
 """
 Security and authentication utilities
 """
+import hmac
 from datetime import datetime, timedelta
 from typing import Optional
 
-from fastapi import HTTPException, status
+from fastapi import Header, HTTPException, status
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 
@@ -66,3 +67,50 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Verify a password against its hash
     """
     return pwd_context.verify(plain_password, hashed_password)
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)) -> None:
+    """
+    Dependency for maintenance endpoints
+
+    Requires the X-Admin-Token header to match ADMIN_TOKEN; the endpoints are
+    disabled while ADMIN_TOKEN is not configured.
+    """
+    if not settings.ADMIN_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail={
+                "code": "ADMIN_DISABLED",
+                "message": "Admin endpoints are disabled (ADMIN_TOKEN not set)",
+            },
+        )
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, settings.ADMIN_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail={
+                "code": "UNAUTHORIZED",
+                "message": "Invalid admin token",
+            },
+        )
+
+
+def require_metrics_token(authorization: Optional[str] = Header(None)) -> None:
+    """
+    Dependency for /metrics
+
+    When METRICS_TOKEN is set the scraper must send
+    ``Authorization: Bearer <token>``. Without it the endpoint is open and
+    must only be reachable from the internal network.
+    """
+    if not settings.METRICS_TOKEN:
+        return
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.strip(), settings.METRICS_TOKEN):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail={
+                "code": "UNAUTHORIZED",
+                "message": "Invalid metrics token",
+            },
+            headers={"WWW-Authenticate": "Bearer"},
+        )
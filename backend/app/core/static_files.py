@@ -0,0 +1,224 @@
+"""
+Static file serving with precompressed variants
+
+The /static mount serves execution logs, config files and screenshots. Text
+artifacts compress 10-20x, so next to ``run.log`` we keep ``run.log.br`` /
+``run.log.gz`` (written once by ``precompress_file`` in the background
+after the file is stored, see ``schedule_precompress``) and serve the variant the client accepts:
+
+- No per-request compression: variants are plain files, sent with
+  FileResponse (which uses the ASGI pathsend / sendfile extension when the
+  server provides it).
+- Range requests get the original bytes, so offsets stay meaningful for the
+  log viewer and resumed downloads (FileResponse answers them with 206
+  from Starlette 0.39 on; requirements.txt pins a version that does).
+- Content-addressed paths (``configs/blobs/<sha256>/...``) never change and
+  are marked immutable; everything else is revalidated via ETag.
+
+Backfill existing files with ``python -m app.core.static_files app/static``.
+"""
+import asyncio
+import gzip
+import logging
+import mimetypes
+import os
+import re
+import shutil
+import stat
+import sys
+import uuid
+from pathlib import Path
+from typing import List, Optional, Set
+
+import anyio
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+from starlette.types import Scope
+
+try:
+    import brotli
+except ImportError:  # brotli 可选：未安装时只生成 .gz（已有 .br 文件仍会被使用）
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+# 需要预压缩的文本类产物
+COMPRESSIBLE_SUFFIXES = {".log", ".txt", ".json", ".csv", ".xml", ".html", ".md", ".svg"}
+
+# 小于该大小的文件不压缩（收益不足以抵消额外请求头和文件）
+MIN_COMPRESS_SIZE = 1024
+
+# 压缩后至少节省 10% 才保留变体
+MAX_COMPRESSED_RATIO = 0.9
+
+# 内容寻址路径（内容不会变化），可长期缓存
+IMMUTABLE_PATH_PATTERN = re.compile(r"^configs/blobs/[0-9a-f]{64}/")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+DEFAULT_CACHE_CONTROL = "no-cache"
+
+# Content-Encoding -> 变体后缀（按优先级排列）
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+# 后台预压缩任务（持有引用，避免被垃圾回收）
+_background: Set[asyncio.Task] = set()
+
+
+def is_compressible(path: Path) -> bool:
+    """Whether path is a text artifact worth precompressing"""
+    return path.suffix.lower() in COMPRESSIBLE_SUFFIXES
+
+
+def _write_variant(path: Path, suffix: str, data: bytes) -> Path:
+    variant = path.with_name(path.name + suffix)
+    tmp_path = path.with_name(f".{uuid.uuid4().hex}.tmp")
+    try:
+        tmp_path.write_bytes(data)
+        shutil.copystat(path, tmp_path)
+        os.replace(tmp_path, variant)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return variant
+
+
+def precompress_file(path: Path) -> List[Path]:
+    """
+    Write .br / .gz variants next to a text artifact
+
+    Blocking (CPU + disk): call it in a thread. Variants carry the original's
+    mtime; a variant older than its original is ignored when serving.
+
+    Returns the variants written.
+    """
+    path = Path(path)
+    if not is_compressible(path) or not path.is_file():
+        return []
+    data = path.read_bytes()
+    if len(data) < MIN_COMPRESS_SIZE:
+        return []
+
+    written = []
+    compressed = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        compressed[".br"] = brotli.compress(data, quality=11)
+
+    for suffix, body in compressed.items():
+        if len(body) <= len(data) * MAX_COMPRESSED_RATIO:
+            written.append(_write_variant(path, suffix, body))
+    return written
+
+
+def precompress_tree(root: Path) -> int:
+    """Precompress every text artifact under root; returns files written"""
+    count = 0
+    for path in Path(root).rglob("*"):
+        if path.is_file() and is_compressible(path):
+            count += len(precompress_file(path))
+    return count
+
+
+def _accepted_encodings(accept_encoding: str) -> set:
+    """Content codings the client accepts (q=0 means refused)"""
+    accepted = set()
+    for item in accept_encoding.split(","):
+        coding, _, params = item.partition(";")
+        name, _, value = params.strip().partition("=")
+        try:
+            if name.strip().lower() == "q" and float(value) == 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(coding.strip().lower())
+    return accepted
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles that serves precompressed variants and sets cache headers
+
+    使用示例:
+        app.mount("/static", PrecompressedStaticFiles(directory="app/static"), name="static")
+    """
+
+    def file_response(
+        self,
+        full_path,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        request_headers = Headers(scope=scope)
+        path = Path(full_path)
+        relative = Path(os.path.relpath(full_path, self.directory)).as_posix()
+
+        headers = {
+            "Cache-Control": (
+                IMMUTABLE_CACHE_CONTROL if IMMUTABLE_PATH_PATTERN.match(relative) else DEFAULT_CACHE_CONTROL
+            ),
+        }
+        if is_compressible(path):
+            headers["Vary"] = "Accept-Encoding"
+
+        response = None
+        if status_code == 200 and is_compressible(path) and "range" not in request_headers:
+            response = self._variant_response(path, stat_result, request_headers, headers)
+        if response is None:
+            response = FileResponse(full_path, status_code=status_code, stat_result=stat_result, headers=headers)
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+    def _variant_response(
+        self,
+        path: Path,
+        stat_result: os.stat_result,
+        request_headers: Headers,
+        headers: dict,
+    ) -> Optional[Response]:
+        """FileResponse for the best precompressed variant the client accepts"""
+        accepted = _accepted_encodings(request_headers.get("accept-encoding", ""))
+        for encoding, suffix in ENCODINGS:
+            if encoding not in accepted:
+                continue
+            variant = path.with_name(path.name + suffix)
+            try:
+                variant_stat = variant.stat()
+            except OSError:
+                continue
+            # 原文件被改写后旧变体失效
+            if not stat.S_ISREG(variant_stat.st_mode) or variant_stat.st_mtime < stat_result.st_mtime:
+                continue
+
+            response = FileResponse(
+                variant,
+                stat_result=variant_stat,
+                media_type=mimetypes.guess_type(path.name)[0] or "text/plain",
+                headers={**headers, "Content-Encoding": encoding},
+            )
+            # 不同编码的 ETag 必须不同
+            response.headers["etag"] = response.headers["etag"][:-1] + f'-{encoding}"'
+            return response
+        return None
+
+
+async def precompress_in_background(path: Path) -> None:
+    """Precompress path in a worker thread, logging instead of raising"""
+    try:
+        await anyio.to_thread.run_sync(precompress_file, path)
+    except OSError as e:
+        logger.warning(f"Precompress failed for {path}: {e}")
+
+
+def schedule_precompress(path: Path) -> None:
+    """Precompress a stored text artifact without delaying the caller"""
+    if not is_compressible(path):
+        return
+    task = asyncio.ensure_future(precompress_in_background(path))
+    _background.add(task)
+    task.add_done_callback(_background.discard)
+
+
+if __name__ == "__main__":
+    root = Path(sys.argv[1] if len(sys.argv) > 1 else "app/static")
+    print(f"Precompressed {precompress_tree(root)} file(s) under {root}")
@@ -7,17 +7,29 @@ from pathlib import Path
 from contextlib import asynccontextmanager
 from typing import AsyncGenerator
 
-from fastapi import FastAPI, HTTPException, Request, status
+from fastapi import Depends, FastAPI, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import JSONResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi.responses import JSONResponse, Response
 from sqlalchemy import text
 
 from app.core.config import get_settings
-from app.core.database import engine
+from app.core.database import Base, engine
+from app.core.compression import CompressionMiddleware
+from app.core import metrics
+from app.core.http_client import close_http_client
+from app.core.profiler import LOOP_TICK_INTERVAL, LoopMonitor, get_loop_monitor, set_loop_monitor
+from app.core.query_stats import QueryStatsMiddleware
+from app.core.responses import default_response_class
+from app.core.security import require_metrics_token
+from app.core.static_files import PrecompressedStaticFiles
+from app.models.cache_version import CacheVersion
+from app.models.config_blob import ConfigBlob, TaskConfigRef
 from app.api.v1 import router as api_v1_router
+from app.services.sse_broker import create_broker
 from app.services.sse_service import set_sse_service, get_sse_service, SSEService
+from app.services.storage_service import shutdown_storage_executor
+from app.services.thumbnail_service import shutdown_thumbnail_service
 
 settings = get_settings()
 
@@ -42,14 +54,38 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
 
     # Initialize SSE service
     global sse_service
-    sse_service = SSEService()
+    sse_service = SSEService(
+        queue_size=settings.SSE_CLIENT_QUEUE_SIZE,
+        broker=create_broker(settings),
+    )
+    await sse_service.start()
     set_sse_service(sse_service)
-    print("✅ SSE service initialized")
+    print(f"✅ SSE service initialized (broker: {sse_service.broker.name})")
+
+    # 事件循环延迟监控（阻塞超过阈值时记录调用栈）
+    if settings.LOOP_BLOCK_THRESHOLD_MS > 0:
+        monitor = LoopMonitor(
+            interval=LOOP_TICK_INTERVAL,
+            threshold=settings.LOOP_BLOCK_THRESHOLD_MS / 1000,
+        )
+        monitor.start()
+        set_loop_monitor(monitor)
+        print("✅ Event loop monitor started")
 
     # Test database connection
     try:
         async with engine.begin() as conn:
             await conn.execute(text("SELECT 1"))
+            # 新增的表：未执行迁移的旧库也能直接使用
+            await conn.run_sync(
+                Base.metadata.create_all,
+                tables=[
+                    CacheVersion.__table__,
+                    ConfigBlob.__table__,
+                    TaskConfigRef.__table__,
+                ],
+                checkfirst=True,
+            )
         print("✅ Database connected successfully")
     except Exception as e:
         print(f"❌ Database connection failed: {e}")
@@ -63,6 +99,12 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
 
     # Shutdown
     print("🛑 Shutting down RPA Workbench Backend...")
+    if get_loop_monitor():
+        await get_loop_monitor().stop()
+    await sse_service.close()
+    await close_http_client()
+    shutdown_storage_executor()
+    shutdown_thumbnail_service()
     await engine.dispose()
     print("✅ Shutdown complete")
 
@@ -73,6 +115,8 @@ app = FastAPI(
     description="RPA Workbench Backend API - Robot Process Automation Management Platform",
     version="1.0.0",
     lifespan=lifespan,
+    # orjson 序列化（新版 FastAPI 已用 pydantic-core 直接输出 JSON 时保持默认）
+    default_response_class=default_response_class(),
     docs_url=f"{settings.API_V1_STR}/docs",
     redoc_url=f"{settings.API_V1_STR}/redoc",
     openapi_url=f"{settings.API_V1_STR}/openapi.json",
@@ -94,6 +138,15 @@ app.add_middleware(
     allowed_hosts=["*"],
 )
 
+# 响应压缩（br/gzip 协商，1 KB 以下不压缩，SSE 不压缩）
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+# 按请求统计 SQL 次数/耗时（Server-Timing 响应头 + 路由累计，见 /api/v1/admin/query-stats）
+app.add_middleware(QueryStatsMiddleware)
+
+# Prometheus 指标：按路由的请求数和耗时（见 /metrics）
+app.add_middleware(metrics.MetricsMiddleware)
+
 
 @app.get("/")
 async def root() -> dict:
@@ -133,11 +186,22 @@ async def health_check() -> dict:
         )
 
 
+@app.get("/metrics", include_in_schema=False, dependencies=[Depends(require_metrics_token)])
+async def prometheus_metrics() -> Response:
+    """
+    Prometheus metrics (API latency, DB, SSE and proxy internals)
+
+    Protected by METRICS_TOKEN (Bearer) when set; otherwise expose it only
+    on the internal network.
+    """
+    return Response(content=metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+
 # Include API routers
 app.include_router(api_v1_router)
 
-# 挂载静态文件目录（用于截图和日志文件访问）
-app.mount("/static", StaticFiles(directory="app/static"), name="static")
+# 挂载静态文件目录（用于截图和日志文件访问，文本文件优先返回预压缩的 .br/.gz）
+app.mount("/static", PrecompressedStaticFiles(directory="app/static"), name="static")
 
 
 # Global exception handler
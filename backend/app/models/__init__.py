@@ -6,11 +6,16 @@ from .account import Account
 from .task import Task
 from .execution_log import ExecutionLog
 from .user import User
+from .cache_version import CacheVersion
+from .config_blob import ConfigBlob, TaskConfigRef
 
 __all__ = [
     "Account",
     "Task",
     "ExecutionLog",
     "User",
+    "CacheVersion",
+    "ConfigBlob",
+    "TaskConfigRef",
     "Base",
 ]
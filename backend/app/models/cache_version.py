@@ -0,0 +1,24 @@
+"""
+CacheVersion model
+"""
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, Integer
+
+from app.core.database import Base
+
+
+class CacheVersion(Base):
+    """Shared version counters for in-process caches
+
+    Each worker compares its cached version with this table to detect
+    changes made by other workers.
+    """
+
+    __tablename__ = "cache_versions"
+
+    name = Column(String(50), primary_key=True)
+    version = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<CacheVersion(name={self.name}, version={self.version})>"
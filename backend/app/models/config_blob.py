@@ -0,0 +1,41 @@
+"""
+ConfigBlob / TaskConfigRef models
+"""
+from datetime import datetime
+from sqlalchemy import Column, String, DateTime, Integer, ForeignKey
+
+from app.core.database import Base
+
+
+class ConfigBlob(Base):
+    """Uploaded config file, stored once per content hash"""
+
+    __tablename__ = "config_blobs"
+
+    # 内容 SHA-256（十六进制）
+    id = Column(String(64), primary_key=True)
+    # 存储位置: oss / local
+    storage = Column(String(10), nullable=False)
+    # OSS object key 或本地相对路径
+    object_key = Column(String(500), nullable=False)
+    # 写入 task.config_file_path 的 URL
+    url = Column(String(500), nullable=False, unique=True)
+    filename = Column(String(255), nullable=True)
+    size = Column(Integer, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<ConfigBlob(id={self.id}, url={self.url})>"
+
+
+class TaskConfigRef(Base):
+    """Which config blob each task uses (one config file per task)"""
+
+    __tablename__ = "task_config_refs"
+
+    task_id = Column(String(36), ForeignKey("tasks.id", ondelete="CASCADE"), primary_key=True)
+    blob_id = Column(String(64), ForeignKey("config_blobs.id"), nullable=False, index=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<TaskConfigRef(task_id={self.task_id}, blob_id={self.blob_id})>"
@@ -4,6 +4,7 @@ ExecutionLog model
 from datetime import datetime
 from sqlalchemy import Column, String, DateTime, Enum, Boolean, DECIMAL, Index, Text
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import column_property
 import uuid
 
 from app.core.database import Base
@@ -31,6 +32,9 @@ class ExecutionLog(Base):
     log_content = Column(Text, nullable=True, comment="详细日志内容")
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
+    # 列表视图用的标记列（不读取 log_content 本身），仅在列投影中使用
+    has_log_content = column_property(log_content.isnot(None), deferred=True)
+
     # Indexes
     __table_args__ = (
         Index("idx_logs_shadow_bot", "shadow_bot_account"),
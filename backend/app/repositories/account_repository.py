@@ -1,12 +1,12 @@
 """
 Account repository
 """
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Sequence, Set
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func
+from sqlalchemy import select, update, and_, or_, func
 
 from app.models.account import Account
-from app.repositories.base import BaseRepository
+from app.repositories.base import BaseRepository, Page, BULK_CHUNK_SIZE
 
 
 class AccountRepository(BaseRepository[Account, dict, dict]):
@@ -27,7 +27,7 @@ class AccountRepository(BaseRepository[Account, dict, dict]):
             )
             return result.scalar_one_or_none()
         except Exception as e:
-            await self.db.rollback()
+            await self._rollback()
             raise
 
     async def get_by_shadow_bot_account_list(self, shadow_bot_account: str) -> List[Account]:
@@ -40,7 +40,30 @@ class AccountRepository(BaseRepository[Account, dict, dict]):
             )
             return result.scalars().all()
         except Exception as e:
-            await self.db.rollback()
+            await self._rollback()
+            raise
+
+    async def update_by_shadow_bot_account(
+        self,
+        shadow_bot_account: str,
+        values: Dict[str, Any],
+    ) -> int:
+        """
+        Update every account with this shadow bot account name in one UPDATE
+
+        Nothing is loaded back; returns the number of rows updated.
+        """
+        try:
+            result = await self.db.execute(
+                update(Account)
+                .where(Account.shadow_bot_account == shadow_bot_account)
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            await self._commit()
+            return result.rowcount
+        except Exception as e:
+            await self._rollback()
             raise
 
     async def get_by_host_ip(self, host_ip: str) -> Optional[Account]:
@@ -53,7 +76,7 @@ class AccountRepository(BaseRepository[Account, dict, dict]):
             )
             return result.scalar_one_or_none()
         except Exception as e:
-            await self.db.rollback()
+            await self._rollback()
             raise
 
     async def get_by_task_control(self, task_control: str) -> Optional[Account]:
@@ -66,35 +89,88 @@ class AccountRepository(BaseRepository[Account, dict, dict]):
             )
             return result.scalar_one_or_none()
         except Exception as e:
-            await self.db.rollback()
+            await self._rollback()
+            raise
+
+    async def get_existing_task_controls(self, task_controls: List[str]) -> Set[str]:
+        """
+        Return which of the given task_control values already exist
+        """
+        try:
+            existing: Set[str] = set()
+            for start in range(0, len(task_controls), BULK_CHUNK_SIZE):
+                chunk = task_controls[start:start + BULK_CHUNK_SIZE]
+                result = await self.db.execute(
+                    select(Account.task_control).where(Account.task_control.in_(chunk))
+                )
+                existing.update(result.scalars().all())
+            return existing
+        except Exception as e:
+            await self._rollback()
+            raise
+
+    async def get_task_control_map(self) -> Dict[str, str]:
+        """
+        Map every task_control to its account ID (one query, for imports)
+        """
+        try:
+            result = await self.db.execute(select(Account.task_control, Account.id))
+            return {task_control: id for task_control, id in result.all()}
+        except Exception as e:
+            await self._rollback()
             raise
 
+    def _search_conditions(self, search_term: Optional[str] = None) -> list:
+        """
+        WHERE conditions shared by search, count_search and search_page
+        """
+        if not search_term:
+            return []
+        return [
+            or_(
+                Account.shadow_bot_account.ilike(f"%{search_term}%"),
+                Account.host_ip.ilike(f"%{search_term}%"),
+            )
+        ]
+
     async def search(
         self,
         search_term: Optional[str] = None,
         skip: int = 0,
         limit: int = 100,
+        columns: Optional[Sequence[str]] = None,
     ) -> List[Account]:
         """
         Search accounts by shadow_bot_account or host_ip
+
+        With columns, returns dicts of only those columns.
         """
         try:
-            query = select(Account)
-
-            if search_term:
-                query = query.where(
-                    or_(
-                        Account.shadow_bot_account.ilike(f"%{search_term}%"),
-                        Account.host_ip.ilike(f"%{search_term}%"),
-                    )
-                )
-
+            query = self._select(columns).where(*self._search_conditions(search_term))
             query = query.offset(skip).limit(limit)
 
             result = await self.db.execute(query)
-            return result.scalars().all()
+            return self._rows(result, columns)
         except Exception as e:
-            await self.db.rollback()
+            await self._rollback()
+            raise
+
+    async def search_page(
+        self,
+        search_term: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100,
+        columns: Optional[Sequence[str]] = None,
+        count_cap: Optional[int] = None,
+    ) -> Page:
+        """
+        search() and count_search() in one query
+        """
+        try:
+            query = self._select(columns).where(*self._search_conditions(search_term))
+            return await self._paginate(query, skip, limit, columns, count_cap)
+        except Exception as e:
+            await self._rollback()
             raise
 
     async def count_search(self, search_term: Optional[str] = None) -> int:
@@ -102,20 +178,12 @@ class AccountRepository(BaseRepository[Account, dict, dict]):
         Count accounts matching search criteria
         """
         try:
-            query = select(func.count(Account.id))
-
-            if search_term:
-                query = query.where(
-                    or_(
-                        Account.shadow_bot_account.ilike(f"%{search_term}%"),
-                        Account.host_ip.ilike(f"%{search_term}%"),
-                    )
-                )
+            query = select(func.count(Account.id)).where(*self._search_conditions(search_term))
 
             result = await self.db.execute(query)
             return result.scalar_one()
         except Exception as e:
-            await self.db.rollback()
+            await self._rollback()
             raise
 
     async def get_by_status(self, status: str) -> List[Account]:
@@ -128,7 +196,7 @@ class AccountRepository(BaseRepository[Account, dict, dict]):
             )
             return result.scalars().all()
         except Exception as e:
-            await self.db.rollback()
+            await self._rollback()
             raise
 
     async def get_by_task_count(self, min_count: int = 0) -> List[Account]:
@@ -142,5 +210,5 @@ class AccountRepository(BaseRepository[Account, dict, dict]):
             result = await self.db.execute(select(Account))
             return result.scalars().all()
         except Exception as e:
-            await self.db.rollback()
+            await self._rollback()
             raise
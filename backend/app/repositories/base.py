@@ -1,17 +1,31 @@
 """
 Base repository class
 """
-from typing import Generic, Type, TypeVar, Optional, List, Dict, Any
+from typing import Generic, Type, TypeVar, Optional, List, Dict, Any, NamedTuple, Sequence, Set
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete, func
+from sqlalchemy import Result, Select, literal, select, insert, update, delete, func
 from sqlalchemy.exc import SQLAlchemyError
 
-from app.core.database import Base
+from app.core.database import Base, in_unit_of_work
 
 ModelType = TypeVar("ModelType", bound=Base)
+
+# IN (...) 列表分批大小，避免超出 SQLite 参数上限
+BULK_CHUNK_SIZE = 500
 CreateSchemaType = TypeVar("CreateSchemaType")
 UpdateSchemaType = TypeVar("UpdateSchemaType")
 
+# 分页查询中总数列的列名（不会与模型字段重名）
+TOTAL_COLUMN = "_total_count"
+
+
+class Page(NamedTuple):
+    """One page of rows plus the total number of matching rows"""
+    items: list
+    total: int
+    # True: total 是上限值，实际匹配行数更多
+    capped: bool = False
+
 
 class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
     """
@@ -25,26 +39,129 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         self.model = model
         self.db = db
 
+    async def _commit(self) -> None:
+        """
+        Commit the write, or only flush it inside a unit of work
+
+        The unit of work commits once when the whole service operation is done.
+        """
+        if in_unit_of_work(self.db):
+            await self.db.flush()
+        else:
+            await self.db.commit()
+
+    async def _rollback(self) -> None:
+        """
+        Roll back on error, unless a unit of work owns the transaction
+        """
+        if not in_unit_of_work(self.db):
+            await self.db.rollback()
+
+    def _select(self, columns: Optional[Sequence[str]] = None) -> Select:
+        """
+        select(model), or a projection of the named columns
+
+        Projections return plain dicts instead of ORM instances: no identity
+        map, no attribute instrumentation. Use them for read-only lists.
+        """
+        if columns:
+            return select(*(getattr(self.model, name) for name in columns))
+        return select(self.model)
+
+    @staticmethod
+    def _rows(result: Result, columns: Optional[Sequence[str]] = None) -> list:
+        """
+        ORM instances, or plain dicts for a column projection
+        """
+        if columns:
+            # dict(zip()) 比 Row._mapping / RowMapping 转 dict 快数倍
+            keys = list(result.keys())
+            return [dict(zip(keys, row)) for row in result.all()]
+        return result.scalars().all()
+
+    def _apply_filters(self, query: Select, filters: Optional[Dict[str, Any]] = None) -> Select:
+        """
+        Add equality conditions for filters that name model attributes
+        """
+        if filters:
+            for key, value in filters.items():
+                if hasattr(self.model, key):
+                    query = query.where(getattr(self.model, key) == value)
+        return query
+
+    async def _paginate(
+        self,
+        query: Select,
+        skip: int,
+        limit: int,
+        columns: Optional[Sequence[str]] = None,
+        count_cap: Optional[int] = None,
+    ) -> Page:
+        """
+        Rows of one page and the total in a single statement
+
+        The total is an uncorrelated scalar subquery next to the page
+        columns (evaluated once per statement). COUNT(*) OVER() is not used:
+        the window has to materialize and sort every matching row, which
+        defeats the index-ordered LIMIT early exit (3-40x slower on SQLite).
+
+        With count_cap the count stops after count_cap + 1 matches, so
+        large tables cost one bounded scan; a larger result is reported as
+        Page(total=count_cap, capped=True) ("10000+").
+        """
+        matched = query.with_only_columns(literal(1), maintain_column_froms=True).order_by(None)
+        if count_cap:
+            matched = matched.limit(count_cap + 1)
+        total_column = select(func.count()).select_from(matched.subquery()).scalar_subquery()
+
+        result = await self.db.execute(
+            query.add_columns(total_column.label(TOTAL_COLUMN)).offset(skip).limit(limit)
+        )
+        rows = result.all()
+        if columns:
+            keys = list(result.keys())
+            items = [dict(zip(keys, row)) for row in rows]
+            for item in items:
+                del item[TOTAL_COLUMN]
+        else:
+            items = [row[0] for row in rows]
+
+        if rows:
+            total = rows[0][-1]
+        elif skip > 0:
+            # 页码越界时没有返回行，单独计数
+            total = (await self.db.execute(select(func.count()).select_from(matched.subquery()))).scalar_one()
+        else:
+            total = 0
+
+        if count_cap and total > count_cap:
+            return Page(items, count_cap, capped=True)
+        return Page(items, total)
+
+    def _to_create_data(self, obj_in: CreateSchemaType) -> Dict[str, Any]:
+        """
+        Convert create input to a column dict
+        """
+        # Convert Pydantic model to dict
+        if hasattr(obj_in, "model_dump"):
+            return obj_in.model_dump()
+        elif isinstance(obj_in, dict):
+            return obj_in
+        else:
+            return obj_in.__dict__
+
     async def create(self, obj_in: CreateSchemaType) -> ModelType:
         """
         Create a new record
         """
         try:
-            # Convert Pydantic model to dict
-            if hasattr(obj_in, "model_dump"):
-                obj_data = obj_in.model_dump()
-            elif isinstance(obj_in, dict):
-                obj_data = obj_in
-            else:
-                obj_data = obj_in.__dict__
-
-            db_obj = self.model(**obj_data)
+            db_obj = self.model(**self._to_create_data(obj_in))
             self.db.add(db_obj)
-            await self.db.commit()
+            await self._commit()
             await self.db.refresh(db_obj)
             return db_obj
         except SQLAlchemyError as e:
-            await self.db.rollback()
+            await self._rollback()
             raise
 
     async def get(self, id: str) -> Optional[ModelType]:
@@ -57,7 +174,7 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             )
             return result.scalar_one_or_none()
         except SQLAlchemyError as e:
-            await self.db.rollback()
+            await self._rollback()
             raise
 
     async def get_multi(
@@ -65,54 +182,98 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         skip: int = 0,
         limit: int = 100,
         filters: Optional[Dict[str, Any]] = None,
+        columns: Optional[Sequence[str]] = None,
     ) -> List[ModelType]:
         """
         Get multiple records with pagination and filters
+
+        With columns, returns dicts of only those columns.
         """
         try:
-            query = select(self.model)
-
-            # Apply filters
-            if filters:
-                for key, value in filters.items():
-                    if hasattr(self.model, key):
-                        query = query.where(getattr(self.model, key) == value)
+            query = self._apply_filters(self._select(columns), filters)
 
             # Apply pagination
             query = query.offset(skip).limit(limit)
 
             result = await self.db.execute(query)
-            return result.scalars().all()
+            return self._rows(result, columns)
         except SQLAlchemyError as e:
-            await self.db.rollback()
+            await self._rollback()
+            raise
+
+    async def get_page(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        filters: Optional[Dict[str, Any]] = None,
+        columns: Optional[Sequence[str]] = None,
+        count_cap: Optional[int] = None,
+    ) -> Page:
+        """
+        get_multi() and count() in one query
+
+        See _paginate() for count_cap.
+        """
+        try:
+            query = self._apply_filters(self._select(columns), filters)
+            return await self._paginate(query, skip, limit, columns, count_cap)
+        except SQLAlchemyError as e:
+            await self._rollback()
             raise
 
+    def _to_update_data(self, obj_in: UpdateSchemaType) -> Dict[str, Any]:
+        """
+        Convert update input to a column dict, dropping None values
+        """
+        # Convert Pydantic model to dict
+        if hasattr(obj_in, "model_dump"):
+            update_data = obj_in.model_dump(exclude_unset=True)
+        elif isinstance(obj_in, dict):
+            update_data = obj_in
+        else:
+            update_data = obj_in.__dict__
+
+        # Remove None values
+        return {k: v for k, v in update_data.items() if v is not None}
+
+    def _supports_update_returning(self) -> bool:
+        """
+        Whether the database supports UPDATE ... RETURNING
+
+        True for SQLite 3.35+ and PostgreSQL.
+        """
+        return self.db.get_bind().dialect.update_returning
+
     async def update(
         self,
         id: str,
         obj_in: UpdateSchemaType,
     ) -> Optional[ModelType]:
         """
-        Update a record
+        Update a record and return it
+
+        Uses UPDATE ... RETURNING when available, so the row comes back
+        in the same round trip instead of a follow-up SELECT.
         """
         try:
-            # Convert Pydantic model to dict
-            if hasattr(obj_in, "model_dump"):
-                update_data = obj_in.model_dump(exclude_unset=True)
-            elif isinstance(obj_in, dict):
-                update_data = obj_in
-            else:
-                update_data = obj_in.__dict__
+            update_data = self._to_update_data(obj_in)
+            if not update_data:
+                return await self.get(id)
 
-            # Remove None values
-            update_data = {k: v for k, v in update_data.items() if v is not None}
-
-            await self.db.execute(
+            stmt = (
                 update(self.model)
                 .where(self.model.id == id)
                 .values(**update_data)
             )
-            await self.db.commit()
+
+            if self._supports_update_returning():
+                result = await self.db.execute(stmt.returning(self.model))
+                db_obj = result.scalar_one_or_none()
+                await self._commit()
+                return db_obj
+
+            await self.db.execute(stmt)
+            await self._commit()
 
             # Get updated record
             result = await self.db.execute(
@@ -120,7 +281,34 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             )
             return result.scalar_one_or_none()
         except SQLAlchemyError as e:
-            await self.db.rollback()
+            await self._rollback()
+            raise
+
+    async def update_no_fetch(
+        self,
+        id: str,
+        obj_in: UpdateSchemaType,
+    ) -> bool:
+        """
+        Update a record without loading it back
+
+        For fire-and-forget callers (heartbeat, webhook status sync).
+        Returns whether a row matched.
+        """
+        try:
+            update_data = self._to_update_data(obj_in)
+            if not update_data:
+                return False
+
+            result = await self.db.execute(
+                update(self.model)
+                .where(self.model.id == id)
+                .values(**update_data)
+            )
+            await self._commit()
+            return result.rowcount > 0
+        except SQLAlchemyError as e:
+            await self._rollback()
             raise
 
     async def delete(self, id: str) -> bool:
@@ -131,10 +319,10 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
             result = await self.db.execute(
                 delete(self.model).where(self.model.id == id)
             )
-            await self.db.commit()
+            await self._commit()
             return result.rowcount > 0
         except SQLAlchemyError as e:
-            await self.db.rollback()
+            await self._rollback()
             raise
 
     async def count(self, filters: Optional[Dict[str, Any]] = None) -> int:
@@ -142,16 +330,122 @@ class BaseRepository(Generic[ModelType, CreateSchemaType, UpdateSchemaType]):
         Count records with optional filters
         """
         try:
-            query = select(func.count(self.model.id))
-
-            # Apply filters
-            if filters:
-                for key, value in filters.items():
-                    if hasattr(self.model, key):
-                        query = query.where(getattr(self.model, key) == value)
+            query = self._apply_filters(select(func.count(self.model.id)), filters)
 
             result = await self.db.execute(query)
             return result.scalar_one()
         except SQLAlchemyError as e:
-            await self.db.rollback()
+            await self._rollback()
+            raise
+
+    async def get_many(self, ids: List[str]) -> List[ModelType]:
+        """
+        Get records by a list of IDs
+        """
+        try:
+            items: List[ModelType] = []
+            for start in range(0, len(ids), BULK_CHUNK_SIZE):
+                chunk = ids[start:start + BULK_CHUNK_SIZE]
+                result = await self.db.execute(
+                    select(self.model).where(self.model.id.in_(chunk))
+                )
+                items.extend(result.scalars().all())
+            return items
+        except SQLAlchemyError as e:
+            await self._rollback()
+            raise
+
+    async def _existing_ids(self, ids: List[str]) -> Set[str]:
+        """IDs from the list that exist (only the id column is loaded)"""
+        existing: Set[str] = set()
+        for start in range(0, len(ids), BULK_CHUNK_SIZE):
+            chunk = ids[start:start + BULK_CHUNK_SIZE]
+            result = await self.db.execute(
+                select(self.model.id).where(self.model.id.in_(chunk))
+            )
+            existing.update(result.scalars().all())
+        return existing
+
+    async def bulk_create(self, objs_in: List[CreateSchemaType]) -> List[ModelType]:
+        """
+        Create many records with a single multi-row INSERT
+
+        Rows come back in input order via INSERT ... RETURNING; dialects
+        without RETURNING fall back to an executemany flush.
+        """
+        if not objs_in:
+            return []
+
+        try:
+            rows = [self._to_create_data(obj_in) for obj_in in objs_in]
+
+            if self.db.get_bind().dialect.insert_returning:
+                result = await self.db.execute(
+                    insert(self.model).returning(
+                        self.model, sort_by_parameter_order=True
+                    ),
+                    rows,
+                )
+                db_objs = list(result.scalars().all())
+            else:
+                db_objs = [self.model(**row) for row in rows]
+                self.db.add_all(db_objs)
+
+            await self._commit()
+            return db_objs
+        except SQLAlchemyError as e:
+            await self._rollback()
+            raise
+
+    async def bulk_update(self, objs_in: List[Dict[str, Any]]) -> int:
+        """
+        Update many records keyed by id with one executemany UPDATE
+
+        Each item must contain "id"; None values are ignored like in update().
+        Items whose id does not exist are skipped. Rows are not loaded back.
+        Returns the number of distinct records updated.
+        """
+        rows = []
+        for obj_in in objs_in:
+            update_data = self._to_update_data(obj_in)
+            if "id" in update_data and len(update_data) > 1:
+                rows.append(update_data)
+
+        if not rows:
+            return 0
+
+        try:
+            existing_ids = await self._existing_ids([row["id"] for row in rows])
+            rows = [row for row in rows if row["id"] in existing_ids]
+            if rows:
+                await self.db.execute(update(self.model), rows)
+            await self._commit()
+            return len({row["id"] for row in rows})
+        except SQLAlchemyError as e:
+            await self._rollback()
+            raise
+
+    async def bulk_delete(self, ids: List[str]) -> int:
+        """
+        Delete many records by ID
+
+        Returns the number of rows deleted.
+        """
+        if not ids:
+            return 0
+
+        try:
+            deleted = 0
+            for start in range(0, len(ids), BULK_CHUNK_SIZE):
+                chunk = ids[start:start + BULK_CHUNK_SIZE]
+                result = await self.db.execute(
+                    delete(self.model)
+                    .where(self.model.id.in_(chunk))
+                    .execution_options(synchronize_session=False)
+                )
+                deleted += result.rowcount
+            await self._commit()
+            return deleted
+        except SQLAlchemyError as e:
+            await self._rollback()
             raise
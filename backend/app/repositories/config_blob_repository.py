@@ -0,0 +1,112 @@
+"""
+Config blob repository
+"""
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import and_, delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.config_blob import ConfigBlob, TaskConfigRef
+from app.models.task import Task
+from app.repositories.base import BaseRepository, BULK_CHUNK_SIZE
+
+
+class ConfigBlobRepository(BaseRepository[ConfigBlob, dict, dict]):
+    """
+    Repository for deduplicated config files and their task references
+    """
+
+    def __init__(self, db: AsyncSession):
+        super().__init__(ConfigBlob, db)
+
+    async def get_url_map(self, urls: List[str]) -> Dict[str, str]:
+        """
+        Map blob URLs to blob IDs (URLs that are not blobs are omitted)
+        """
+        try:
+            url_map = {}
+            unique_urls = list(set(urls))
+            for i in range(0, len(unique_urls), BULK_CHUNK_SIZE):
+                result = await self.db.execute(
+                    select(ConfigBlob.url, ConfigBlob.id).where(
+                        ConfigBlob.url.in_(unique_urls[i:i + BULK_CHUNK_SIZE])
+                    )
+                )
+                url_map.update(dict(result.all()))
+            return url_map
+        except Exception as e:
+            await self._rollback()
+            raise
+
+    async def set_task_refs(self, refs: Dict[str, Optional[str]]) -> None:
+        """
+        Replace the blob reference of each task (task_id -> blob_id or None)
+        """
+        if not refs:
+            return
+        try:
+            task_ids = list(refs)
+            for i in range(0, len(task_ids), BULK_CHUNK_SIZE):
+                await self.db.execute(
+                    delete(TaskConfigRef).where(
+                        TaskConfigRef.task_id.in_(task_ids[i:i + BULK_CHUNK_SIZE])
+                    )
+                )
+
+            rows = [
+                {"task_id": task_id, "blob_id": blob_id}
+                for task_id, blob_id in refs.items()
+                if blob_id
+            ]
+            if rows:
+                self.db.add_all([TaskConfigRef(**row) for row in rows])
+            await self._commit()
+        except Exception as e:
+            await self._rollback()
+            raise
+
+    async def get_unreferenced(self, created_before: datetime) -> List[ConfigBlob]:
+        """
+        Blobs older than created_before that no existing task uses
+
+        A blob counts as used if a live task references it in task_config_refs
+        or still has its URL in config_file_path (tasks saved before the
+        reference table existed).
+        """
+        try:
+            referenced = (
+                select(TaskConfigRef.blob_id)
+                .join(Task, Task.id == TaskConfigRef.task_id)
+            )
+            in_use_urls = select(Task.config_file_path).where(Task.config_file_path.is_not(None))
+            result = await self.db.execute(
+                select(ConfigBlob).where(
+                    and_(
+                        ConfigBlob.created_at < created_before,
+                        ConfigBlob.id.not_in(referenced),
+                        ConfigBlob.url.not_in(in_use_urls),
+                    )
+                )
+            )
+            return result.scalars().all()
+        except Exception as e:
+            await self._rollback()
+            raise
+
+    async def delete_blobs(self, blob_ids: List[str]) -> int:
+        """
+        Delete blob rows and any references left by deleted tasks
+        """
+        try:
+            count = 0
+            for i in range(0, len(blob_ids), BULK_CHUNK_SIZE):
+                chunk = blob_ids[i:i + BULK_CHUNK_SIZE]
+                await self.db.execute(delete(TaskConfigRef).where(TaskConfigRef.blob_id.in_(chunk)))
+                result = await self.db.execute(delete(ConfigBlob).where(ConfigBlob.id.in_(chunk)))
+                count += result.rowcount
+            await self._commit()
+            return count
+        except Exception as e:
+            await self._rollback()
+            raise
@@ -1,12 +1,12 @@
 """
 ExecutionLog repository
 """
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Sequence
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_, or_, func, desc, text
 
 from app.models.execution_log import ExecutionLog
-from app.repositories.base import BaseRepository
+from app.repositories.base import BaseRepository, Page
 
 
 class ExecutionLogRepository(BaseRepository[ExecutionLog, dict, dict]):
@@ -29,7 +29,7 @@ class ExecutionLogRepository(BaseRepository[ExecutionLog, dict, dict]):
             )
             return result.scalars().all()
         except Exception as e:
-            await self.db.rollback()
+            await self._rollback()
             raise
 
     async def get_by_app_name(self, app_name: str) -> List[ExecutionLog]:
@@ -44,7 +44,7 @@ class ExecutionLogRepository(BaseRepository[ExecutionLog, dict, dict]):
             )
             return result.scalars().all()
         except Exception as e:
-            await self.db.rollback()
+            await self._rollback()
             raise
 
     async def get_by_status(self, status: str) -> List[ExecutionLog]:
@@ -59,9 +59,59 @@ class ExecutionLogRepository(BaseRepository[ExecutionLog, dict, dict]):
             )
             return result.scalars().all()
         except Exception as e:
-            await self.db.rollback()
+            await self._rollback()
             raise
 
+    def _search_conditions(
+        self,
+        search_term: Optional[str] = None,
+        status: Optional[str] = None,
+    ) -> list:
+        """
+        WHERE conditions shared by search, count_search and search_page
+        """
+        conditions = []
+        if search_term:
+            conditions.append(
+                or_(
+                    ExecutionLog.text.ilike(f"%{search_term}%"),
+                    ExecutionLog.app_name.ilike(f"%{search_term}%"),
+                    ExecutionLog.shadow_bot_account.ilike(f"%{search_term}%"),
+                    ExecutionLog.host_ip.ilike(f"%{search_term}%"),
+                    ExecutionLog.id.ilike(f"%{search_term}%"),
+                )
+            )
+        if status:
+            conditions.append(ExecutionLog.status == status)
+        return conditions
+
+    def _search_query(
+        self,
+        search_term: Optional[str] = None,
+        status: Optional[str] = None,
+        sort_by: str = "start_time",
+        order: str = "desc",
+        columns: Optional[Sequence[str]] = None,
+    ):
+        """
+        Filtered and sorted select (without pagination)
+        """
+        from sqlalchemy import asc
+
+        # 验证排序字段是否允许
+        allowed_fields = ["start_time", "created_at", "duration", "end_time"]
+        if sort_by not in allowed_fields:
+            sort_by = "start_time"
+
+        # 构建排序表达式
+        sort_column = getattr(ExecutionLog, sort_by)
+        if order == "desc":
+            query = self._select(columns).order_by(desc(sort_column))
+        else:
+            query = self._select(columns).order_by(asc(sort_column))
+
+        return query.where(*self._search_conditions(search_term, status))
+
     async def search(
         self,
         search_term: Optional[str] = None,
@@ -70,45 +120,42 @@ class ExecutionLogRepository(BaseRepository[ExecutionLog, dict, dict]):
         limit: int = 100,
         sort_by: str = "start_time",
         order: str = "desc",
+        columns: Optional[Sequence[str]] = None,
     ) -> List[ExecutionLog]:
         """
         Search logs by multiple criteria with sorting support
+
+        With columns, returns dicts of only those columns.
         """
         try:
-            from sqlalchemy import asc
-
-            # 验证排序字段是否允许
-            allowed_fields = ["start_time", "created_at", "duration", "end_time"]
-            if sort_by not in allowed_fields:
-                sort_by = "start_time"
-
-            # 构建排序表达式
-            sort_column = getattr(ExecutionLog, sort_by)
-            if order == "desc":
-                query = select(ExecutionLog).order_by(desc(sort_column))
-            else:
-                query = select(ExecutionLog).order_by(asc(sort_column))
-
-            if search_term:
-                query = query.where(
-                    or_(
-                        ExecutionLog.text.ilike(f"%{search_term}%"),
-                        ExecutionLog.app_name.ilike(f"%{search_term}%"),
-                        ExecutionLog.shadow_bot_account.ilike(f"%{search_term}%"),
-                        ExecutionLog.host_ip.ilike(f"%{search_term}%"),
-                        ExecutionLog.id.ilike(f"%{search_term}%"),
-                    )
-                )
-
-            if status:
-                query = query.where(ExecutionLog.status == status)
-
+            query = self._search_query(search_term, status, sort_by, order, columns)
             query = query.offset(skip).limit(limit)
 
             result = await self.db.execute(query)
-            return result.scalars().all()
+            return self._rows(result, columns)
         except Exception as e:
-            await self.db.rollback()
+            await self._rollback()
+            raise
+
+    async def search_page(
+        self,
+        search_term: Optional[str] = None,
+        status: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100,
+        sort_by: str = "start_time",
+        order: str = "desc",
+        columns: Optional[Sequence[str]] = None,
+        count_cap: Optional[int] = None,
+    ) -> Page:
+        """
+        search() and count_search() in one query
+        """
+        try:
+            query = self._search_query(search_term, status, sort_by, order, columns)
+            return await self._paginate(query, skip, limit, columns, count_cap)
+        except Exception as e:
+            await self._rollback()
             raise
 
     async def count_search(
@@ -120,26 +167,12 @@ class ExecutionLogRepository(BaseRepository[ExecutionLog, dict, dict]):
         Count logs matching search criteria
         """
         try:
-            query = select(func.count(ExecutionLog.id))
-
-            if search_term:
-                query = query.where(
-                    or_(
-                        ExecutionLog.text.ilike(f"%{search_term}%"),
-                        ExecutionLog.app_name.ilike(f"%{search_term}%"),
-                        ExecutionLog.shadow_bot_account.ilike(f"%{search_term}%"),
-                        ExecutionLog.host_ip.ilike(f"%{search_term}%"),
-                        ExecutionLog.id.ilike(f"%{search_term}%"),
-                    )
-                )
-
-            if status:
-                query = query.where(ExecutionLog.status == status)
+            query = select(func.count(ExecutionLog.id)).where(*self._search_conditions(search_term, status))
 
             result = await self.db.execute(query)
             return result.scalar_one()
         except Exception as e:
-            await self.db.rollback()
+            await self._rollback()
             raise
 
     async def get_recent_logs(self, limit: int = 10) -> List[ExecutionLog]:
@@ -154,7 +187,7 @@ class ExecutionLogRepository(BaseRepository[ExecutionLog, dict, dict]):
             )
             return result.scalars().all()
         except Exception as e:
-            await self.db.rollback()
+            await self._rollback()
             raise
 
     async def get_total_execution_time(self) -> float:
@@ -168,7 +201,7 @@ class ExecutionLogRepository(BaseRepository[ExecutionLog, dict, dict]):
             total = result.scalar_one()
             return float(total) if total else 0.0
         except Exception as e:
-            await self.db.rollback()
+            await self._rollback()
             raise
 
     async def get_by_time_range(
@@ -191,7 +224,7 @@ class ExecutionLogRepository(BaseRepository[ExecutionLog, dict, dict]):
             result = await self.db.execute(query)
             return result.scalars().all()
         except Exception as e:
-            await self.db.rollback()
+            await self._rollback()
             raise
 
     async def create_log(
@@ -206,6 +239,8 @@ class ExecutionLogRepository(BaseRepository[ExecutionLog, dict, dict]):
         host_ip: str,
         log_info: bool = False,
         screenshot: bool = False,
+        screenshot_path: Optional[str] = None,
+        log_content: Optional[str] = None,
     ) -> ExecutionLog:
         """
         Create a new execution log
@@ -241,15 +276,17 @@ class ExecutionLogRepository(BaseRepository[ExecutionLog, dict, dict]):
                 "host_ip": host_ip,
                 "log_info": log_info,
                 "screenshot": screenshot,
+                "screenshot_path": screenshot_path,
+                "log_content": log_content,
             }
 
             db_obj = ExecutionLog(**log_data)
             self.db.add(db_obj)
-            await self.db.commit()
+            await self._commit()
             await self.db.refresh(db_obj)
             return db_obj
         except Exception as e:
-            await self.db.rollback()
+            await self._rollback()
             raise
 
     async def get_daily_stats(
@@ -319,7 +356,7 @@ class ExecutionLogRepository(BaseRepository[ExecutionLog, dict, dict]):
                 for row in rows
             ]
         except Exception as e:
-            await self.db.rollback()
+            await self._rollback()
             raise
 
     async def get_execution_rank(
@@ -392,5 +429,5 @@ class ExecutionLogRepository(BaseRepository[ExecutionLog, dict, dict]):
 
             return results
         except Exception as e:
-            await self.db.rollback()
+            await self._rollback()
             raise
@@ -1,12 +1,24 @@
 """
 Task repository
 """
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Sequence, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, and_, or_, func
+from sqlalchemy import select, update, and_, or_, func
 
 from app.models.task import Task
-from app.repositories.base import BaseRepository
+from app.repositories.base import BaseRepository, Page
+
+# LIKE 转义字符
+LIKE_ESCAPE = "\\"
+
+
+def _escape_like(value: str) -> str:
+    """Escape LIKE wildcards so value matches literally"""
+    return (
+        value.replace(LIKE_ESCAPE, LIKE_ESCAPE * 2)
+        .replace("%", LIKE_ESCAPE + "%")
+        .replace("_", LIKE_ESCAPE + "_")
+    )
 
 
 class TaskRepository(BaseRepository[Task, dict, dict]):
@@ -27,7 +39,7 @@ class TaskRepository(BaseRepository[Task, dict, dict]):
             )
             return result.scalars().all()
         except Exception as e:
-            await self.db.rollback()
+            await self._rollback()
             raise
 
     async def get_by_app_name(self, app_name: str) -> List[Task]:
@@ -40,7 +52,7 @@ class TaskRepository(BaseRepository[Task, dict, dict]):
             )
             return result.scalars().all()
         except Exception as e:
-            await self.db.rollback()
+            await self._rollback()
             raise
 
     async def get_by_status(self, status: str) -> List[Task]:
@@ -53,41 +65,71 @@ class TaskRepository(BaseRepository[Task, dict, dict]):
             )
             return result.scalars().all()
         except Exception as e:
-            await self.db.rollback()
+            await self._rollback()
             raise
 
+    def _search_conditions(
+        self,
+        search_term: Optional[str] = None,
+        status: Optional[str] = None,
+    ) -> list:
+        """
+        WHERE conditions shared by search, count_search and search_page
+        """
+        conditions = []
+        if search_term:
+            conditions.append(
+                or_(
+                    Task.task_name.ilike(f"%{search_term}%"),
+                    Task.shadow_bot_account.ilike(f"%{search_term}%"),
+                    Task.host_ip.ilike(f"%{search_term}%"),
+                    Task.app_name.ilike(f"%{search_term}%"),
+                )
+            )
+        if status:
+            conditions.append(Task.status == status)
+        return conditions
+
     async def search(
         self,
         search_term: Optional[str] = None,
         status: Optional[str] = None,
         skip: int = 0,
         limit: int = 100,
+        columns: Optional[Sequence[str]] = None,
     ) -> List[Task]:
         """
         Search tasks by multiple criteria
+
+        With columns, returns dicts of only those columns.
         """
         try:
-            query = select(Task)
-
-            if search_term:
-                query = query.where(
-                    or_(
-                        Task.task_name.ilike(f"%{search_term}%"),
-                        Task.shadow_bot_account.ilike(f"%{search_term}%"),
-                        Task.host_ip.ilike(f"%{search_term}%"),
-                        Task.app_name.ilike(f"%{search_term}%"),
-                    )
-                )
-
-            if status:
-                query = query.where(Task.status == status)
-
+            query = self._select(columns).where(*self._search_conditions(search_term, status))
             query = query.offset(skip).limit(limit)
 
             result = await self.db.execute(query)
-            return result.scalars().all()
+            return self._rows(result, columns)
+        except Exception as e:
+            await self._rollback()
+            raise
+
+    async def search_page(
+        self,
+        search_term: Optional[str] = None,
+        status: Optional[str] = None,
+        skip: int = 0,
+        limit: int = 100,
+        columns: Optional[Sequence[str]] = None,
+        count_cap: Optional[int] = None,
+    ) -> Page:
+        """
+        search() and count_search() in one query
+        """
+        try:
+            query = self._select(columns).where(*self._search_conditions(search_term, status))
+            return await self._paginate(query, skip, limit, columns, count_cap)
         except Exception as e:
-            await self.db.rollback()
+            await self._rollback()
             raise
 
     async def count_search(
@@ -99,25 +141,12 @@ class TaskRepository(BaseRepository[Task, dict, dict]):
         Count tasks matching search criteria
         """
         try:
-            query = select(func.count(Task.id))
-
-            if search_term:
-                query = query.where(
-                    or_(
-                        Task.task_name.ilike(f"%{search_term}%"),
-                        Task.shadow_bot_account.ilike(f"%{search_term}%"),
-                        Task.host_ip.ilike(f"%{search_term}%"),
-                        Task.app_name.ilike(f"%{search_term}%"),
-                    )
-                )
-
-            if status:
-                query = query.where(Task.status == status)
+            query = select(func.count(Task.id)).where(*self._search_conditions(search_term, status))
 
             result = await self.db.execute(query)
             return result.scalar_one()
         except Exception as e:
-            await self.db.rollback()
+            await self._rollback()
             raise
 
     async def get_running_tasks(self) -> List[Task]:
@@ -165,7 +194,20 @@ class TaskRepository(BaseRepository[Task, dict, dict]):
             )
             return result.scalar_one_or_none()
         except Exception as e:
-            await self.db.rollback()
+            await self._rollback()
+            raise
+
+    async def get_account_app_map(self) -> Dict[Tuple[str, str], str]:
+        """
+        Map every (shadow_bot_account, app_name) to its task ID (one query, for imports)
+        """
+        try:
+            result = await self.db.execute(
+                select(Task.shadow_bot_account, Task.app_name, Task.id)
+            )
+            return {(account, app_name): id for account, app_name, id in result.all()}
+        except Exception as e:
+            await self._rollback()
             raise
 
     async def update_status(
@@ -177,20 +219,39 @@ class TaskRepository(BaseRepository[Task, dict, dict]):
         """
         Update task status with optional timestamp
         """
-        try:
-            update_data = {"status": status}
-            if last_run_time:
-                update_data["last_run_time"] = last_run_time
+        update_data = {"status": status}
+        if last_run_time:
+            update_data["last_run_time"] = last_run_time
 
-            await self.db.execute(
-                update(Task).where(Task.id == id).values(**update_data)
-            )
-            await self.db.commit()
+        return await self.update(id, update_data)
 
+    async def update_status_by_account_and_app(
+        self,
+        shadow_bot_account: str,
+        app_name: str,
+        status: str,
+    ) -> int:
+        """
+        Set the status of every task for an account/app in one UPDATE
+
+        app_name is matched case-insensitively by the database (ILIKE with
+        wildcards escaped). Nothing is loaded back; returns the number of
+        rows updated.
+        """
+        try:
             result = await self.db.execute(
-                select(Task).where(Task.id == id)
+                update(Task)
+                .where(
+                    and_(
+                        Task.shadow_bot_account == shadow_bot_account,
+                        Task.app_name.ilike(_escape_like(app_name), escape=LIKE_ESCAPE),
+                    )
+                )
+                .values(status=status)
+                .execution_options(synchronize_session=False)
             )
-            return result.scalar_one_or_none()
+            await self._commit()
+            return result.rowcount
         except Exception as e:
-            await self.db.rollback()
+            await self._rollback()
             raise
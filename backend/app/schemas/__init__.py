@@ -12,6 +12,10 @@ from app.schemas.common import (
     DateRangeParams,
     StatusFilterParams,
     MessageResponse,
+    BatchDeleteRequest,
+    BatchOperationResponse,
+    ImportRowError,
+    ImportResult,
 )
 from app.schemas.account import (
     AccountBase,
@@ -21,6 +25,10 @@ from app.schemas.account import (
     AccountResponse,
     AccountListParams,
     AccountListResponse,
+    AccountBatchCreate,
+    AccountBatchUpdateItem,
+    AccountBatchUpdate,
+    AccountBatchCreateResponse,
 )
 from app.schemas.task import (
     TaskBase,
@@ -31,7 +39,12 @@ from app.schemas.task import (
     TaskStartResponse,
     TaskStopResponse,
     TaskListParams,
+    TaskListItem,
     TaskListResponse,
+    TaskBatchCreate,
+    TaskBatchUpdateItem,
+    TaskBatchUpdate,
+    TaskBatchCreateResponse,
 )
 from app.schemas.execution_log import (
     ExecutionLogBase,
@@ -40,6 +53,7 @@ from app.schemas.execution_log import (
     ExecutionLogInDB,
     ExecutionLogResponse,
     ExecutionLogListParams,
+    ExecutionLogListItem,
     ExecutionLogListResponse,
     ExecutionLogExportResponse,
 )
@@ -69,6 +83,10 @@ __all__ = [
     "DateRangeParams",
     "StatusFilterParams",
     "MessageResponse",
+    "BatchDeleteRequest",
+    "BatchOperationResponse",
+    "ImportRowError",
+    "ImportResult",
     # Account
     "AccountBase",
     "AccountCreate",
@@ -77,6 +95,10 @@ __all__ = [
     "AccountResponse",
     "AccountListParams",
     "AccountListResponse",
+    "AccountBatchCreate",
+    "AccountBatchUpdateItem",
+    "AccountBatchUpdate",
+    "AccountBatchCreateResponse",
     # Task
     "TaskBase",
     "TaskCreate",
@@ -86,7 +108,12 @@ __all__ = [
     "TaskStartResponse",
     "TaskStopResponse",
     "TaskListParams",
+    "TaskListItem",
     "TaskListResponse",
+    "TaskBatchCreate",
+    "TaskBatchUpdateItem",
+    "TaskBatchUpdate",
+    "TaskBatchCreateResponse",
     # ExecutionLog
     "ExecutionLogBase",
     "ExecutionLogCreate",
@@ -94,6 +121,7 @@ __all__ = [
     "ExecutionLogInDB",
     "ExecutionLogResponse",
     "ExecutionLogListParams",
+    "ExecutionLogListItem",
     "ExecutionLogListResponse",
     "ExecutionLogExportResponse",
     # User
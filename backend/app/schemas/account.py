@@ -2,9 +2,15 @@
 Account Pydantic schemas
 """
 from datetime import datetime
-from typing import Optional
+from typing import Optional, List
 from pydantic import BaseModel, Field
-from app.schemas.common import AccountStatus, PaginatedResponse, PaginationParams, SearchParams
+from app.schemas.common import (
+    AccountStatus,
+    BATCH_MAX_ITEMS,
+    PaginatedResponse,
+    PaginationParams,
+    SearchParams,
+)
 
 
 # ============ Account Schemas ============
@@ -63,3 +69,26 @@ class AccountListParams(PaginationParams, SearchParams):
 class AccountListResponse(PaginatedResponse[AccountResponse]):
     """Response schema for account list"""
     pass
+
+
+# ============ Account Batch Schemas ============
+
+class AccountBatchCreate(BaseModel):
+    """Schema for creating many accounts in one transaction"""
+    items: List[AccountCreate] = Field(..., min_length=1, max_length=BATCH_MAX_ITEMS)
+
+
+class AccountBatchUpdateItem(AccountUpdate):
+    """Schema for one account in a batch update"""
+    id: str = Field(..., description="Account UUID")
+
+
+class AccountBatchUpdate(BaseModel):
+    """Schema for updating many accounts in one transaction"""
+    items: List[AccountBatchUpdateItem] = Field(..., min_length=1, max_length=BATCH_MAX_ITEMS)
+
+
+class AccountBatchCreateResponse(BaseModel):
+    """Response schema for batch account creation"""
+    total: int
+    items: List[AccountResponse]
@@ -33,6 +33,10 @@ class UserRole(str, Enum):
     user = "user"
 
 
+# 批量接口单次最多处理的条数
+BATCH_MAX_ITEMS = 1000
+
+
 # Generic type for paginated response
 T = TypeVar("T")
 
@@ -44,6 +48,7 @@ class PaginatedResponse(BaseModel, Generic[T]):
     page_size: int
     total_pages: int
     items: List[T]
+    total_capped: bool = Field(default=False, description="total stopped at the count cap (more rows match)")
 
 
 class PaginationParams(BaseModel):
@@ -72,3 +77,31 @@ class MessageResponse(BaseModel):
     """Generic message response"""
     message: str
     code: str = "SUCCESS"
+
+
+class BatchDeleteRequest(BaseModel):
+    """Batch delete request"""
+    ids: List[str] = Field(..., min_length=1, max_length=BATCH_MAX_ITEMS, description="IDs to delete")
+
+
+class BatchOperationResponse(BaseModel):
+    """Batch update/delete result"""
+    message: str
+    count: int = Field(..., description="Number of records affected")
+    not_found: List[str] = Field(default_factory=list, description="IDs that do not exist")
+
+
+class ImportRowError(BaseModel):
+    """Validation or write error for one spreadsheet row"""
+    row: int = Field(..., description="Row number in the file (header is row 1)")
+    errors: List[str]
+
+
+class ImportResult(BaseModel):
+    """Spreadsheet import report"""
+    total_rows: int = Field(..., description="Non-empty data rows read")
+    created: int
+    updated: int
+    skipped: int = Field(default=0, description="Rows matching an existing record with nothing to change")
+    failed: int
+    errors: List[ImportRowError] = Field(default_factory=list)
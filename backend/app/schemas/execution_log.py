@@ -75,7 +75,21 @@ class ExecutionLogListParams(PaginationParams, SearchParams):
     end_date: Optional[datetime] = Field(default=None, description="End date filter")
 
 
-class ExecutionLogListResponse(PaginatedResponse[ExecutionLogResponse]):
+class ExecutionLogListItem(ExecutionLogBase):
+    """Execution log in list views (log_content is loaded by GET /logs/{id})"""
+    id: str = Field(..., description="Log UUID")
+    status: LogStatus
+    log_info: bool
+    screenshot: bool
+    screenshot_path: Optional[str] = None
+    has_log_content: bool = Field(..., description="Whether the log has log_content")
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ExecutionLogListResponse(PaginatedResponse[ExecutionLogListItem]):
     """Response schema for execution log list"""
     pass
 
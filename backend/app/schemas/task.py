@@ -2,9 +2,15 @@
 Task Pydantic schemas
 """
 from datetime import datetime
-from typing import Optional
+from typing import Optional, List
 from pydantic import BaseModel, Field
-from app.schemas.common import TaskStatus, PaginatedResponse, PaginationParams, SearchParams
+from app.schemas.common import (
+    TaskStatus,
+    BATCH_MAX_ITEMS,
+    PaginatedResponse,
+    PaginationParams,
+    SearchParams,
+)
 
 
 # ============ Task Schemas ============
@@ -91,6 +97,46 @@ class TaskListParams(PaginationParams, SearchParams):
     shadow_bot_account: Optional[str] = Field(default=None, description="Filter by ShadowBot account")
 
 
-class TaskListResponse(PaginatedResponse[TaskResponse]):
+class TaskListItem(TaskBase):
+    """Task in list views (config_json is loaded by GET /tasks/{id})"""
+    id: str = Field(..., description="Task UUID")
+    last_run_time: Optional[datetime] = None
+    status: TaskStatus
+    config_file: bool
+    config_info: bool
+    config_file_path: Optional[str] = None
+    trigger_time: Optional[datetime] = None
+    remark: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class TaskListResponse(PaginatedResponse[TaskListItem]):
     """Response schema for task list"""
     pass
+
+
+# ============ Task Batch Schemas ============
+
+class TaskBatchCreate(BaseModel):
+    """Schema for creating many tasks in one transaction"""
+    items: List[TaskCreate] = Field(..., min_length=1, max_length=BATCH_MAX_ITEMS)
+
+
+class TaskBatchUpdateItem(TaskUpdate):
+    """Schema for one task in a batch update"""
+    id: str = Field(..., description="Task UUID")
+
+
+class TaskBatchUpdate(BaseModel):
+    """Schema for updating many tasks in one transaction"""
+    items: List[TaskBatchUpdateItem] = Field(..., min_length=1, max_length=BATCH_MAX_ITEMS)
+
+
+class TaskBatchCreateResponse(BaseModel):
+    """Response schema for batch task creation"""
+    total: int
+    items: List[TaskResponse]
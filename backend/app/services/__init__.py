@@ -5,10 +5,12 @@ from app.services.account_service import AccountService
 from app.services.task_service import TaskService
 from app.services.execution_log_service import ExecutionLogService
 from app.services.dashboard_service import DashboardService
+from app.services.import_service import ImportService
 
 __all__ = [
     "AccountService",
     "TaskService",
     "ExecutionLogService",
     "DashboardService",
+    "ImportService",
 ]
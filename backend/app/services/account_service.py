@@ -1,12 +1,30 @@
 """
 Account service - business logic for account operations
 """
+from collections import Counter
 from typing import Optional, List, Dict, Any
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.database import unit_of_work
 from app.repositories.account_repository import AccountRepository
-from app.schemas.account import AccountCreate, AccountUpdate, AccountResponse
+from app.schemas.account import (
+    AccountCreate,
+    AccountUpdate,
+    AccountResponse,
+    AccountBatchUpdateItem,
+)
 from app.schemas.common import AccountStatus
+from app.services.directory_cache import (
+    ACCOUNTS,
+    ACCOUNT_DIRECTORY_FIELDS,
+    get_directory_cache,
+)
+
+
+# 列表页只查询响应字段对应的列（不实例化 ORM 对象），整页交给预编译的 TypeAdapter 校验
+LIST_COLUMNS = tuple(AccountResponse.model_fields)
+_list_adapter = TypeAdapter(List[AccountResponse])
 
 
 class AccountService:
@@ -30,8 +48,13 @@ class AccountService:
         search: Optional[str] = None,
         status: Optional[str] = None,
         host_ip: Optional[str] = None,
+        count_cap: Optional[int] = None,
     ) -> Dict[str, Any]:
-        """List accounts with pagination, search, and filtering"""
+        """
+        List accounts with pagination, search, and filtering
+
+        count_cap: stop counting after this many matches (total_capped=True)
+        """
         skip = (page - 1) * page_size
 
         # Build filters
@@ -41,18 +64,25 @@ class AccountService:
         if host_ip:
             filters["host_ip"] = host_ip
 
-        # Get items and count
+        # Get items and count (one query)
         if search:
-            items = await self.repo.search(search_term=search, skip=skip, limit=page_size)
-            total = await self.repo.count_search(search_term=search)
+            result = await self.repo.search_page(
+                search_term=search,
+                skip=skip,
+                limit=page_size,
+                columns=LIST_COLUMNS,
+                count_cap=count_cap,
+            )
         else:
-            items = await self.repo.get_multi(
+            result = await self.repo.get_page(
                 skip=skip,
                 limit=page_size,
                 filters=filters if filters else {},
+                columns=LIST_COLUMNS,
+                count_cap=count_cap,
             )
-            total = await self.repo.count(filters=filters if filters else {})
 
+        total = result.total
         total_pages = (total + page_size - 1) // page_size if total > 0 else 0
 
         return {
@@ -60,13 +90,18 @@ class AccountService:
             "page": page,
             "page_size": page_size,
             "total_pages": total_pages,
-            "items": [AccountResponse.model_validate(item) for item in items],
+            "total_capped": result.capped,
+            "items": _list_adapter.validate_python(result.items),
         }
 
+    @staticmethod
+    def _build_task_control(account_in: AccountCreate) -> str:
+        """Auto-generate task_control as shadow_bot_account-host_ip:port"""
+        return f"{account_in.shadow_bot_account}-{account_in.host_ip}:{account_in.port}"
+
     async def create_account(self, account_in: AccountCreate) -> AccountResponse:
         """Create a new account"""
-        # Auto-generate task_control: "shadow_bot_account-host_ip:port"
-        task_control = f"{account_in.shadow_bot_account}-{account_in.host_ip}:{account_in.port}"
+        task_control = self._build_task_control(account_in)
 
         # Check for duplicate task_control
         existing = await self.repo.get_by_task_control(task_control)
@@ -84,7 +119,9 @@ class AccountService:
         account_data = account_in.model_dump()
         account_data["task_control"] = task_control
 
-        account = await self.repo.create(account_data)
+        async with unit_of_work(self.db):
+            account = await self.repo.create(account_data)
+            await get_directory_cache().invalidate(self.db, ACCOUNTS)
         return AccountResponse.model_validate(account)
 
     async def update_account(
@@ -115,9 +152,29 @@ class AccountService:
         if "end_time" in update_data and isinstance(update_data["end_time"], str):
             update_data["end_time"] = datetime.fromisoformat(update_data["end_time"].replace("Z", "+00:00"))
 
-        updated_account = await self.repo.update(account_id, update_data)
+        async with unit_of_work(self.db):
+            updated_account = await self.repo.update(account_id, update_data)
+            if ACCOUNT_DIRECTORY_FIELDS & update_data.keys():
+                await get_directory_cache().invalidate(self.db, ACCOUNTS)
         return AccountResponse.model_validate(updated_account)
 
+    async def update_accounts_by_shadow_bot(
+        self, shadow_bot_account: str, updates: Dict[str, Any]
+    ) -> int:
+        """Update all accounts of a shadow bot account without loading them back"""
+        update_data = {k: v for k, v in updates.items() if v is not None}
+
+        # Convert string datetime to datetime objects
+        from datetime import datetime
+        if "end_time" in update_data and isinstance(update_data["end_time"], str):
+            update_data["end_time"] = datetime.fromisoformat(update_data["end_time"].replace("Z", "+00:00"))
+
+        async with unit_of_work(self.db):
+            count = await self.repo.update_by_shadow_bot_account(shadow_bot_account, update_data)
+            if count and ACCOUNT_DIRECTORY_FIELDS & update_data.keys():
+                await get_directory_cache().invalidate(self.db, ACCOUNTS)
+        return count
+
     async def delete_account(self, account_id: str) -> bool:
         """Delete an account"""
         account = await self.repo.get(account_id)
@@ -131,9 +188,79 @@ class AccountService:
                 },
             )
 
-        deleted = await self.repo.delete(account_id)
+        async with unit_of_work(self.db):
+            deleted = await self.repo.delete(account_id)
+            await get_directory_cache().invalidate(self.db, ACCOUNTS)
         return deleted
 
+    async def bulk_create_accounts(
+        self, accounts_in: List[AccountCreate]
+    ) -> List[AccountResponse]:
+        """Create many accounts in one transaction (all or nothing)"""
+        account_data_list = []
+        for account_in in accounts_in:
+            account_data = account_in.model_dump()
+            account_data["task_control"] = self._build_task_control(account_in)
+            account_data_list.append(account_data)
+
+        # 批内重复 + 库中已存在，一次查询完成
+        task_controls = [data["task_control"] for data in account_data_list]
+        duplicates = {tc for tc, n in Counter(task_controls).items() if n > 1}
+        duplicates |= await self.repo.get_existing_task_controls(task_controls)
+        if duplicates:
+            from fastapi import HTTPException
+            raise HTTPException(
+                status_code=409,
+                detail={
+                    "code": "DUPLICATE_RESOURCE",
+                    "message": f"{len(duplicates)} task_control value(s) already exist or are repeated",
+                    "task_controls": sorted(duplicates),
+                },
+            )
+
+        async with unit_of_work(self.db):
+            accounts = await self.repo.bulk_create(account_data_list)
+            await get_directory_cache().invalidate(self.db, ACCOUNTS)
+
+        return [AccountResponse.model_validate(account) for account in accounts]
+
+    async def bulk_update_accounts(
+        self, accounts_in: List[AccountBatchUpdateItem]
+    ) -> Dict[str, Any]:
+        """Update many accounts by ID in one transaction"""
+        ids = [item.id for item in accounts_in]
+        existing_ids = {account.id for account in await self.repo.get_many(ids)}
+
+        rows = [
+            {k: v for k, v in item.model_dump().items() if v is not None}
+            for item in accounts_in
+            if item.id in existing_ids
+        ]
+
+        async with unit_of_work(self.db):
+            count = await self.repo.bulk_update(rows)
+            if any(ACCOUNT_DIRECTORY_FIELDS & row.keys() for row in rows):
+                await get_directory_cache().invalidate(self.db, ACCOUNTS)
+
+        return {
+            "count": count,
+            "not_found": [id for id in ids if id not in existing_ids],
+        }
+
+    async def bulk_delete_accounts(self, account_ids: List[str]) -> Dict[str, Any]:
+        """Delete many accounts by ID in one transaction"""
+        existing_ids = {account.id for account in await self.repo.get_many(account_ids)}
+
+        async with unit_of_work(self.db):
+            count = await self.repo.bulk_delete(list(existing_ids))
+            if count:
+                await get_directory_cache().invalidate(self.db, ACCOUNTS)
+
+        return {
+            "count": count,
+            "not_found": [id for id in account_ids if id not in existing_ids],
+        }
+
     async def get_account_stats(self) -> Dict[str, int]:
         """Get account statistics by status"""
         stats = {}
@@ -0,0 +1,167 @@
+"""
+Config storage service - deduplicated storage of uploaded config files
+
+Uploads are hashed while they are spooled to a temp file; a file whose
+SHA-256 is already stored is not written (or PUT to OSS) again. Tasks point
+at blobs through task_config_refs, and blobs no task uses can be garbage
+collected.
+"""
+import hashlib
+import os
+import shutil
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import anyio
+from fastapi import UploadFile
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import STATIC_DIR
+from app.core.static_files import schedule_precompress
+from app.models.config_blob import ConfigBlob
+from app.repositories.config_blob_repository import ConfigBlobRepository
+from app.services.storage_service import (
+    LOCAL_CHUNK_SIZE,
+    get_oss_bucket,
+    oss_object_url,
+    run_blocking,
+    upload_to_oss,
+)
+
+# 本地存储目录（/static/configs/blobs/<sha256>/<filename>）
+LOCAL_BLOB_DIR = "configs/blobs"
+
+# OSS 存储前缀（config/blobs/<sha256>/<filename>）
+OSS_BLOB_PREFIX = "config/blobs"
+
+
+def _safe_filename(filename: Optional[str]) -> str:
+    name = Path(filename or "").name.strip()
+    return name or "config"
+
+
+class ConfigStorageService:
+    """Service for deduplicated config file storage"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.repo = ConfigBlobRepository(db)
+
+    async def _spool(self, file: UploadFile) -> Tuple[Path, str, int]:
+        """Copy the upload to a temp file in chunks, hashing it on the way"""
+        tmp_dir = STATIC_DIR / LOCAL_BLOB_DIR / ".tmp"
+        tmp_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = tmp_dir / uuid.uuid4().hex
+
+        digest = hashlib.sha256()
+        size = 0
+        try:
+            async with await anyio.open_file(tmp_path, "wb") as f:
+                while chunk := await file.read(LOCAL_CHUNK_SIZE):
+                    digest.update(chunk)
+                    await f.write(chunk)
+                    size += len(chunk)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        return tmp_path, digest.hexdigest(), size
+
+    async def store_upload(self, file: UploadFile) -> Tuple[ConfigBlob, bool]:
+        """
+        Store an uploaded config file once per content hash
+
+        Returns (blob, deduplicated); deduplicated is True when identical
+        content was already stored and nothing was written.
+        """
+        tmp_path, sha256, size = await self._spool(file)
+        try:
+            existing = await self.repo.get(sha256)
+            if existing:
+                return existing, True
+
+            filename = _safe_filename(file.filename)
+            bucket = get_oss_bucket()
+            if bucket is not None:
+                storage = "oss"
+                object_key = f"{OSS_BLOB_PREFIX}/{sha256}/{filename}"
+                async with await anyio.open_file(tmp_path, "rb") as f:
+                    await upload_to_oss(bucket, object_key, f)
+                url = oss_object_url(object_key)
+            else:
+                storage = "local"
+                object_key = f"{LOCAL_BLOB_DIR}/{sha256}/{filename}"
+                dest = STATIC_DIR / object_key
+                dest.parent.mkdir(parents=True, exist_ok=True)
+                os.replace(tmp_path, dest)
+                schedule_precompress(dest)
+                url = f"/static/{object_key}"
+
+            try:
+                blob = await self.repo.create({
+                    "id": sha256,
+                    "storage": storage,
+                    "object_key": object_key,
+                    "url": url,
+                    "filename": filename,
+                    "size": size,
+                })
+            except IntegrityError:
+                # 并发上传了相同内容，使用已写入的记录
+                return await self.repo.get(sha256), True
+            return blob, False
+        finally:
+            tmp_path.unlink(missing_ok=True)
+
+    async def sync_task_refs(self, task_paths: Dict[str, Optional[str]]) -> None:
+        """
+        Point tasks at the blobs behind their config_file_path
+
+        Args:
+            task_paths: task_id -> config_file_path (None or non-blob URLs
+                clear the reference)
+        """
+        if not task_paths:
+            return
+        url_map = await self.repo.get_url_map([path for path in task_paths.values() if path])
+        await self.repo.set_task_refs({
+            task_id: url_map.get(path) if path else None
+            for task_id, path in task_paths.items()
+        })
+
+    async def _delete_stored(self, blobs: Iterable[ConfigBlob]) -> None:
+        oss_keys = []
+        for blob in blobs:
+            if blob.storage == "oss":
+                oss_keys.append(blob.object_key)
+            else:
+                shutil.rmtree((STATIC_DIR / blob.object_key).parent, ignore_errors=True)
+
+        bucket = get_oss_bucket()
+        if oss_keys and bucket is not None:
+            # batch_delete_objects 单次最多 1000 个
+            for i in range(0, len(oss_keys), 1000):
+                await run_blocking(bucket.batch_delete_objects, oss_keys[i:i + 1000])
+
+    async def collect_garbage(self, min_age_hours: int = 24, dry_run: bool = True) -> Dict[str, Any]:
+        """
+        Delete blobs that no task references
+
+        Blobs younger than min_age_hours are kept: a file is uploaded before
+        the task form that references it is saved.
+        """
+        created_before = datetime.utcnow() - timedelta(hours=min_age_hours)
+        blobs = await self.repo.get_unreferenced(created_before)
+
+        if blobs and not dry_run:
+            await self._delete_stored(blobs)
+            await self.repo.delete_blobs([blob.id for blob in blobs])
+
+        return {
+            "dry_run": dry_run,
+            "count": len(blobs),
+            "bytes": sum(blob.size for blob in blobs),
+            "urls": [blob.url for blob in blobs],
+        }
@@ -0,0 +1,245 @@
+"""
+Directory cache - process-wide read-through cache of accounts and tasks
+
+Webhooks, task control and config/get look up the same small mapping
+(shadow_bot_account -> accounts / tasks) on every call. This cache keeps
+the routing fields in memory, indexed by shadow_bot_account and by
+(shadow_bot_account, app_name).
+
+Only fields that change through explicit CRUD are cached (host/port,
+names, config); volatile status columns are always read from the DB.
+
+Invalidation:
+- Service write paths call ``invalidate()``, which bumps a row in the
+  ``cache_versions`` table inside the same transaction and drops the local
+  copy after commit.
+- Other workers compare their loaded version with that table at most once
+  per ``DIRECTORY_CACHE_CHECK_INTERVAL`` seconds and reload when stale.
+"""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, fields
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import select, update, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.config import get_settings
+from app.core.database import run_after_commit, unit_of_work
+from app.models.account import Account
+from app.models.cache_version import CacheVersion
+from app.models.task import Task
+
+logger = logging.getLogger(__name__)
+
+ACCOUNTS = "accounts"
+TASKS = "tasks"
+
+# 会影响缓存内容的字段，只有这些字段变更时才需要失效
+ACCOUNT_DIRECTORY_FIELDS = {"shadow_bot_account", "host_ip", "port", "task_control"}
+TASK_DIRECTORY_FIELDS = {
+    "task_name",
+    "shadow_bot_account",
+    "host_ip",
+    "app_name",
+    "config_file",
+    "config_info",
+    "config_file_path",
+    "config_json",
+}
+
+
+@dataclass(frozen=True)
+class AccountEntry:
+    """Cached account routing info"""
+    id: str
+    shadow_bot_account: str
+    host_ip: str
+    port: int
+    task_control: str
+
+
+@dataclass(frozen=True)
+class TaskEntry:
+    """Cached task routing and config info"""
+    id: str
+    task_name: str
+    shadow_bot_account: str
+    host_ip: str
+    app_name: str
+    config_file: bool
+    config_info: bool
+    config_file_path: Optional[str]
+    config_json: Optional[str]
+
+
+def _columns(model, entry_cls) -> list:
+    return [getattr(model, f.name) for f in fields(entry_cls)]
+
+
+class DirectoryCache:
+    """
+    Read-through cache of account / task directory data
+
+    使用示例:
+        directory = get_directory_cache()
+        accounts = await directory.get_accounts(db, "redballoon")
+        task = await directory.get_task(db, "redballoon", "测试应用")
+    """
+
+    def __init__(self, check_interval: Optional[float] = None):
+        self.check_interval = (
+            check_interval
+            if check_interval is not None
+            else get_settings().DIRECTORY_CACHE_CHECK_INTERVAL
+        )
+        self._accounts_by_bot: Dict[str, List[AccountEntry]] = {}
+        self._tasks_by_bot: Dict[str, List[TaskEntry]] = {}
+        self._tasks_by_key: Dict[Tuple[str, str], TaskEntry] = {}
+        # namespace -> 已加载数据对应的共享版本号（None 表示未加载）
+        self._versions: Dict[str, Optional[int]] = {ACCOUNTS: None, TASKS: None}
+        self._checked_at: Dict[str, float] = {ACCOUNTS: 0.0, TASKS: 0.0}
+        # clear() 时递增；加载期间发生变化说明加载结果可能已过期，需丢弃
+        self._generations: Dict[str, int] = {ACCOUNTS: 0, TASKS: 0}
+        self._locks = {ACCOUNTS: asyncio.Lock(), TASKS: asyncio.Lock()}
+        self.hits = 0
+        self.misses = 0
+
+    # ==================== 读取 ====================
+
+    async def get_accounts(self, db: AsyncSession, shadow_bot_account: str) -> List[AccountEntry]:
+        """All accounts with this shadow bot account name"""
+        await self._ensure_fresh(db, ACCOUNTS)
+        return self._accounts_by_bot.get(shadow_bot_account, [])
+
+    async def get_tasks(self, db: AsyncSession, shadow_bot_account: str) -> List[TaskEntry]:
+        """All tasks of this shadow bot account"""
+        await self._ensure_fresh(db, TASKS)
+        return self._tasks_by_bot.get(shadow_bot_account, [])
+
+    async def get_task(
+        self, db: AsyncSession, shadow_bot_account: str, app_name: str
+    ) -> Optional[TaskEntry]:
+        """The task for (shadow_bot_account, app_name), if any"""
+        await self._ensure_fresh(db, TASKS)
+        return self._tasks_by_key.get((shadow_bot_account, app_name))
+
+    def stats(self) -> Dict[str, object]:
+        """Cache versions and hit/miss counters"""
+        return {
+            "versions": dict(self._versions),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    # ==================== 失效 ====================
+
+    async def invalidate(self, db: AsyncSession, *namespaces: str) -> None:
+        """
+        Mark namespaces as changed
+
+        Bumps the shared version inside the caller's transaction (so other
+        workers see it exactly when the data change commits) and drops the
+        local copy after commit.
+        """
+        async with unit_of_work(db):
+            for namespace in namespaces:
+                result = await db.execute(
+                    update(CacheVersion)
+                    .where(CacheVersion.name == namespace)
+                    .values(version=CacheVersion.version + 1)
+                    .execution_options(synchronize_session=False)
+                )
+                if result.rowcount == 0:
+                    await db.execute(insert(CacheVersion).values(name=namespace, version=1))
+
+            run_after_commit(db, lambda: self.clear(*namespaces))
+
+    def clear(self, *namespaces: str) -> None:
+        """Drop the local copy of the given namespaces (all if none given)"""
+        for namespace in namespaces or (ACCOUNTS, TASKS):
+            self._generations[namespace] += 1
+            self._versions[namespace] = None
+            self._checked_at[namespace] = 0.0
+
+    # ==================== 内部实现 ====================
+
+    async def _ensure_fresh(self, db: AsyncSession, namespace: str) -> None:
+        now = time.monotonic()
+        if (
+            self._versions[namespace] is not None
+            and now - self._checked_at[namespace] < self.check_interval
+        ):
+            self.hits += 1
+            return
+
+        async with self._locks[namespace]:
+            # 等锁期间可能已被其他协程刷新
+            if (
+                self._versions[namespace] is not None
+                and time.monotonic() - self._checked_at[namespace] < self.check_interval
+            ):
+                self.hits += 1
+                return
+
+            generation = self._generations[namespace]
+            version = await self._read_version(db, namespace)
+            snapshot = None
+            if version != self._versions[namespace]:
+                self.misses += 1
+                snapshot = await self._load(db, namespace)
+            else:
+                self.hits += 1
+
+            if generation != self._generations[namespace]:
+                # 加载期间本进程提交了写入并清除了缓存，结果可能早于该写入，下次重新加载
+                return
+            if snapshot is not None:
+                self._store(namespace, snapshot)
+                logger.debug(f"Directory cache reloaded: {namespace} v{version}")
+            self._versions[namespace] = version
+            self._checked_at[namespace] = time.monotonic()
+
+    async def _read_version(self, db: AsyncSession, namespace: str) -> int:
+        result = await db.execute(
+            select(CacheVersion.version).where(CacheVersion.name == namespace)
+        )
+        return result.scalar_one_or_none() or 0
+
+    async def _load(self, db: AsyncSession, namespace: str) -> tuple:
+        """Read a namespace from the database into fresh index dicts"""
+        if namespace == ACCOUNTS:
+            result = await db.execute(select(*_columns(Account, AccountEntry)))
+            accounts_by_bot: Dict[str, List[AccountEntry]] = {}
+            for row in result.all():
+                entry = AccountEntry(*row)
+                accounts_by_bot.setdefault(entry.shadow_bot_account, []).append(entry)
+            return (accounts_by_bot,)
+
+        result = await db.execute(select(*_columns(Task, TaskEntry)))
+        tasks_by_bot: Dict[str, List[TaskEntry]] = {}
+        tasks_by_key: Dict[Tuple[str, str], TaskEntry] = {}
+        for row in result.all():
+            entry = TaskEntry(*row)
+            tasks_by_bot.setdefault(entry.shadow_bot_account, []).append(entry)
+            tasks_by_key[(entry.shadow_bot_account, entry.app_name)] = entry
+        return tasks_by_bot, tasks_by_key
+
+    def _store(self, namespace: str, snapshot: tuple) -> None:
+        if namespace == ACCOUNTS:
+            (self._accounts_by_bot,) = snapshot
+        else:
+            self._tasks_by_bot, self._tasks_by_key = snapshot
+
+
+# 全局目录缓存实例（进程级）
+_directory_cache: Optional[DirectoryCache] = None
+
+
+def get_directory_cache() -> DirectoryCache:
+    """获取全局目录缓存实例"""
+    global _directory_cache
+    if _directory_cache is None:
+        _directory_cache = DirectoryCache()
+    return _directory_cache
@@ -3,13 +3,20 @@ ExecutionLog service - business logic for execution log operations
 """
 from typing import Optional, List, Dict, Any
 from datetime import datetime
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.repositories.log_repository import ExecutionLogRepository
-from app.schemas.execution_log import ExecutionLogResponse
+from app.schemas.execution_log import ExecutionLogListItem, ExecutionLogResponse
 from app.schemas.common import LogStatus
 
 
+# 列表页和导出只查询列表项字段对应的列（不读取 log_content，不实例化 ORM 对象），
+# 整页交给预编译的 TypeAdapter 校验
+LIST_COLUMNS = tuple(ExecutionLogListItem.model_fields)
+_list_adapter = TypeAdapter(List[ExecutionLogListItem])
+
+
 class ExecutionLogService:
     """Service for execution log business logic"""
 
@@ -37,21 +44,28 @@ class ExecutionLogService:
         end_date: Optional[datetime] = None,
         sort_by: str = "start_time",
         order: str = "desc",
+        count_cap: Optional[int] = None,
     ) -> Dict[str, Any]:
-        """List execution logs with pagination, search, and filtering"""
+        """
+        List execution logs with pagination, search, and filtering
+
+        count_cap: stop counting after this many matches (total_capped=True)
+        """
         skip = (page - 1) * page_size
 
-        # Get items and count
-        items = await self.repo.search(
+        # Get items and count (one query)
+        result = await self.repo.search_page(
             search_term=search,
             status=status,
             skip=skip,
             limit=page_size,
             sort_by=sort_by,
             order=order,
+            columns=LIST_COLUMNS,
+            count_cap=count_cap,
         )
-        total = await self.repo.count_search(search_term=search, status=status)
 
+        total = result.total
         total_pages = (total + page_size - 1) // page_size if total > 0 else 0
 
         return {
@@ -59,7 +73,8 @@ class ExecutionLogService:
             "page": page,
             "page_size": page_size,
             "total_pages": total_pages,
-            "items": [ExecutionLogResponse.model_validate(item) for item in items],
+            "total_capped": result.capped,
+            "items": _list_adapter.validate_python(result.items),
         }
 
     async def export_logs(
@@ -69,7 +84,7 @@ class ExecutionLogService:
         app_name: Optional[str] = None,
         start_date: Optional[datetime] = None,
         end_date: Optional[datetime] = None,
-    ) -> List[ExecutionLogResponse]:
+    ) -> List[ExecutionLogListItem]:
         """Export execution logs"""
         # Get all matching logs
         if search:
@@ -78,11 +93,12 @@ class ExecutionLogService:
                 status=status,
                 skip=0,
                 limit=10000,
+                columns=LIST_COLUMNS,
             )
         else:
-            items = await self.repo.get_multi(skip=0, limit=10000)
+            items = await self.repo.get_multi(skip=0, limit=10000, columns=LIST_COLUMNS)
 
-        return [ExecutionLogResponse.model_validate(item) for item in items]
+        return _list_adapter.validate_python(items)
 
     async def get_log_stats(self) -> Dict[str, int]:
         """Get log statistics by status"""
@@ -136,6 +152,8 @@ class ExecutionLogService:
         host_ip: str = "",
         log_info: bool = False,
         screenshot: bool = False,
+        screenshot_path: Optional[str] = None,
+        log_content: Optional[str] = None,
     ) -> ExecutionLogResponse:
         """Create a new execution log entry"""
         log = await self.repo.create_log(
@@ -149,12 +167,14 @@ class ExecutionLogService:
             host_ip=host_ip,
             log_info=log_info,
             screenshot=screenshot,
+            screenshot_path=screenshot_path,
+            log_content=log_content,
         )
         return ExecutionLogResponse.model_validate(log)
 
     async def update_log(self, log_id: str, updates: dict) -> bool:
         """Update an execution log entry"""
-        return await self.repo.update(log_id, updates)
+        return await self.repo.update_no_fetch(log_id, updates)
 
     async def get_execution_rank(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get execution time ranking by app name (all history)"""
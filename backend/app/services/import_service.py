@@ -0,0 +1,254 @@
+"""
+Import service - bulk import of accounts and tasks from CSV / XLSX
+"""
+from typing import Any, BinaryIO, Dict, List, Set, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app.core.database import unit_of_work
+from app.repositories.account_repository import AccountRepository
+from app.repositories.task_repository import TaskRepository
+from app.schemas.account import AccountCreate
+from app.schemas.task import TaskCreate
+from app.services.config_storage_service import ConfigStorageService
+from app.services.directory_cache import ACCOUNTS, TASKS, get_directory_cache
+from app.services.task_service import TaskService
+from app.utils.spreadsheet import (
+    SpreadsheetError,
+    SpreadsheetRow,
+    iter_spreadsheet_rows,
+    next_chunk,
+)
+
+# 每批解析并写入的行数（每批一个事务）
+IMPORT_CHUNK_SIZE = 500
+
+# 中文表头 -> 字段名
+ACCOUNT_HEADER_ALIASES = {
+    "影刀账号": "shadow_bot_account",
+    "机器人账号": "shadow_bot_account",
+    "主机IP": "host_ip",
+    "IP": "host_ip",
+    "端口": "port",
+    "状态": "status",
+    "最近应用": "recent_app",
+}
+
+TASK_HEADER_ALIASES = {
+    "任务名称": "task_name",
+    "影刀账号": "shadow_bot_account",
+    "机器人账号": "shadow_bot_account",
+    "主机IP": "host_ip",
+    "IP": "host_ip",
+    "应用名称": "app_name",
+    "配置文件": "config_file",
+    "配置信息": "config_info",
+    "配置文件路径": "config_file_path",
+    "配置JSON": "config_json",
+    "触发时间": "trigger_time",
+    "备注": "remark",
+}
+
+# 已存在记录只更新这些字段（其余字段构成唯一键）
+ACCOUNT_UPSERT_FIELDS = {"status", "recent_app"}
+TASK_UPSERT_FIELDS = {
+    "task_name",
+    "host_ip",
+    "config_file",
+    "config_info",
+    "config_file_path",
+    "config_json",
+    "trigger_time",
+    "remark",
+}
+
+
+def _format_validation_error(error: ValidationError) -> List[str]:
+    return [
+        f"{'.'.join(str(loc) for loc in item['loc'])}: {item['msg']}"
+        for item in error.errors()
+    ]
+
+
+class ImportService:
+    """Service for spreadsheet imports"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+        self.account_repo = AccountRepository(db)
+        self.task_repo = TaskRepository(db)
+
+    @staticmethod
+    def _new_report() -> Dict[str, Any]:
+        return {
+            "total_rows": 0,
+            "created": 0,
+            "updated": 0,
+            "skipped": 0,
+            "failed": 0,
+            "errors": [],
+        }
+
+    @staticmethod
+    def _add_error(report: Dict[str, Any], row: int, errors: List[str]) -> None:
+        report["failed"] += 1
+        report["errors"].append({"row": row, "errors": errors})
+
+    @staticmethod
+    def _open_rows(file: BinaryIO, filename: str, aliases: Dict[str, str]):
+        try:
+            return iter_spreadsheet_rows(file, filename, aliases)
+        except SpreadsheetError as e:
+            from fastapi import HTTPException
+            raise HTTPException(
+                status_code=400,
+                detail={"code": "INVALID_FILE", "message": str(e)},
+            )
+
+    @staticmethod
+    async def _read_chunk(rows) -> List[SpreadsheetRow]:
+        """Parse the next chunk in a worker thread to keep the event loop free"""
+        try:
+            return await run_in_threadpool(next_chunk, rows, IMPORT_CHUNK_SIZE)
+        except SpreadsheetError as e:
+            from fastapi import HTTPException
+            raise HTTPException(
+                status_code=400,
+                detail={"code": "INVALID_FILE", "message": str(e)},
+            )
+
+    async def _sync_config_refs(self, created, updated: List[Dict[str, Any]]) -> None:
+        """Point imported tasks at their config file blobs"""
+        task_paths = {task.id: task.config_file_path for task in created if task.config_file_path}
+        task_paths.update(
+            {data["id"]: data["config_file_path"] for data in updated if "config_file_path" in data}
+        )
+        await ConfigStorageService(self.db).sync_task_refs(task_paths)
+
+    async def _write_chunk(
+        self,
+        repo,
+        namespace: str,
+        report: Dict[str, Any],
+        new_rows: List[Tuple[int, Dict[str, Any]]],
+        update_rows: List[Tuple[int, Dict[str, Any]]],
+    ) -> bool:
+        """Upsert one chunk in a single transaction; on failure every row is reported"""
+        try:
+            async with unit_of_work(self.db):
+                created = await repo.bulk_create([data for _, data in new_rows])
+                await repo.bulk_update([data for _, data in update_rows])
+                if new_rows or update_rows:
+                    await get_directory_cache().invalidate(self.db, namespace)
+                if namespace == TASKS:
+                    await self._sync_config_refs(created, [data for _, data in update_rows])
+        except Exception as e:
+            for row, _ in new_rows + update_rows:
+                self._add_error(report, row, [f"写入失败: {e}"])
+            return False
+
+        report["created"] += len(new_rows)
+        report["updated"] += len(update_rows)
+        return True
+
+    async def import_accounts(self, file: BinaryIO, filename: str) -> Dict[str, Any]:
+        """
+        Import accounts, upserting on task_control
+
+        Existing task_control values are preloaded once; matching rows only
+        update status / recent_app.
+        """
+        rows = self._open_rows(file, filename, ACCOUNT_HEADER_ALIASES)
+        existing = await self.account_repo.get_task_control_map()
+        seen: Set[str] = set()
+        report = self._new_report()
+
+        while chunk := await self._read_chunk(rows):
+            new_rows, update_rows = [], []
+
+            for row, record in chunk:
+                report["total_rows"] += 1
+                try:
+                    account_in = AccountCreate(**record)
+                except ValidationError as e:
+                    self._add_error(report, row, _format_validation_error(e))
+                    continue
+
+                task_control = f"{account_in.shadow_bot_account}-{account_in.host_ip}:{account_in.port}"
+                if task_control in seen:
+                    self._add_error(report, row, [f"文件中重复的 task_control: {task_control}"])
+                    continue
+                seen.add(task_control)
+
+                if task_control in existing:
+                    changes = {
+                        k: v
+                        for k, v in account_in.model_dump(exclude_unset=True).items()
+                        if k in ACCOUNT_UPSERT_FIELDS
+                    }
+                    if changes:
+                        update_rows.append((row, {"id": existing[task_control], **changes}))
+                    else:
+                        report["skipped"] += 1
+                else:
+                    account_data = account_in.model_dump()
+                    account_data["task_control"] = task_control
+                    new_rows.append((row, account_data))
+
+            await self._write_chunk(self.account_repo, ACCOUNTS, report, new_rows, update_rows)
+
+        return report
+
+    async def import_tasks(self, file: BinaryIO, filename: str) -> Dict[str, Any]:
+        """
+        Import tasks, upserting on (shadow_bot_account, app_name)
+
+        Existing keys are preloaded once; task_count is synced once per
+        affected account at the end.
+        """
+        rows = self._open_rows(file, filename, TASK_HEADER_ALIASES)
+        existing = await self.task_repo.get_account_app_map()
+        seen: Set[Tuple[str, str]] = set()
+        affected_accounts: Set[str] = set()
+        report = self._new_report()
+
+        while chunk := await self._read_chunk(rows):
+            new_rows, update_rows = [], []
+
+            for row, record in chunk:
+                report["total_rows"] += 1
+                try:
+                    task_in = TaskCreate(**record)
+                except ValidationError as e:
+                    self._add_error(report, row, _format_validation_error(e))
+                    continue
+
+                key = (task_in.shadow_bot_account, task_in.app_name)
+                if key in seen:
+                    self._add_error(report, row, [f"文件中重复的账号/应用: {key[0]} / {key[1]}"])
+                    continue
+                seen.add(key)
+
+                if key in existing:
+                    changes = {
+                        k: v
+                        for k, v in task_in.model_dump(exclude_unset=True).items()
+                        if k in TASK_UPSERT_FIELDS
+                    }
+                    if changes:
+                        update_rows.append((row, {"id": existing[key], **changes}))
+                    else:
+                        report["skipped"] += 1
+                else:
+                    new_rows.append((row, task_in.model_dump()))
+
+            if await self._write_chunk(self.task_repo, TASKS, report, new_rows, update_rows):
+                affected_accounts.update(data["shadow_bot_account"] for _, data in new_rows)
+
+        if affected_accounts:
+            async with unit_of_work(self.db):
+                await TaskService(self.db).sync_task_counts(affected_accounts)
+
+        return report
@@ -0,0 +1,507 @@
+"""
+Proxy cache - content-addressed disk cache for proxied OSS resources
+
+Screenshots and log files are immutable in practice but were re-fetched from
+OSS on every view. This cache sits in front of /resources/proxy:
+
+- Bodies are stored once per sha256 under ``blobs/``; ``meta/`` holds one
+  JSON file per URL (blob, ETag, Last-Modified, content type).
+- Total size is bounded; least recently used URLs are evicted first.
+- Entries older than ``PROXY_CACHE_REVALIDATE_SECONDS`` are revalidated
+  with a conditional GET (If-None-Match / If-Modified-Since).
+- A miss is relayed to the client while it is written to the cache, so the
+  first byte never waits for the whole download; the entry is committed only
+  when the body was received completely.
+- Concurrent misses for the same URL share a single upstream fetch: later
+  requests wait for the running download and are then served from disk.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import AsyncGenerator, AsyncIterator, Callable, Dict, List, Optional, Set, Union
+
+import anyio
+import httpx
+
+from app.core.config import get_settings
+from app.core.http_client import get_http_client
+
+logger = logging.getLogger(__name__)
+
+# 同一 URL 的请求等待进行中的下载的最长时间（秒），超时后自行请求上游
+FILL_WAIT_SECONDS = 30
+
+# 启动清理只删除超过此时长（秒）未修改的临时文件 / 无引用 blob：
+# 多个 worker 共用缓存目录，较新的文件可能属于其他 worker 正在进行的下载
+STALE_FILE_SECONDS = 60 * 60
+
+# 有缓存副本时由缓存自身的校验值替代的客户端条件请求头
+CONDITIONAL_HEADERS = ("if-none-match", "if-modified-since", "if-range")
+
+
+@dataclass
+class CacheEntry:
+    """Metadata of one cached URL"""
+    url: str
+    blob: str
+    size: int
+    content_type: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    validated_at: float
+
+
+@dataclass
+class UpstreamResponse:
+    """Open upstream response; the caller streams ``body``, then calls ``aclose()``"""
+    response: httpx.Response
+    body: AsyncGenerator[bytes, None]
+    # body 被完整读取后写入缓存
+    filling: bool = False
+    on_close: Optional[Callable[[], None]] = field(default=None, repr=False)
+
+    async def aclose(self) -> None:
+        """Close the body and the upstream connection (safe to call twice)"""
+        try:
+            await self.body.aclose()
+        finally:
+            await self.response.aclose()
+            if self.on_close is not None:
+                self.on_close()
+
+
+def _url_key(url: str) -> str:
+    return hashlib.sha256(url.encode()).hexdigest()
+
+
+def _unlink(path: Path) -> None:
+    path.unlink(missing_ok=True)
+
+
+async def _raw_body(response: httpx.Response) -> AsyncIterator[bytes]:
+    # aiter_raw 保持上游编码，Content-Length / Content-Encoding 才能原样转发；
+    # 已读入内存的响应（如 MockTransport 构造的响应）直接返回其内容
+    if response.is_stream_consumed:
+        if response.content:
+            yield response.content
+        return
+    # 不指定 chunk_size：收到多少转发多少，不为凑满一块而等待上游
+    async for chunk in response.aiter_raw():
+        yield chunk
+
+
+def _unlink_if_stale(path: Path, stale_before: float) -> None:
+    try:
+        if path.stat().st_mtime < stale_before:
+            path.unlink(missing_ok=True)
+    except FileNotFoundError:
+        pass
+
+
+def _move_blob(tmp_path: Path, blob_path: Path) -> None:
+    blob_path.parent.mkdir(exist_ok=True)
+    # 内容相同的 blob 只保存一份
+    if not blob_path.exists():
+        os.replace(tmp_path, blob_path)
+
+
+class ProxyCache:
+    """
+    Size-bounded LRU disk cache for upstream resources
+
+    使用示例:
+        result = await get_proxy_cache().fetch(url)
+        if isinstance(result, CacheEntry):
+            return FileResponse(get_proxy_cache().blob_path(result))
+        # 否则流式转发 result.body
+    """
+
+    def __init__(
+        self,
+        cache_dir: str,
+        max_bytes: int,
+        max_object_bytes: int,
+        revalidate_seconds: float,
+        client: Optional[httpx.AsyncClient] = None,
+    ):
+        self.root = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.max_object_bytes = min(max_object_bytes, max_bytes)
+        self.revalidate_seconds = revalidate_seconds
+        self._client = client
+
+        # url key -> entry，按最近使用排序（末尾最新）
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        # blob -> 引用该 blob 的 URL 数
+        self._blob_refs: Dict[str, int] = {}
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # url key -> 正在边转发边写入的下载（完成时 set）
+        self._filling: Dict[str, asyncio.Event] = {}
+        self._background: Set[asyncio.Task] = set()
+        self._loaded = False
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def blob_path(self, entry: CacheEntry) -> Path:
+        """Path of the cached body"""
+        return self.root / "blobs" / entry.blob[:2] / entry.blob
+
+    def _meta_path(self, key: str) -> Path:
+        return self.root / "meta" / f"{key}.json"
+
+    # ==================== 读取 ====================
+
+    async def fetch(
+        self,
+        url: str,
+        headers: Optional[Dict[str, str]] = None,
+        max_age: Optional[float] = None,
+    ) -> Union[CacheEntry, "UpstreamResponse"]:
+        """
+        Return the cached entry for url, or the upstream response to relay
+
+        Args:
+            url: Upstream URL
+            headers: Request headers to forward (Range / conditional headers,
+                lower-case names). When a cached copy exists its own
+                validators replace the client's conditional headers.
+            max_age: Serve without revalidation if validated within this many
+                seconds (defaults to PROXY_CACHE_REVALIDATE_SECONDS; 0 always
+                revalidates)
+
+        A 200 response with a known size within the per-file limit is written
+        to the cache while the caller streams ``body`` to the client and is
+        committed only once the body has been read completely. Anything else
+        (non-200, unknown or too large size, encoded body, cache disabled) is
+        relayed as-is. The caller must ``aclose()`` a returned response.
+        Raises httpx.RequestError when the upstream is unreachable.
+        """
+        headers = dict(headers or {})
+        if not self.enabled:
+            return await self._send(url, headers)
+        self._ensure_loaded()
+
+        if max_age is None:
+            max_age = self.revalidate_seconds
+
+        key = _url_key(url)
+        entry = self._usable_entry(key)
+        if entry and time.time() - entry.validated_at < max_age:
+            self._touch(key)
+            self.hits += 1
+            return entry
+
+        # 同一 URL 的并发未命中共享一次上游下载：等待正在进行的下载写入缓存
+        filling = self._filling.get(key)
+        if filling is not None:
+            waited_from = time.time()
+            try:
+                await asyncio.wait_for(filling.wait(), FILL_WAIT_SECONDS)
+            except asyncio.TimeoutError:
+                logger.warning(f"Proxy cache fill still running after {FILL_WAIT_SECONDS}s: {url}")
+            entry = self._usable_entry(key)
+            if entry and entry.validated_at >= waited_from:
+                self._touch(key)
+                self.hits += 1
+                return entry
+
+        if entry:
+            for name in CONDITIONAL_HEADERS:
+                headers.pop(name, None)
+            if entry.etag:
+                headers["if-none-match"] = entry.etag
+            if entry.last_modified:
+                headers["if-modified-since"] = entry.last_modified
+
+        # 发出请求前登记，之后到达的同一 URL 请求等待本次下载
+        done = self._filling[key] = asyncio.Event()
+        try:
+            upstream = await self._send(url, headers)
+        except BaseException:
+            self._finish_fill(key, done)
+            raise
+
+        response = upstream.response
+        if entry and response.status_code == 304:
+            await upstream.aclose()
+            entry.validated_at = time.time()
+            self._touch(key)
+            self.revalidated += 1
+            self._finish_fill(key, done)
+            await anyio.to_thread.run_sync(self._write_meta, key, entry)
+            return entry
+
+        self.misses += 1
+        if not self._cacheable(response):
+            self._finish_fill(key, done)
+            return upstream
+        return UpstreamResponse(
+            response,
+            self._fill(key, url, upstream, done),
+            filling=True,
+            on_close=lambda: self._finish_fill(key, done),
+        )
+
+    async def get(self, url: str, max_age: Optional[float] = None) -> Optional[CacheEntry]:
+        """
+        Return a cached entry for url, downloading the whole body if needed
+
+        For callers that need the complete file (e.g. thumbnail rendering);
+        concurrent calls for the same URL share one download. Returns None
+        when the response cannot be cached.
+        """
+        if not self.enabled:
+            return None
+
+        key = _url_key(url)
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._get_complete(key, url, max_age))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: 某个调用方被取消不会中断其他等待者共享的下载
+        return await asyncio.shield(future)
+
+    def prefetch(self, url: str) -> None:
+        """Download url into the cache in the background"""
+        if not self.enabled or _url_key(url) in self._inflight:
+            return
+        task = asyncio.ensure_future(self.get(url))
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+        # 后台下载失败只影响缓存，不影响请求
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+
+    def stats(self) -> Dict[str, int]:
+        """Cache size and hit counters"""
+        return {
+            "entries": len(self._entries),
+            "blobs": len(self._blob_refs),
+            "total_bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "revalidated": self.revalidated,
+        }
+
+    # ==================== 上游请求 ====================
+
+    async def _send(self, url: str, headers: Dict[str, str]) -> "UpstreamResponse":
+        client = self._client or get_http_client()
+        request = client.build_request("GET", url, headers=headers)
+        response = await client.send(request, stream=True)
+        return UpstreamResponse(response, _raw_body(response))
+
+    async def _get_complete(self, key: str, url: str, max_age: Optional[float]) -> Optional[CacheEntry]:
+        result = await self.fetch(url, max_age=max_age)
+        if isinstance(result, CacheEntry):
+            return result
+        try:
+            if not result.filling:
+                return None
+            async for _ in result.body:
+                pass
+            return self._entries.get(key)
+        finally:
+            await result.aclose()
+
+    def _usable_entry(self, key: str) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry and not self.blob_path(entry).exists():
+            return None
+        return entry
+
+    def _cacheable(self, response: httpx.Response) -> bool:
+        if response.status_code != 200:
+            return False
+        # 大小未知时无法预先判断是否超过上限，直接转发
+        length = response.headers.get("content-length", "")
+        if not length.isdigit() or int(length) > self.max_object_bytes:
+            return False
+        # 缓存保存原始字节并以未编码形式返回，压缩编码的响应不缓存
+        return response.headers.get("content-encoding", "identity").lower() == "identity"
+
+    def _finish_fill(self, key: str, done: asyncio.Event) -> None:
+        # 等待超时后可能已有新的下载登记，只移除自己的
+        if self._filling.get(key) is done:
+            del self._filling[key]
+        done.set()
+
+    async def _fill(
+        self,
+        key: str,
+        url: str,
+        upstream: "UpstreamResponse",
+        done: asyncio.Event,
+    ) -> AsyncIterator[bytes]:
+        """Yield the upstream body while writing it to a temp file, then commit"""
+        response = upstream.response
+        expected = int(response.headers["content-length"])
+        tmp_path = self.root / "tmp" / uuid.uuid4().hex
+        digest = hashlib.sha256()
+        size = 0
+        f = await anyio.open_file(tmp_path, "wb")
+        try:
+            async for chunk in upstream.body:
+                size += len(chunk)
+                if size > expected:
+                    raise httpx.RemoteProtocolError(
+                        f"Upstream body exceeds Content-Length ({expected} bytes): {url}"
+                    )
+                digest.update(chunk)
+                await f.write(chunk)
+                yield chunk
+        finally:
+            # 客户端断开时也要关闭并清理临时文件：屏蔽取消
+            with anyio.CancelScope(shield=True):
+                await upstream.body.aclose()
+                await f.aclose()
+                if size == expected:
+                    await self._commit(key, url, response, tmp_path, digest.hexdigest(), size)
+                await anyio.to_thread.run_sync(_unlink, tmp_path)
+            self._finish_fill(key, done)
+
+    async def _commit(
+        self,
+        key: str,
+        url: str,
+        response: httpx.Response,
+        tmp_path: Path,
+        blob: str,
+        size: int,
+    ) -> None:
+        blob_path = self.root / "blobs" / blob[:2] / blob
+        await anyio.to_thread.run_sync(_move_blob, tmp_path, blob_path)
+        entry = CacheEntry(
+            url=url,
+            blob=blob,
+            size=size,
+            content_type=response.headers.get("content-type", "application/octet-stream"),
+            etag=response.headers.get("etag"),
+            last_modified=response.headers.get("last-modified"),
+            validated_at=time.time(),
+        )
+        garbage = self._store(key, entry)
+        await anyio.to_thread.run_sync(self._persist, key, entry, garbage)
+
+    # ==================== 索引维护 ====================
+
+    def _ensure_loaded(self) -> None:
+        """Rebuild the in-memory index from meta files on first use"""
+        if self._loaded:
+            return
+        self._loaded = True
+
+        for name in ("blobs", "meta", "tmp"):
+            (self.root / name).mkdir(parents=True, exist_ok=True)
+        stale_before = time.time() - STALE_FILE_SECONDS
+        for tmp_file in (self.root / "tmp").iterdir():
+            _unlink_if_stale(tmp_file, stale_before)
+
+        # 按 meta 文件修改时间恢复 LRU 顺序
+        meta_files = sorted((self.root / "meta").glob("*.json"), key=lambda p: p.stat().st_mtime)
+        for meta_path in meta_files:
+            try:
+                entry = CacheEntry(**json.loads(meta_path.read_text(encoding="utf-8")))
+            except (ValueError, TypeError):
+                meta_path.unlink(missing_ok=True)
+                continue
+            if not self.blob_path(entry).exists():
+                meta_path.unlink(missing_ok=True)
+                continue
+            self._entries[meta_path.stem] = entry
+            self._retain(entry)
+
+        # 清理没有被任何 URL 引用的 blob（例如进程中途退出）；
+        # 新的 blob 可能是其他 worker 刚写入、尚未写 meta 的，保留
+        for blob_path in (self.root / "blobs").glob("*/*"):
+            if blob_path.name not in self._blob_refs:
+                _unlink_if_stale(blob_path, stale_before)
+
+        for path in self._evict():
+            _unlink(path)
+
+    def _store(self, key: str, entry: CacheEntry) -> List[Path]:
+        """Index an entry; returns the files to delete (replaced / evicted)"""
+        old = self._entries.pop(key, None)
+        self._entries[key] = entry
+        self._retain(entry)
+        garbage = self._release(old) if old else []
+        return garbage + self._evict()
+
+    def _persist(self, key: str, entry: CacheEntry, garbage: List[Path]) -> None:
+        """Write the meta file and delete garbage (runs in a worker thread)"""
+        self._write_meta(key, entry)
+        for path in garbage:
+            _unlink(path)
+
+    def _touch(self, key: str) -> None:
+        if key not in self._entries:
+            return
+        self._entries.move_to_end(key)
+        # 更新 meta 修改时间，重启后保留 LRU 顺序
+        try:
+            os.utime(self._meta_path(key))
+        except OSError:
+            pass
+
+    def _retain(self, entry: CacheEntry) -> None:
+        refs = self._blob_refs.get(entry.blob, 0)
+        if refs == 0:
+            self.total_bytes += entry.size
+        self._blob_refs[entry.blob] = refs + 1
+
+    def _release(self, entry: CacheEntry) -> List[Path]:
+        refs = self._blob_refs.get(entry.blob, 0) - 1
+        if refs > 0:
+            self._blob_refs[entry.blob] = refs
+            return []
+        self._blob_refs.pop(entry.blob, None)
+        self.total_bytes -= entry.size
+        return [self.blob_path(entry)]
+
+    def _evict(self) -> List[Path]:
+        garbage: List[Path] = []
+        while self.total_bytes > self.max_bytes and self._entries:
+            key, entry = self._entries.popitem(last=False)
+            garbage.append(self._meta_path(key))
+            garbage.extend(self._release(entry))
+            logger.debug(f"Proxy cache evicted: {entry.url}")
+        return garbage
+
+    def _write_meta(self, key: str, entry: CacheEntry) -> None:
+        meta_path = self._meta_path(key)
+        tmp_path = meta_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(asdict(entry), ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp_path, meta_path)
+
+
+# 全局代理缓存实例
+_proxy_cache: Optional[ProxyCache] = None
+
+
+def get_proxy_cache() -> ProxyCache:
+    """获取全局代理缓存实例"""
+    global _proxy_cache
+    if _proxy_cache is None:
+        settings = get_settings()
+        _proxy_cache = ProxyCache(
+            cache_dir=settings.PROXY_CACHE_DIR,
+            max_bytes=settings.PROXY_CACHE_MAX_BYTES,
+            max_object_bytes=settings.PROXY_CACHE_MAX_OBJECT_BYTES,
+            revalidate_seconds=settings.PROXY_CACHE_REVALIDATE_SECONDS,
+        )
+    return _proxy_cache
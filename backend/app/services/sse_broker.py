@@ -0,0 +1,327 @@
+"""
+SSE event brokers (fan-out across worker processes)
+
+SSEService publishes every event through a broker; the broker delivers it
+to the SSE clients of every worker. The publishing worker delivers to its
+own clients directly, peers receive the event over the bus.
+
+- ``LocalBroker`` (SSE_BROKER=local): single process, direct delivery.
+- ``UnixSocketBroker`` (SSE_BROKER=unix): workers on the same host. Each
+  worker binds a Unix datagram socket in SSE_BROKER_PATH and sends every
+  event to the sockets of the others; no separate hub process is needed.
+- ``RedisBroker`` (SSE_BROKER=redis): workers on several hosts, through
+  Redis PUBLISH / SUBSCRIBE on SSE_BROKER_CHANNEL. Only the RESP protocol is
+  used, so any Redis-compatible server (Redis, Valkey, KeyDB, a local
+  stand-in in tests) works.
+
+使用示例:
+    broker = create_broker(settings)
+    await broker.start(deliver)
+    await broker.publish(message)
+    await broker.close()
+"""
+import asyncio
+import errno
+import logging
+import os
+import socket
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+import orjson
+
+from app.core import metrics
+from app.core.responses import dumps
+
+logger = logging.getLogger(__name__)
+
+# 消息：(目标账号 ID 或 None 表示广播, 事件类型, JSON 数据)
+Message = Tuple[Optional[str], str, str]
+Deliver = Callable[[Message], None]
+
+# Unix 套接字：对端列表的刷新间隔（新 worker 最多延迟这么久开始收到事件）
+PEER_REFRESH_SECONDS = 1.0
+
+# Redis：断线重连的等待时间（秒）
+REDIS_RECONNECT_SECONDS = 1.0
+
+BROKER_ERRORS = metrics.counter(
+    "rpa_sse_broker_errors_total",
+    "SSE broker send / receive failures by broker",
+    ("broker",),
+)
+
+
+class LocalBroker:
+    """Single-process broker: events go straight to this worker's clients"""
+    name = "local"
+
+    def __init__(self):
+        self._deliver: Optional[Deliver] = None
+
+    async def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+
+    async def publish(self, message: Message) -> None:
+        self._deliver(message)
+
+    async def close(self) -> None:
+        pass
+
+
+class _BusBroker:
+    """Shared parts of the cross-process brokers: origin tagging and decoding"""
+    name = ""
+
+    def __init__(self):
+        # 每个 worker 的唯一标识，用于忽略自己发出的消息
+        self.origin = uuid.uuid4().hex
+        self._deliver: Optional[Deliver] = None
+
+    def _encode(self, message: Message) -> bytes:
+        target, event_type, data = message
+        return dumps({"origin": self.origin, "target": target, "type": event_type, "data": data})
+
+    def _receive(self, payload: bytes) -> None:
+        try:
+            item = orjson.loads(payload)
+        except orjson.JSONDecodeError:
+            BROKER_ERRORS.inc(self.name)
+            logger.warning(f"Invalid SSE broker message: {payload[:200]!r}")
+            return
+        if item.get("origin") != self.origin:
+            self._deliver((item["target"], item["type"], item["data"]))
+
+    async def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+
+    async def publish(self, message: Message) -> None:
+        # 本 worker 的客户端直接投递，其他 worker 经总线投递
+        self._deliver(message)
+        await self._send(self._encode(message))
+
+    async def _send(self, payload: bytes) -> None:
+        raise NotImplementedError
+
+
+class _DatagramProtocol(asyncio.DatagramProtocol):
+    def __init__(self, receive: Callable[[bytes], None]):
+        self._receive = receive
+
+    def datagram_received(self, data: bytes, addr: Any) -> None:
+        self._receive(data)
+
+    def error_received(self, exc: Exception) -> None:
+        BROKER_ERRORS.inc(UnixSocketBroker.name)
+        logger.warning(f"SSE broker socket error: {exc}")
+
+
+class UnixSocketBroker(_BusBroker):
+    """
+    Same-host fan-out over Unix datagram sockets
+
+    One socket per worker (sse-<pid>-<id>.sock) in a shared directory. A full
+    receive buffer on a peer drops the event for that peer; sockets left
+    behind by dead workers are removed on the first failed send.
+    """
+    name = "unix"
+
+    def __init__(self, directory: str):
+        super().__init__()
+        self.directory = Path(directory)
+        self.path = self.directory / f"sse-{os.getpid()}-{self.origin[:8]}.sock"
+        self._transport: Optional[asyncio.DatagramTransport] = None
+        self._sender: Optional[socket.socket] = None
+        self._peers: List[str] = []
+        self._peers_checked = 0.0
+
+    async def start(self, deliver: Deliver) -> None:
+        await super().start(deliver)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.path.unlink(missing_ok=True)
+        self._transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(
+            lambda: _DatagramProtocol(self._receive),
+            local_addr=str(self.path),
+            family=socket.AF_UNIX,
+        )
+        self._sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self._sender.setblocking(False)
+        logger.info(f"SSE unix broker listening on {self.path}")
+
+    def _refresh_peers(self) -> List[str]:
+        now = time.monotonic()
+        if now - self._peers_checked >= PEER_REFRESH_SECONDS:
+            self._peers = [
+                str(path) for path in self.directory.glob("sse-*.sock") if path != self.path
+            ]
+            self._peers_checked = now
+        return self._peers
+
+    async def _send(self, payload: bytes) -> None:
+        for peer in list(self._refresh_peers()):
+            try:
+                self._sender.sendto(payload, peer)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # 对应的 worker 已退出
+                Path(peer).unlink(missing_ok=True)
+                self._peers.remove(peer)
+            except OSError as e:
+                # EAGAIN：对端接收缓冲区已满；EMSGSIZE：事件过大
+                BROKER_ERRORS.inc(self.name)
+                logger.warning(f"SSE event not sent to {peer}: {errno.errorcode.get(e.errno, e)}")
+
+    async def close(self) -> None:
+        if self._transport is not None:
+            self._transport.close()
+            self._transport = None
+        if self._sender is not None:
+            self._sender.close()
+            self._sender = None
+        self.path.unlink(missing_ok=True)
+
+
+def _resp_command(*args: Any) -> bytes:
+    parts = [f"*{len(args)}\r\n".encode()]
+    for arg in args:
+        data = arg if isinstance(arg, bytes) else str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+
+async def _resp_reply(reader: asyncio.StreamReader) -> Any:
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("Connection closed by server")
+    kind, body = line[:1], line[1:-2]
+    if kind == b"+":
+        return body.decode()
+    if kind == b"-":
+        raise ConnectionError(f"Redis error: {body.decode()}")
+    if kind == b":":
+        return int(body)
+    if kind == b"$":
+        length = int(body)
+        if length < 0:
+            return None
+        data = await reader.readexactly(length + 2)
+        return data[:-2]
+    if kind == b"*":
+        length = int(body)
+        return None if length < 0 else [await _resp_reply(reader) for _ in range(length)]
+    raise ConnectionError(f"Unexpected Redis reply: {line[:50]!r}")
+
+
+class RedisBroker(_BusBroker):
+    """
+    Fan-out through Redis PUBLISH / SUBSCRIBE
+
+    Uses two connections (a subscribed connection cannot publish) and
+    reconnects after failures. ``rediss://`` URLs connect over TLS and a
+    database index in the URL path is selected on each connection. Events published while the bus is down
+    still reach this worker's own clients.
+    """
+    name = "redis"
+
+    def __init__(self, url: str, channel: str):
+        super().__init__()
+        parts = urlsplit(url)
+        if parts.scheme not in ("redis", "rediss"):
+            raise ValueError(f"Unsupported SSE_BROKER_URL scheme: {url!r} (expected redis:// or rediss://)")
+        db = parts.path.lstrip("/")
+        if db and not db.isdigit():
+            raise ValueError(f"Invalid Redis database in SSE_BROKER_URL: {db!r}")
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or 6379
+        self.password = unquote(parts.password) if parts.password else None
+        self.username = unquote(parts.username) if parts.username else None
+        # rediss:// 使用 TLS（校验服务器证书）
+        self.ssl = parts.scheme == "rediss"
+        self.db = int(db or 0)
+        self.channel = channel
+        self._publisher: Optional[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = None
+        self._publish_lock = asyncio.Lock()
+        self._subscriber_task: Optional[asyncio.Task] = None
+
+    async def _connect(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        reader, writer = await asyncio.open_connection(self.host, self.port, ssl=self.ssl or None)
+        try:
+            if self.password:
+                auth = ("AUTH", self.username, self.password) if self.username else ("AUTH", self.password)
+                writer.write(_resp_command(*auth))
+                await _resp_reply(reader)
+            if self.db:
+                writer.write(_resp_command("SELECT", self.db))
+                await _resp_reply(reader)
+        except BaseException:
+            writer.close()
+            raise
+        return reader, writer
+
+    async def start(self, deliver: Deliver) -> None:
+        await super().start(deliver)
+        self._subscriber_task = asyncio.create_task(self._subscribe())
+
+    async def _subscribe(self) -> None:
+        while True:
+            writer = None
+            try:
+                reader, writer = await self._connect()
+                writer.write(_resp_command("SUBSCRIBE", self.channel))
+                await writer.drain()
+                logger.info(f"SSE redis broker subscribed to {self.channel} on {self.host}:{self.port}")
+                while True:
+                    reply = await _resp_reply(reader)
+                    if isinstance(reply, list) and reply and reply[0] == b"message":
+                        self._receive(reply[2])
+            except asyncio.CancelledError:
+                raise
+            except (OSError, ConnectionError, asyncio.IncompleteReadError) as e:
+                BROKER_ERRORS.inc(self.name)
+                logger.warning(f"SSE redis subscription lost: {e}; reconnecting")
+            finally:
+                if writer is not None:
+                    writer.close()
+            await asyncio.sleep(REDIS_RECONNECT_SECONDS)
+
+    async def _send(self, payload: bytes) -> None:
+        async with self._publish_lock:
+            try:
+                if self._publisher is None:
+                    self._publisher = await self._connect()
+                reader, writer = self._publisher
+                writer.write(_resp_command("PUBLISH", self.channel, payload))
+                await writer.drain()
+                await _resp_reply(reader)
+            except (OSError, ConnectionError, asyncio.IncompleteReadError) as e:
+                BROKER_ERRORS.inc(self.name)
+                logger.warning(f"SSE redis publish failed: {e}")
+                if self._publisher is not None:
+                    self._publisher[1].close()
+                    self._publisher = None
+
+    async def close(self) -> None:
+        if self._subscriber_task is not None:
+            self._subscriber_task.cancel()
+            try:
+                await self._subscriber_task
+            except asyncio.CancelledError:
+                pass
+            self._subscriber_task = None
+        if self._publisher is not None:
+            self._publisher[1].close()
+            self._publisher = None
+
+
+def create_broker(settings) -> "LocalBroker | UnixSocketBroker | RedisBroker":
+    """Broker selected by SSE_BROKER (local / unix / redis)"""
+    kind = settings.SSE_BROKER.lower()
+    if kind == "local":
+        return LocalBroker()
+    if kind == "unix":
+        return UnixSocketBroker(settings.SSE_BROKER_PATH)
+    if kind == "redis":
+        return RedisBroker(settings.SSE_BROKER_URL, settings.SSE_BROKER_CHANNEL)
+    raise ValueError(f"Unknown SSE_BROKER: {settings.SSE_BROKER!r} (expected local, unix or redis)")
@@ -5,16 +5,39 @@ SSE (Server-Sent Events) Service for real-time updates
 - 日志创建事件 (log_created)
 - 账号状态更新事件 (account_updated)
 - 任务状态更新事件 (task_updated)
+
+事件经 broker 分发（见 sse_broker），多 worker 部署时每个 worker 的客户端都能收到。
 """
 import asyncio
-import json
 import logging
-from typing import Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional, Set, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 
+from app.core import metrics
+from app.core.responses import dumps_str
+from app.services.sse_broker import LocalBroker, Message
+
 logger = logging.getLogger(__name__)
 
+# 每个客户端最多缓存的未发送事件数（消费过慢时丢弃最旧的事件）
+DEFAULT_QUEUE_SIZE = 1000
+
+EVENTS_PUBLISHED = metrics.counter(
+    "rpa_sse_events_published_total",
+    "SSE events published by type",
+    ("type",),
+)
+EVENTS_DROPPED = metrics.counter(
+    "rpa_sse_events_dropped_total",
+    "SSE events dropped because a client queue was full",
+)
+
+
+def _encode_event(event: Dict[str, Any]) -> Tuple[str, str]:
+    """Serialize an event once into the (event type, JSON data) queue item"""
+    return event.get("type", "message"), dumps_str(event)
+
 
 @dataclass
 class SSEClient:
@@ -31,7 +54,8 @@ class SSEService:
 
     使用示例:
         # 在 main.py 中初始化
-        sse_service = SSEService()
+        sse_service = SSEService(broker=create_broker(settings))
+        await sse_service.start()
 
         # 在 Webhook 处理中广播事件
         await sse_service.broadcast({
@@ -43,17 +67,22 @@ class SSEService:
         const eventSource = new EventSource('/api/v1/sse/events');
     """
 
-    def __init__(self):
+    def __init__(self, queue_size: int = DEFAULT_QUEUE_SIZE, broker=None):
+        self.broker = broker if broker is not None else LocalBroker()
+        self._started = False
         self._clients: Dict[str, SSEClient] = {}
         self._client_counter = 0
         self._lock = asyncio.Lock()
+        self._queue_size = queue_size
+        self.dropped_events = 0
 
     async def add_client(self, client_id: str, account_id: Optional[str] = None) -> SSEClient:
         """添加一个新的 SSE 客户端"""
         async with self._lock:
             client = SSEClient(
                 client_id=client_id,
-                account_id=account_id
+                account_id=account_id,
+                queue=asyncio.Queue(maxsize=self._queue_size),
             )
             self._clients[client_id] = client
             logger.info(f"SSE client connected: {client_id}, account_id: {account_id}")
@@ -71,28 +100,68 @@ class SSEService:
         async with self._lock:
             return len(self._clients)
 
+    def queue_depths(self) -> Dict[str, int]:
+        """Undelivered events per connected client"""
+        return {client_id: client.queue.qsize() for client_id, client in self._clients.items()}
+
+    def _enqueue(self, client: SSEClient, message: Tuple[str, str]) -> None:
+        """Queue an event without blocking; a full queue drops its oldest event"""
+        try:
+            client.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            client.queue.get_nowait()
+            client.queue.put_nowait(message)
+            self.dropped_events += 1
+            EVENTS_DROPPED.inc()
+            logger.warning(f"SSE client {client.client_id} queue full, dropped oldest event")
+
+    async def start(self) -> None:
+        """Start the broker (subscribe to events from other workers)"""
+        if not self._started:
+            self._started = True
+            await self.broker.start(self._deliver)
+
+    async def close(self) -> None:
+        """Stop the broker"""
+        if self._started:
+            self._started = False
+            await self.broker.close()
+
+    def _deliver(self, message: Message) -> None:
+        """Queue an event from the broker to this worker's matching clients"""
+        account_id, event_type, event_data = message
+        disconnected = []
+        for client_id, client in list(self._clients.items()):
+            if account_id is not None and client.account_id != account_id:
+                continue
+            try:
+                self._enqueue(client, (event_type, event_data))
+            except Exception as e:
+                logger.error(f"Failed to send event to client {client_id}: {e}")
+                disconnected.append(client_id)
+
+        # 清理断开的客户端
+        for client_id in disconnected:
+            self._clients.pop(client_id, None)
+            logger.info(f"SSE client disconnected: {client_id}")
+
+    async def _publish(self, account_id: Optional[str], event: Dict[str, Any]) -> None:
+        # 事件只序列化一次，事件类型随数据传递，客户端无需再逐个解析 JSON
+        event_type, event_data = _encode_event(event)
+        EVENTS_PUBLISHED.inc(event_type)
+        if not self._started:
+            await self.start()
+        await self.broker.publish((account_id, event_type, event_data))
+
     async def broadcast(self, event: Dict[str, any]):
         """
-        广播事件给所有连接的客户端
+        广播事件给所有连接的客户端（多 worker 时经 broker 发送给所有 worker）
 
         Args:
             event: 事件字典，包含 type 和 data 字段
                    例如: {"type": "log_created", "data": {"log_id": "xxx"}}
         """
-        event_json = json.dumps(event, default=str)
-        disconnected = []
-
-        async with self._lock:
-            for client_id, client in self._clients.items():
-                try:
-                    await client.queue.put(event_json)
-                except Exception as e:
-                    logger.error(f"Failed to send event to client {client_id}: {e}")
-                    disconnected.append(client_id)
-
-        # 清理断开的客户端
-        for client_id in disconnected:
-            await self.remove_client(client_id)
+        await self._publish(None, event)
 
     async def send_to_account(self, account_id: str, event: Dict[str, any]):
         """
@@ -102,20 +171,7 @@ class SSEService:
             account_id: 账号ID
             event: 事件字典
         """
-        event_json = json.dumps(event, default=str)
-        disconnected = []
-
-        async with self._lock:
-            for client_id, client in self._clients.items():
-                if client.account_id == account_id:
-                    try:
-                        await client.queue.put(event_json)
-                    except Exception as e:
-                        logger.error(f"Failed to send event to client {client_id}: {e}")
-                        disconnected.append(client_id)
-
-        for client_id in disconnected:
-            await self.remove_client(client_id)
+        await self._publish(account_id, event)
 
     async def generate_events(self, client: SSEClient):
         """
@@ -127,15 +183,11 @@ class SSEService:
             while True:
                 try:
                     # 等待新事件，超时后发送心跳
-                    event_data = await asyncio.wait_for(
+                    event_type, event_data = await asyncio.wait_for(
                         client.queue.get(),
                         timeout=30.0  # 30秒心跳间隔
                     )
 
-                    # 解析事件类型
-                    event_dict = json.loads(event_data)
-                    event_type = event_dict.get("type", "message")
-
                     yield {
                         "event": event_type,
                         "data": event_data
@@ -145,7 +197,7 @@ class SSEService:
                     # 发送心跳保持连接
                     yield {
                         "event": "heartbeat",
-                        "data": json.dumps({
+                        "data": dumps_str({
                             "type": "heartbeat",
                             "timestamp": datetime.utcnow().isoformat()
                         })
@@ -173,3 +225,28 @@ def set_sse_service(service: SSEService):
     """设置全局 SSE 服务实例"""
     global _sse_service
     _sse_service = service
+
+
+def _collect_clients():
+    if _sse_service is not None:
+        yield (), len(_sse_service.queue_depths())
+
+
+def _collect_queued_events():
+    if _sse_service is not None:
+        yield (), sum(_sse_service.queue_depths().values())
+
+
+def _collect_max_queue_depth():
+    if _sse_service is not None:
+        yield (), max(_sse_service.queue_depths().values(), default=0)
+
+
+# 只导出汇总值：按客户端 ID 打标签会让时间序列数随连接数无限增长
+metrics.gauge("rpa_sse_clients", "Connected SSE clients", _collect_clients)
+metrics.gauge("rpa_sse_queued_events", "Undelivered events across all SSE clients", _collect_queued_events)
+metrics.gauge(
+    "rpa_sse_client_queue_depth_max",
+    "Undelivered events of the most backed-up SSE client",
+    _collect_max_queue_depth,
+)
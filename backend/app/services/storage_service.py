@@ -0,0 +1,181 @@
+"""
+Storage service - OSS / local file storage for uploaded files
+
+- The oss2 Bucket is created once per process.
+- oss2 is a blocking SDK: every call runs in a bounded thread pool so large
+  uploads never stall the event loop.
+- Uploads are read in chunks; files larger than one part go through OSS
+  multipart upload.
+- Execution artifacts (screenshots / logs) are not proxied at all: robots get
+  short-lived pre-signed PUT URLs and upload straight to OSS. Without OSS the
+  URLs point at a local signed PUT endpoint that mimics it.
+"""
+import asyncio
+import hashlib
+import hmac
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, List, Optional, Protocol
+from urllib.parse import quote, urlencode
+
+import oss2
+
+from app.core.config import get_settings
+
+settings = get_settings()
+
+# 本地写盘的块大小
+LOCAL_CHUNK_SIZE = 1024 * 1024  # 1 MB
+
+# OSS 分片大小（超过一个分片的文件使用分片上传，OSS 要求分片 >= 100 KB）
+MULTIPART_PART_SIZE = 8 * 1024 * 1024  # 8 MB
+
+# 执行 oss2 阻塞调用的线程数
+STORAGE_MAX_WORKERS = 4
+
+# 执行产物类型 -> 存储目录
+ARTIFACT_FOLDERS = {"screenshot": "screenshots", "log": "logs"}
+
+# 执行产物对象 key: <folder>/<yyyymmdd>/<execution_id>/<filename>
+ARTIFACT_KEY_PATTERN = re.compile(r"^(screenshots|logs)/\d{8}/[0-9a-f]{32}/[^/\\]+$")
+
+# 本地存储时执行产物所在目录（/static/uploads/<object_key>）
+LOCAL_UPLOAD_DIR = "uploads"
+
+# 本地签名上传接口路径
+LOCAL_UPLOAD_PATH = "/api/v1/resources/objects"
+
+
+class AsyncReadable(Protocol):
+    """Anything with ``async read(size)`` (UploadFile, anyio file)"""
+
+    async def read(self, size: int = -1) -> bytes: ...
+
+
+_bucket: Optional[oss2.Bucket] = None
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_oss_bucket() -> Optional[oss2.Bucket]:
+    """获取 OSS Bucket 实例（未配置 OSS 时返回 None）"""
+    global _bucket
+    if not settings.OSS_ACCESS_KEY_ID or not settings.OSS_ACCESS_KEY_SECRET:
+        return None
+    if _bucket is None:
+        auth = oss2.Auth(settings.OSS_ACCESS_KEY_ID, settings.OSS_ACCESS_KEY_SECRET)
+        _bucket = oss2.Bucket(auth, settings.OSS_ENDPOINT, settings.OSS_BUCKET_NAME)
+    return _bucket
+
+
+def oss_object_url(object_name: str) -> str:
+    """Public URL of an OSS object"""
+    return f"https://{settings.OSS_BUCKET_NAME}.{settings.OSS_ENDPOINT}/{object_name}"
+
+
+async def run_blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking (oss2) call in the bounded storage thread pool"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=STORAGE_MAX_WORKERS, thread_name_prefix="storage")
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, partial(func, *args, **kwargs))
+
+
+def shutdown_storage_executor() -> None:
+    """关闭存储线程池（应用关闭时调用）"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
+
+
+async def upload_to_oss(bucket: oss2.Bucket, object_name: str, file: AsyncReadable) -> None:
+    """
+    Upload a file to OSS in chunks
+
+    Small files are sent with a single put_object; anything larger than one
+    part uses multipart upload, reading one part at a time.
+    """
+    first = await file.read(MULTIPART_PART_SIZE)
+    if len(first) < MULTIPART_PART_SIZE:
+        # oss2 在非 2xx 响应时抛出 OssError
+        await run_blocking(bucket.put_object, object_name, first)
+        return
+
+    upload_id = (await run_blocking(bucket.init_multipart_upload, object_name)).upload_id
+    parts: List[oss2.models.PartInfo] = []
+    try:
+        chunk, part_number = first, 1
+        while chunk:
+            result = await run_blocking(bucket.upload_part, object_name, upload_id, part_number, chunk)
+            parts.append(oss2.models.PartInfo(part_number, result.etag))
+            chunk = await file.read(MULTIPART_PART_SIZE)
+            part_number += 1
+
+        await run_blocking(bucket.complete_multipart_upload, object_name, upload_id, parts)
+    except BaseException:
+        # 失败时放弃分片，避免残留未完成的分片占用存储
+        try:
+            await run_blocking(bucket.abort_multipart_upload, object_name, upload_id)
+        except oss2.exceptions.OssError:
+            pass
+        raise
+
+
+def is_artifact_key(object_key: str) -> bool:
+    """Whether object_key has the shape of a key issued by artifact_object_key"""
+    return bool(ARTIFACT_KEY_PATTERN.match(object_key)) and object_key.rsplit("/", 1)[-1] not in (".", "..")
+
+
+def artifact_object_key(kind: str, date: str, execution_id: str, filename: str) -> str:
+    """Object key of an execution artifact"""
+    return f"{ARTIFACT_FOLDERS[kind]}/{date}/{execution_id}/{filename}"
+
+
+def artifact_url(object_key: str) -> str:
+    """Public URL of an uploaded execution artifact"""
+    if get_oss_bucket() is not None:
+        return oss_object_url(object_key)
+    return f"/static/{LOCAL_UPLOAD_DIR}/{object_key}"
+
+
+def _local_signature(object_key: str, expires: int) -> str:
+    message = f"PUT\n{object_key}\n{expires}".encode()
+    return hmac.new(settings.SECRET_KEY.encode(), message, hashlib.sha256).hexdigest()
+
+
+def verify_local_upload(object_key: str, expires: int, signature: str) -> bool:
+    """Check a local pre-signed upload URL (signature and expiry)"""
+    if expires < time.time():
+        return False
+    return hmac.compare_digest(signature, _local_signature(object_key, expires))
+
+
+def presign_put(
+    object_key: str,
+    content_type: str,
+    expires_in: int,
+    base_url: str,
+) -> Dict[str, Any]:
+    """
+    Pre-signed PUT for object_key, valid for expires_in seconds
+
+    Signing is local (no network call). The uploader must send the returned
+    headers unchanged, since Content-Type is part of the OSS signature.
+    """
+    headers = {"Content-Type": content_type}
+    bucket = get_oss_bucket()
+    if bucket is not None:
+        upload_url = bucket.sign_url("PUT", object_key, expires_in, headers=headers, slash_safe=True)
+    else:
+        expires = int(time.time()) + expires_in
+        query = urlencode({"expires": expires, "signature": _local_signature(object_key, expires)})
+        upload_url = f"{base_url.rstrip('/')}{LOCAL_UPLOAD_PATH}/{quote(object_key)}?{query}"
+
+    return {
+        "method": "PUT",
+        "upload_url": upload_url,
+        "headers": headers,
+    }
@@ -1,14 +1,37 @@
 """
 Task service - business logic for task operations
 """
-from typing import Optional, List, Dict, Any, Tuple
+from typing import Optional, List, Dict, Any, Iterable, Tuple
 from datetime import datetime
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.database import in_unit_of_work, unit_of_work
 from app.repositories.task_repository import TaskRepository
 from app.repositories.account_repository import AccountRepository
-from app.schemas.task import TaskCreate, TaskUpdate, TaskResponse, TaskStartResponse, TaskStopResponse
+from app.schemas.task import (
+    TaskCreate,
+    TaskUpdate,
+    TaskResponse,
+    TaskListItem,
+    TaskStartResponse,
+    TaskStopResponse,
+    TaskBatchUpdateItem,
+)
 from app.schemas.common import TaskStatus
+from app.services.config_storage_service import ConfigStorageService
+from app.services.sse_service import get_sse_service
+from app.services.directory_cache import (
+    TASKS,
+    TASK_DIRECTORY_FIELDS,
+    get_directory_cache,
+)
+
+
+# 列表页只查询列表项字段对应的列（不读取 config_json，不实例化 ORM 对象），
+# 整页交给预编译的 TypeAdapter 校验
+LIST_COLUMNS = tuple(TaskListItem.model_fields)
+_list_adapter = TypeAdapter(List[TaskListItem])
 
 
 class TaskService:
@@ -73,8 +96,13 @@ class TaskService:
         status: Optional[str] = None,
         app_name: Optional[str] = None,
         shadow_bot_account: Optional[str] = None,
+        count_cap: Optional[int] = None,
     ) -> Dict[str, Any]:
-        """List tasks with pagination, search, and filtering"""
+        """
+        List tasks with pagination, search, and filtering
+
+        count_cap: stop counting after this many matches (total_capped=True)
+        """
         skip = (page - 1) * page_size
 
         # Build filters
@@ -86,18 +114,25 @@ class TaskService:
         if shadow_bot_account:
             filters["shadow_bot_account"] = shadow_bot_account
 
-        # Get items and count
+        # Get items and count (one query)
         if search:
-            items = await self.repo.search(search_term=search, skip=skip, limit=page_size)
-            total = await self.repo.count_search(search_term=search)
+            result = await self.repo.search_page(
+                search_term=search,
+                skip=skip,
+                limit=page_size,
+                columns=LIST_COLUMNS,
+                count_cap=count_cap,
+            )
         else:
-            items = await self.repo.get_multi(
+            result = await self.repo.get_page(
                 skip=skip,
                 limit=page_size,
                 filters=filters if filters else {},
+                columns=LIST_COLUMNS,
+                count_cap=count_cap,
             )
-            total = await self.repo.count(filters=filters if filters else {})
 
+        total = result.total
         total_pages = (total + page_size - 1) // page_size if total > 0 else 0
 
         return {
@@ -105,15 +140,20 @@ class TaskService:
             "page": page,
             "page_size": page_size,
             "total_pages": total_pages,
-            "items": [TaskResponse.model_validate(item) for item in items],
+            "total_capped": result.capped,
+            "items": _list_adapter.validate_python(result.items),
         }
 
     async def create_task(self, task_in: TaskCreate) -> TaskResponse:
         """Create a new task and sync task_count to associated accounts"""
-        task = await self.repo.create(task_in.model_dump())
+        async with unit_of_work(self.db):
+            task = await self.repo.create(task_in.model_dump())
 
-        # Sync task_count to associated accounts
-        await self._sync_task_count(task.shadow_bot_account)
+            # Sync task_count to associated accounts
+            await self._sync_task_count(task.shadow_bot_account)
+            await get_directory_cache().invalidate(self.db, TASKS)
+            if task.config_file_path:
+                await ConfigStorageService(self.db).sync_task_refs({task.id: task.config_file_path})
 
         return TaskResponse.model_validate(task)
 
@@ -136,15 +176,23 @@ class TaskService:
         # Filter out None values for update
         update_data = {k: v for k, v in task_in.model_dump().items() if v is not None}
 
-        updated_task = await self.repo.update(task_id, update_data)
-
-        # 检查是否修改了 shadow_bot_account
-        new_shadow_bot_account = task_in.shadow_bot_account
-        if new_shadow_bot_account and new_shadow_bot_account != old_shadow_bot_account:
-            # 同步原账号和新账号的 task_count
-            await self._sync_task_count(old_shadow_bot_account)
-            await self._sync_task_count(new_shadow_bot_account)
-            print(f"[更新任务] 账号从 '{old_shadow_bot_account}' 改为 '{new_shadow_bot_account}'")
+        async with unit_of_work(self.db):
+            updated_task = await self.repo.update(task_id, update_data)
+
+            # 检查是否修改了 shadow_bot_account
+            new_shadow_bot_account = task_in.shadow_bot_account
+            if new_shadow_bot_account and new_shadow_bot_account != old_shadow_bot_account:
+                # 同步原账号和新账号的 task_count
+                await self._sync_task_count(old_shadow_bot_account)
+                await self._sync_task_count(new_shadow_bot_account)
+                print(f"[更新任务] 账号从 '{old_shadow_bot_account}' 改为 '{new_shadow_bot_account}'")
+
+            if TASK_DIRECTORY_FIELDS & update_data.keys():
+                await get_directory_cache().invalidate(self.db, TASKS)
+            if "config_file_path" in update_data:
+                await ConfigStorageService(self.db).sync_task_refs(
+                    {task_id: update_data["config_file_path"]}
+                )
 
         return TaskResponse.model_validate(updated_task)
 
@@ -164,14 +212,78 @@ class TaskService:
         # Get shadow_bot_account before deletion for sync
         shadow_bot_account = task.shadow_bot_account
 
-        deleted = await self.repo.delete(task_id)
+        async with unit_of_work(self.db):
+            deleted = await self.repo.delete(task_id)
 
-        # Sync task_count after deletion
-        if deleted:
-            await self._sync_task_count(shadow_bot_account)
+            # Sync task_count after deletion
+            if deleted:
+                await self._sync_task_count(shadow_bot_account)
+                await get_directory_cache().invalidate(self.db, TASKS)
 
         return deleted
 
+    async def bulk_create_tasks(self, tasks_in: List[TaskCreate]) -> List[TaskResponse]:
+        """Create many tasks in one transaction and sync task_count once per account"""
+        async with unit_of_work(self.db):
+            tasks = await self.repo.bulk_create([task_in.model_dump() for task_in in tasks_in])
+
+            await self.sync_task_counts(task.shadow_bot_account for task in tasks)
+            await get_directory_cache().invalidate(self.db, TASKS)
+            await ConfigStorageService(self.db).sync_task_refs(
+                {task.id: task.config_file_path for task in tasks if task.config_file_path}
+            )
+
+        return [TaskResponse.model_validate(task) for task in tasks]
+
+    async def bulk_update_tasks(self, tasks_in: List[TaskBatchUpdateItem]) -> Dict[str, Any]:
+        """Update many tasks by ID in one transaction and sync affected task_counts"""
+        ids = [item.id for item in tasks_in]
+        old_accounts = {task.id: task.shadow_bot_account for task in await self.repo.get_many(ids)}
+
+        rows = []
+        affected_accounts = set()
+        for item in tasks_in:
+            if item.id not in old_accounts:
+                continue
+            rows.append({k: v for k, v in item.model_dump().items() if v is not None})
+
+            # 账号变更时，原账号和新账号都需要同步 task_count
+            new_account = item.shadow_bot_account
+            if new_account and new_account != old_accounts[item.id]:
+                affected_accounts.update({old_accounts[item.id], new_account})
+
+        async with unit_of_work(self.db):
+            count = await self.repo.bulk_update(rows)
+
+            await self.sync_task_counts(affected_accounts)
+            if any(TASK_DIRECTORY_FIELDS & row.keys() for row in rows):
+                await get_directory_cache().invalidate(self.db, TASKS)
+            await ConfigStorageService(self.db).sync_task_refs(
+                {row["id"]: row["config_file_path"] for row in rows if "config_file_path" in row}
+            )
+
+        return {
+            "count": count,
+            "not_found": [id for id in ids if id not in old_accounts],
+        }
+
+    async def bulk_delete_tasks(self, task_ids: List[str]) -> Dict[str, Any]:
+        """Delete many tasks by ID in one transaction and sync affected task_counts"""
+        tasks = await self.repo.get_many(task_ids)
+        existing_ids = {task.id for task in tasks}
+
+        async with unit_of_work(self.db):
+            count = await self.repo.bulk_delete(list(existing_ids))
+
+            await self.sync_task_counts(task.shadow_bot_account for task in tasks)
+            if count:
+                await get_directory_cache().invalidate(self.db, TASKS)
+
+        return {
+            "count": count,
+            "not_found": [id for id in task_ids if id not in existing_ids],
+        }
+
     async def start_task(self, task_id: str) -> TaskStartResponse:
         """Start a task - send control request via intranet proxy
 
@@ -197,8 +309,8 @@ class TaskService:
                 },
             )
 
-        # 获取关联账号的端口信息
-        accounts = await self.account_repo.get_by_shadow_bot_account_list(task.shadow_bot_account)
+        # 获取关联账号的端口信息（走目录缓存）
+        accounts = await get_directory_cache().get_accounts(self.db, task.shadow_bot_account)
         if not accounts:
             from fastapi import HTTPException
             raise HTTPException(
@@ -264,8 +376,8 @@ class TaskService:
                 },
             )
 
-        # 获取关联账号的端口信息
-        accounts = await self.account_repo.get_by_shadow_bot_account_list(task.shadow_bot_account)
+        # 获取关联账号的端口信息（走目录缓存）
+        accounts = await get_directory_cache().get_accounts(self.db, task.shadow_bot_account)
         if not accounts:
             from fastapi import HTTPException
             raise HTTPException(
@@ -334,8 +446,8 @@ class TaskService:
                 },
             )
 
-        # 获取关联账号的端口信息
-        accounts = await self.account_repo.get_by_shadow_bot_account_list(task.shadow_bot_account)
+        # 获取关联账号的端口信息（走目录缓存）
+        accounts = await get_directory_cache().get_accounts(self.db, task.shadow_bot_account)
         account = accounts[0] if accounts else None
 
         # 可选：发送停止代理请求（即使失败也继续）
@@ -351,24 +463,27 @@ class TaskService:
             except Exception as e:
                 print(f"[强制停止] 代理请求失败（不影响状态更新）: {e}")
 
-        # 直接更新任务状态为 pending
-        await self.repo.update(task_id, {"status": TaskStatus.pending.value})
+        # 任务与账号状态在同一事务中更新，避免只更新一半
+        async with unit_of_work(self.db):
+            # 直接更新任务状态为 pending
+            await self.repo.update_no_fetch(task_id, {"status": TaskStatus.pending.value})
+
+            # 更新关联账号状态
+            if account:
+                await self.account_repo.update_no_fetch(
+                    account.id,
+                    {
+                        "status": TaskStatus.pending.value,
+                        "recent_app": task.app_name,
+                    }
+                )
         print(f"[强制停止] 任务状态已更新为 pending: {task_id}")
-
-        # 更新关联账号状态
         if account:
-            await self.account_repo.update(
-                account.id,
-                {
-                    "status": TaskStatus.pending.value,
-                    "recent_app": task.app_name,
-                }
-            )
             print(f"[强制停止] 账号状态已更新: {account.shadow_bot_account}")
 
         # SSE 广播 - 发送任务更新事件
+        sse_service = get_sse_service()
         try:
-            from app.services.sse_service import sse_service
             await sse_service.broadcast({
                 "type": "task_updated",
                 "data": {
@@ -436,20 +551,27 @@ class TaskService:
         """
         try:
             # Count tasks associated with this shadow_bot_account
-            tasks = await self.repo.get_by_shadow_bot_account(shadow_bot_account)
-            task_count = len(tasks)
-
-            # Get all accounts with this shadow_bot_account
-            accounts = await self.account_repo.get_by_shadow_bot_account_list(shadow_bot_account)
+            task_count = await self.repo.count(
+                filters={"shadow_bot_account": shadow_bot_account}
+            )
 
-            # Update task_count for each account
-            for account in accounts:
-                await self.account_repo.update(account.id, {"task_count": task_count})
+            # Update task_count for all accounts with this shadow_bot_account
+            await self.account_repo.update_by_shadow_bot_account(
+                shadow_bot_account, {"task_count": task_count}
+            )
 
         except Exception as e:
+            # 在工作单元中必须抛出，由外层整体回滚，避免提交只写了一半的数据
+            if in_unit_of_work(self.db):
+                raise
             # Log error but don't fail the main operation
             print(f"Error syncing task_count: {e}")
 
+    async def sync_task_counts(self, shadow_bot_accounts: Iterable[str]) -> None:
+        """Sync task_count once for each distinct shadow_bot_account"""
+        for shadow_bot_account in sorted(set(shadow_bot_accounts)):
+            await self._sync_task_count(shadow_bot_account)
+
     async def update_task_status_by_app(
         self,
         shadow_bot_account: str,
@@ -465,14 +587,12 @@ class TaskService:
         Returns the number of tasks updated.
         """
         try:
-            # Find tasks matching the criteria
-            tasks = await self.repo.get_by_shadow_bot_account(shadow_bot_account)
-            matching_tasks = [t for t in tasks if t.app_name.lower() == app_name.lower()]
-
-            updated_count = 0
-            for task in matching_tasks:
-                await self.repo.update(task.id, {"status": new_status})
-                updated_count += 1
+            # Single UPDATE for all matching tasks (app_name is case-insensitive)
+            updated_count = await self.repo.update_status_by_account_and_app(
+                shadow_bot_account=shadow_bot_account,
+                app_name=app_name,
+                status=new_status,
+            )
 
             if updated_count > 0:
                 print(f"Updated {updated_count} task(s) status to '{new_status}' "
@@ -481,5 +601,7 @@ class TaskService:
             return updated_count
 
         except Exception as e:
+            if in_unit_of_work(self.db):
+                raise
             print(f"Error updating task status: {e}")
             return 0
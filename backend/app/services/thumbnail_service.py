@@ -0,0 +1,318 @@
+"""
+Thumbnail service - resized WebP / AVIF derivatives of screenshots
+
+Screenshots are multi-megabyte PNGs but the log table shows them at 40px.
+Derivatives for every size in ``THUMBNAIL_SIZES`` are rendered once per
+source image and kept on disk:
+
+- Rendering (decode + resize + encode) is CPU bound and runs in a process
+  pool, never on the event loop.
+- Derivatives are keyed by the source content: remote images by the proxy
+  cache blob (sha256 of the body), local files by path + mtime + size.
+- execution-complete schedules rendering in the background, so the first
+  gallery view is usually a cache hit; a miss renders on demand.
+- Concurrent requests for the same image share a single render.
+- Total size is bounded (``THUMBNAIL_CACHE_MAX_BYTES``); the derivatives of
+  the least recently used images are evicted first. Sources that failed to
+  render are retried after ``FAILED_MARKER_TTL_SECONDS``.
+"""
+import asyncio
+import hashlib
+import logging
+import multiprocessing
+import os
+import shutil
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import anyio
+from PIL import Image, UnidentifiedImageError
+
+from app.core.config import get_settings
+from app.core.database import STATIC_DIR
+from app.services.proxy_cache import get_proxy_cache
+from app.utils.images import available_formats, render_derivatives
+
+logger = logging.getLogger(__name__)
+
+# 尺寸名 -> 最长边像素
+THUMBNAIL_SIZES = {
+    "thumb": 160,
+    "small": 480,
+    "medium": 1280,
+}
+
+# 默认输出格式（浏览器声明支持 AVIF 时优先 AVIF）
+DEFAULT_FORMAT = "webp"
+
+# 无法解码的源文件标记（避免每次请求重复尝试）
+FAILED_MARKER = ".failed"
+
+# 失败标记的有效期（秒），过期后重新尝试渲染并可被清理
+FAILED_MARKER_TTL_SECONDS = 24 * 60 * 60
+
+
+def _dir_size(path: Path) -> int:
+    try:
+        return sum(child.stat().st_size for child in path.iterdir() if child.is_file())
+    except FileNotFoundError:
+        return 0
+
+
+def _remove_dirs(paths: List[Path]) -> None:
+    for path in paths:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+class ThumbnailService:
+    """
+    Render and cache image derivatives
+
+    使用示例:
+        path = await get_thumbnail_service().get(url, "thumb", "webp")
+        if path:
+            return FileResponse(path, media_type="image/webp")
+    """
+
+    def __init__(self, cache_dir: str, workers: int, max_bytes: int, static_root: Path = STATIC_DIR):
+        self.root = Path(cache_dir)
+        self.workers = workers
+        self.max_bytes = max_bytes
+        self.static_root = static_root
+        self.formats = available_formats()
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # 后台预生成任务（持有引用，避免被垃圾回收）
+        self._background: Set[asyncio.Task] = set()
+        # 源图 key -> 其缩略图目录的字节数，按最近使用排序（末尾最新）
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._loaded = False
+        self.total_bytes = 0
+        self.hits = 0
+        self.rendered = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.workers > 0 and DEFAULT_FORMAT in self.formats
+
+    def negotiate_format(self, accept: Optional[str]) -> str:
+        """Pick the derivative format for an Accept header"""
+        if accept and "image/avif" in accept and "avif" in self.formats:
+            return "avif"
+        return DEFAULT_FORMAT
+
+    # ==================== 读取 ====================
+
+    async def get(self, url: str, size: str, fmt: str = DEFAULT_FORMAT) -> Optional[Path]:
+        """
+        Path of the derivative of url at size/fmt, rendering it if needed
+
+        Args:
+            url: /static/... path or remote URL (fetched through the proxy cache)
+            size: Key of THUMBNAIL_SIZES
+            fmt: Output format (webp / avif)
+
+        Returns None when the derivative cannot be produced (not an image,
+        source missing or not cacheable, service disabled); the caller should
+        serve the original. Raises httpx.RequestError when a remote source is
+        unreachable.
+        """
+        if not self.enabled or size not in THUMBNAIL_SIZES or fmt not in self.formats:
+            return None
+        self._ensure_loaded()
+
+        source = await self._resolve_source(url)
+        if source is None:
+            return None
+        source_path, key = source
+
+        dest_dir = self._derivative_dir(key)
+        path = dest_dir / f"{size}.{fmt}"
+        if path.exists():
+            self.hits += 1
+            self._touch(key, dest_dir)
+            return path
+        if self._failed_recently(dest_dir):
+            return None
+
+        await self._render(key, source_path, dest_dir)
+        return path if path.exists() else None
+
+    def schedule(self, url: str) -> None:
+        """Render derivatives of url in the background (fire and forget)"""
+        if not self.enabled:
+            return
+        task = asyncio.ensure_future(self.get(url, next(iter(THUMBNAIL_SIZES))))
+        self._background.add(task)
+        task.add_done_callback(self._background_done)
+
+    def _background_done(self, task: asyncio.Task) -> None:
+        self._background.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.warning(f"Thumbnail prefetch failed: {task.exception()}")
+
+    def stats(self) -> Dict[str, int]:
+        """Render and hit counters"""
+        return {
+            "hits": self.hits,
+            "rendered": self.rendered,
+            "inflight": len(self._inflight),
+            "entries": len(self._entries),
+            "total_bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+        }
+
+    # ==================== 内部实现 ====================
+
+    def _derivative_dir(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def _failed_recently(self, dest_dir: Path) -> bool:
+        try:
+            marked_at = (dest_dir / FAILED_MARKER).stat().st_mtime
+        except FileNotFoundError:
+            return False
+        return time.time() - marked_at < FAILED_MARKER_TTL_SECONDS
+
+    async def _resolve_source(self, url: str) -> Optional[Tuple[Path, str]]:
+        """Local file behind url and the derivative key of its content"""
+        if url.startswith("/static/"):
+            root = self.static_root.resolve()
+            path = (root / url[len("/static/"):]).resolve()
+            if not path.is_relative_to(root) or not path.is_file():
+                return None
+            stat = path.stat()
+            identity = f"{path}:{stat.st_mtime_ns}:{stat.st_size}"
+            return path, hashlib.sha256(identity.encode()).hexdigest()
+
+        if url.startswith(("http://", "https://")):
+            cache = get_proxy_cache()
+            entry = await cache.get(url)
+            if entry is None or not entry.content_type.startswith("image/"):
+                return None
+            return cache.blob_path(entry), entry.blob
+
+        return None
+
+    async def _render(self, key: str, source_path: Path, dest_dir: Path) -> None:
+        # 同一图片的并发请求只渲染一次
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._run_render(key, source_path, dest_dir))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        await asyncio.shield(future)
+
+    async def _run_render(self, key: str, source_path: Path, dest_dir: Path) -> None:
+        if self._executor is None:
+            # spawn: 不从已运行事件循环和线程的进程 fork
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(
+                self._executor,
+                render_derivatives,
+                str(source_path),
+                str(dest_dir),
+                THUMBNAIL_SIZES,
+                self.formats,
+            )
+            self.rendered += 1
+        except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+            logger.info(f"Cannot render thumbnails for {source_path}: {e}")
+            dest_dir.mkdir(parents=True, exist_ok=True)
+            (dest_dir / FAILED_MARKER).touch()
+
+        size = await anyio.to_thread.run_sync(_dir_size, dest_dir)
+        garbage = self._store(key, size)
+        if garbage:
+            await anyio.to_thread.run_sync(_remove_dirs, garbage)
+
+    # ==================== 容量控制 ====================
+
+    def _ensure_loaded(self) -> None:
+        """Rebuild the LRU index from the cache directory on first use"""
+        if self._loaded:
+            return
+        self._loaded = True
+
+        self.root.mkdir(parents=True, exist_ok=True)
+        garbage = []
+        entries = []
+        for dest_dir in self.root.glob("*/*"):
+            if not dest_dir.is_dir():
+                continue
+            # 过期的失败标记连同目录一起清理，下次请求重新渲染
+            if (dest_dir / FAILED_MARKER).exists() and not self._failed_recently(dest_dir):
+                garbage.append(dest_dir)
+                continue
+            entries.append((dest_dir.stat().st_mtime, dest_dir.name, _dir_size(dest_dir)))
+
+        # 按目录修改时间恢复 LRU 顺序
+        for _, key, size in sorted(entries):
+            self._entries[key] = size
+            self.total_bytes += size
+        _remove_dirs(garbage + self._evict())
+
+    def _touch(self, key: str, dest_dir: Path) -> None:
+        if key not in self._entries:
+            return
+        self._entries.move_to_end(key)
+        # 更新目录修改时间，重启后保留 LRU 顺序
+        try:
+            os.utime(dest_dir)
+        except OSError:
+            pass
+
+    def _store(self, key: str, size: int) -> List[Path]:
+        """Index a rendered source; returns the derivative dirs to delete"""
+        self.total_bytes += size - self._entries.pop(key, 0)
+        self._entries[key] = size
+        return self._evict()
+
+    def _evict(self) -> List[Path]:
+        garbage: List[Path] = []
+        while self.total_bytes > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self.total_bytes -= size
+            garbage.append(self._derivative_dir(key))
+            logger.debug(f"Thumbnail cache evicted: {key}")
+        return garbage
+
+    def shutdown(self) -> None:
+        """关闭渲染进程池（应用关闭时调用）"""
+        for task in self._background:
+            task.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# 全局缩略图服务实例
+_thumbnail_service: Optional[ThumbnailService] = None
+
+
+def get_thumbnail_service() -> ThumbnailService:
+    """获取全局缩略图服务实例"""
+    global _thumbnail_service
+    if _thumbnail_service is None:
+        settings = get_settings()
+        _thumbnail_service = ThumbnailService(
+            cache_dir=settings.THUMBNAIL_CACHE_DIR,
+            workers=settings.THUMBNAIL_WORKERS,
+            max_bytes=settings.THUMBNAIL_CACHE_MAX_BYTES,
+        )
+    return _thumbnail_service
+
+
+def shutdown_thumbnail_service() -> None:
+    """关闭全局缩略图服务（应用关闭时调用）"""
+    if _thumbnail_service is not None:
+        _thumbnail_service.shutdown()
@@ -0,0 +1,72 @@
+"""
+Byte-range reads over local files
+
+Used by the log viewer to return a slice of a large file without reading the
+rest of it. Reads go through mmap so only the touched pages are loaded.
+"""
+import mmap
+from pathlib import Path
+from typing import Optional, Tuple
+
+# (start, end)，end 不包含
+ByteRange = Tuple[int, int]
+
+
+class RangeNotSatisfiable(ValueError):
+    """Raised when a requested range lies outside the file"""
+
+
+def parse_range_header(header: str, size: int) -> Optional[ByteRange]:
+    """
+    Parse a single-range ``Range: bytes=...`` header
+
+    Returns None for headers that should be ignored (other units, multiple
+    ranges, malformed values), per RFC 9110.
+    """
+    units, _, spec = header.partition("=")
+    if units.strip().lower() != "bytes" or "," in spec:
+        return None
+
+    first, _, last = spec.strip().partition("-")
+    try:
+        if not first:
+            # bytes=-N: 最后 N 个字节
+            suffix = int(last)
+            if suffix <= 0:
+                raise RangeNotSatisfiable(header)
+            return max(size - suffix, 0), size
+        start = int(first)
+        end = int(last) + 1 if last else size
+    except ValueError:
+        return None
+
+    if start >= size or end <= start:
+        raise RangeNotSatisfiable(header)
+    return start, min(end, size)
+
+
+def read_range(path: Path, start: int, end: int) -> bytes:
+    """Read bytes [start, end) of a file via mmap"""
+    if end <= start:
+        return b""
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return mm[start:end]
+
+
+def read_tail(path: Path, size: int, tail: int) -> Tuple[int, bytes]:
+    """
+    Read roughly the last ``tail`` bytes, starting at a line boundary
+
+    The first partial line is dropped (unless the slice has no newline) so
+    the result never begins mid-line or mid-character. Returns (start, data).
+    """
+    start = max(size - tail, 0)
+    if size == 0:
+        return 0, b""
+
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        if start > 0 and mm[start - 1] != ord("\n"):
+            newline = mm.find(b"\n", start, size)
+            if newline != -1 and newline + 1 < size:
+                start = newline + 1
+        return start, mm[start:size]
@@ -0,0 +1,71 @@
+"""
+Image derivatives (thumbnails / WebP / AVIF)
+
+Pure Pillow code with no app imports: ``render_derivatives`` runs inside a
+process pool worker, so the module must stay cheap to import.
+"""
+import os
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+
+from PIL import Image, ImageOps, features
+
+# 输出格式 -> (Pillow 格式名, 保存参数)
+FORMAT_OPTIONS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "avif": ("AVIF", {"quality": 60, "speed": 8}),
+}
+
+# 超大图片保护（约 1.5 亿像素），与 Pillow 默认的解压炸弹阈值一致
+Image.MAX_IMAGE_PIXELS = 178956970
+
+
+def available_formats() -> Tuple[str, ...]:
+    """Derivative formats the installed Pillow can encode"""
+    return tuple(fmt for fmt in FORMAT_OPTIONS if features.check(fmt))
+
+
+def render_derivatives(
+    source: str,
+    dest_dir: str,
+    sizes: Dict[str, int],
+    formats: Iterable[str],
+) -> List[str]:
+    """
+    Write one file per (size, format) into dest_dir
+
+    Each size is a bounding box for the longest edge; images are never
+    upscaled. Files are named ``<size>.<format>`` and written atomically.
+
+    Returns the written file names. Raises PIL.UnidentifiedImageError for
+    files that are not images.
+    """
+    dest = Path(dest_dir)
+    dest.mkdir(parents=True, exist_ok=True)
+    written = []
+
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if image.has_transparency_data else "RGB")
+
+        # 从大到小依次缩放，后面的尺寸基于上一次的结果，减少重复计算
+        current = image
+        for name, edge in sorted(sizes.items(), key=lambda item: -item[1]):
+            if max(current.size) > edge:
+                current = current.copy()
+                current.thumbnail((edge, edge), Image.LANCZOS)
+
+            for fmt in formats:
+                pil_format, options = FORMAT_OPTIONS[fmt]
+                path = dest / f"{name}.{fmt}"
+                tmp_path = dest / f".{uuid.uuid4().hex}.tmp"
+                try:
+                    current.save(tmp_path, pil_format, **options)
+                    os.replace(tmp_path, path)
+                finally:
+                    tmp_path.unlink(missing_ok=True)
+                written.append(path.name)
+
+    return written
@@ -0,0 +1,116 @@
+"""
+Spreadsheet (CSV / XLSX) row streaming
+
+Rows are read lazily so large inventories are never fully loaded in memory.
+XLSX support needs openpyxl (read-only mode).
+"""
+import csv
+import io
+from itertools import islice
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, List, Mapping, Optional, Tuple
+
+SUPPORTED_EXTENSIONS = {".csv", ".xlsx"}
+
+# (行号, {字段名: 值})，行号从 2 开始（第 1 行为表头）
+SpreadsheetRow = Tuple[int, Dict[str, Any]]
+
+
+class SpreadsheetError(ValueError):
+    """Raised when a file cannot be parsed as a spreadsheet"""
+
+
+def _normalize_header(value: Any, aliases: Mapping[str, str]) -> Optional[str]:
+    """Map a header cell to a field name via aliases (case-insensitive)"""
+    if value is None:
+        return None
+    header = str(value).strip()
+    if not header:
+        return None
+    return aliases.get(header) or aliases.get(header.lower()) or header.lower()
+
+
+def _clean_cell(value: Any) -> Any:
+    """Strip strings; empty cells become None so schema defaults apply"""
+    if isinstance(value, str):
+        value = value.strip()
+        return value or None
+    return value
+
+
+def _iter_records(
+    raw_rows: Iterator[Any],
+    aliases: Mapping[str, str],
+) -> Iterator[SpreadsheetRow]:
+    try:
+        header_row = next(raw_rows)
+    except StopIteration:
+        return
+
+    headers = [_normalize_header(cell, aliases) for cell in header_row]
+    if not any(headers):
+        raise SpreadsheetError("表头为空")
+
+    for row_number, values in enumerate(raw_rows, start=2):
+        record = {}
+        for header, value in zip(headers, values):
+            value = _clean_cell(value)
+            if header and value is not None:
+                record[header] = value
+        # 跳过空行
+        if record:
+            yield row_number, record
+
+
+def _iter_csv(file: BinaryIO) -> Iterator[List[str]]:
+    # utf-8-sig 兼容 Excel 导出的带 BOM 的 CSV
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", newline="")
+    try:
+        yield from csv.reader(text)
+    except UnicodeDecodeError as e:
+        raise SpreadsheetError(f"CSV 文件需使用 UTF-8 编码: {e}")
+    finally:
+        text.detach()
+
+
+def _iter_xlsx(file: BinaryIO) -> Iterator[Tuple[Any, ...]]:
+    try:
+        import openpyxl
+    except ImportError:
+        raise SpreadsheetError("解析 XLSX 需要安装 openpyxl")
+
+    try:
+        workbook = openpyxl.load_workbook(file, read_only=True, data_only=True)
+    except Exception as e:
+        raise SpreadsheetError(f"无法读取 XLSX 文件: {e}")
+
+    try:
+        yield from workbook.active.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def iter_spreadsheet_rows(
+    file: BinaryIO,
+    filename: str,
+    aliases: Optional[Mapping[str, str]] = None,
+) -> Iterator[SpreadsheetRow]:
+    """
+    Stream data rows from a CSV or XLSX file as header-keyed dicts
+
+    Args:
+        file: Binary file object positioned at the start
+        filename: Original filename, used to pick the parser by extension
+        aliases: Optional header -> field name mapping (e.g. 中文表头)
+    """
+    ext = Path(filename or "").suffix.lower()
+    if ext not in SUPPORTED_EXTENSIONS:
+        raise SpreadsheetError(f"不支持的文件类型: {ext or filename}，仅支持 CSV / XLSX")
+
+    raw_rows = _iter_csv(file) if ext == ".csv" else _iter_xlsx(file)
+    return _iter_records(iter(raw_rows), aliases or {})
+
+
+def next_chunk(rows: Iterator[SpreadsheetRow], size: int) -> List[SpreadsheetRow]:
+    """Take up to size rows from the iterator (empty list when exhausted)"""
+    return list(islice(rows, size))
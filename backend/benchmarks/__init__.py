@@ -0,0 +1,3 @@
+"""
+Backend micro-benchmarks
+"""
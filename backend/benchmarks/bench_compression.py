@@ -0,0 +1,126 @@
+"""
+Benchmark: payload size of list endpoints with and without compression
+
+Requests one full page (page_size=100) of /accounts, /tasks and /logs with
+Accept-Encoding identity, gzip and (if the brotli package is installed) br,
+and reports bytes on the wire and server time per request.
+
+Usage (from backend/):
+    python -m benchmarks.bench_compression --repeat 20
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# 使用独立的临时数据库，避免污染 rpa_app.db
+_DB_DIR = tempfile.mkdtemp(prefix="rpa_bench_")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_DB_DIR}/bench.db"
+
+from httpx import ASGITransport, AsyncClient  # noqa: E402
+
+from app.core import compression  # noqa: E402
+from app.core.database import AsyncSessionLocal, Base, engine  # noqa: E402
+from app.main import app  # noqa: E402
+from app.models.account import Account  # noqa: E402
+from app.models.execution_log import ExecutionLog  # noqa: E402
+from app.models.task import Task  # noqa: E402
+
+ENDPOINTS = ("/api/v1/accounts", "/api/v1/tasks", "/api/v1/logs")
+
+
+async def _seed(rows: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    now = datetime(2026, 1, 21, 10, 0, 0)
+    async with AsyncSessionLocal() as session:
+        for i in range(rows):
+            bot = f"shadow-bot-{i % 20:02d}"
+            session.add(Account(
+                shadow_bot_account=f"{bot}-{i}",
+                host_ip=f"192.168.1.{i % 250}",
+                port=9000 + i,
+                status="completed",
+                recent_app=f"云仓收藏-{i % 10}",
+                end_time=now,
+                task_control=f"{bot}-{i}-192.168.1.{i % 250}:{9000 + i}",
+                task_count=i % 7,
+            ))
+            session.add(Task(
+                task_name=f"每日店铺数据同步任务 {i}",
+                shadow_bot_account=bot,
+                host_ip=f"192.168.1.{i % 250}",
+                app_name=f"云仓收藏-{i}",
+                status="pending",
+                config_file=True,
+                config_info=True,
+                config_file_path=f"/static/configs/blobs/{i:064x}/店铺分类表.xlsx",
+                config_json=json.dumps({"shop": f"店铺{i}", "pages": 20, "retry": 3}, ensure_ascii=False),
+                remark="自动创建的基准测试任务",
+            ))
+            session.add(ExecutionLog(
+                text=f"执行 云仓收藏-{i} 完成，状态: completed | 成功: 120, 失败: {i % 3}",
+                app_name=f"云仓收藏-{i}",
+                shadow_bot_account=bot,
+                status="completed",
+                start_time=now + timedelta(minutes=i),
+                end_time=now + timedelta(minutes=i, seconds=95),
+                duration=95.5,
+                host_ip=f"192.168.1.{i % 250}",
+                log_info=True,
+                screenshot=True,
+                screenshot_path=f"https://rpa-workbench.oss-cn-shenzhen.aliyuncs.com/screenshots/20260121/{i:032x}/step.png",
+                log_content=f"https://rpa-workbench.oss-cn-shenzhen.aliyuncs.com/logs/20260121/{i:032x}/run.log",
+            ))
+        await session.commit()
+
+
+async def _measure(client: AsyncClient, path: str, encoding: str, repeat: int) -> dict:
+    sizes = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        # stream 模式读取原始字节，得到实际传输大小
+        async with client.stream(
+            "GET", path, params={"page_size": 100}, headers={"Accept-Encoding": encoding}
+        ) as response:
+            raw = b"".join([chunk async for chunk in response.aiter_raw()])
+            sizes.append(len(raw))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "endpoint": path,
+        "encoding": encoding,
+        "bytes": sizes[-1],
+        "ms_per_request": round(elapsed / repeat * 1000, 2),
+    }
+
+
+async def main(repeat: int) -> list[dict]:
+    engine.echo = False
+    await _seed(100)
+
+    encodings = ["identity", "gzip"] + (["br"] if compression.brotli is not None else [])
+    results = []
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        for path in ENDPOINTS:
+            rows = [await _measure(client, path, encoding, repeat) for encoding in encodings]
+            identity = rows[0]["bytes"]
+            for row in rows:
+                row["ratio"] = round(identity / row["bytes"], 1)
+            results.extend(rows)
+
+    await engine.dispose()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=20, help="Requests per endpoint and encoding")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(main(args.repeat)), indent=2, ensure_ascii=False))
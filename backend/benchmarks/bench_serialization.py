@@ -0,0 +1,118 @@
+"""
+Benchmark: JSON serialization cost of list endpoints and SSE events
+
+For one full page (page_size=100) of /accounts, /tasks and /logs reports:
+
+- requests per second through the app as configured (default response class
+  from app.core.responses)
+- time to turn the validated page model into JSON bytes: ``model_dump``
+  followed by the standard library or orjson, versus pydantic-core's
+  ``model_dump_json``
+
+and the per-event cost of an SSE broadcast to 50 clients, old (json.dumps
+once + json.loads per client) versus new (orjson once, type queued with the
+data).
+
+Usage (from backend/):
+    python -m benchmarks.bench_serialization --repeat 200
+"""
+import argparse
+import asyncio
+import json
+import time
+
+# 复用压缩基准的种子数据（导入时即切换到临时数据库）
+from benchmarks.bench_compression import ENDPOINTS, _seed
+from httpx import ASGITransport, AsyncClient
+
+from app.core import responses
+from app.core.database import engine
+from app.main import app
+from app.schemas.account import AccountListResponse
+from app.schemas.execution_log import ExecutionLogListResponse
+from app.schemas.task import TaskListResponse
+
+MODELS = {
+    "/api/v1/accounts": AccountListResponse,
+    "/api/v1/tasks": TaskListResponse,
+    "/api/v1/logs": ExecutionLogListResponse,
+}
+
+SSE_CLIENTS = 50
+
+
+def _per_call_us(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return round((time.perf_counter() - start) / repeat * 1_000_000, 1)
+
+
+async def _throughput(client: AsyncClient, path: str, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        response = await client.get(path, params={"page_size": 100})
+        response.raise_for_status()
+    return round(repeat / (time.perf_counter() - start), 1)
+
+
+def _sse_fanout(repeat: int) -> dict:
+    event = {
+        "type": "account_updated",
+        "data": {
+            "account_id": "0d7f5c1e-6a0b-4e5e-9a55-1f6f0e0c2b11",
+            "shadow_bot_account": "shadow-bot-01",
+            "changes": {"recent_app": "云仓收藏-1", "status": "completed", "end_time": time.time()},
+        },
+    }
+
+    def old():
+        data = json.dumps(event, default=str)
+        for _ in range(SSE_CLIENTS):
+            json.loads(data).get("type", "message")
+
+    def new():
+        item = (event.get("type", "message"), responses.dumps_str(event))
+        for _ in range(SSE_CLIENTS):
+            item[0]
+
+    return {
+        "clients": SSE_CLIENTS,
+        "stdlib_us": _per_call_us(old, repeat),
+        "orjson_us": _per_call_us(new, repeat),
+    }
+
+
+async def main(repeat: int) -> dict:
+    engine.echo = False
+    await _seed(100)
+
+    results = []
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://bench") as client:
+        for path in ENDPOINTS:
+            body = (await client.get(path, params={"page_size": 100})).json()
+            page = MODELS[path].model_validate(body)
+            data = page.model_dump(mode="json")
+            results.append({
+                "endpoint": path,
+                "bytes": len(responses.dumps(data)),
+                "requests_per_second": await _throughput(client, path, repeat),
+                "stdlib_us": _per_call_us(lambda: json.dumps(page.model_dump(mode="json")).encode(), repeat),
+                "orjson_us": _per_call_us(lambda: responses.dumps(page.model_dump(mode="json")), repeat),
+                "pydantic_us": _per_call_us(page.model_dump_json, repeat),
+            })
+
+    await engine.dispose()
+    return {
+        "pydantic_json_fast_path": responses.PYDANTIC_JSON_FAST_PATH,
+        "endpoints": results,
+        "sse_broadcast": _sse_fanout(repeat),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=200, help="Iterations per measurement")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(main(args.repeat)), indent=2, ensure_ascii=False))
@@ -0,0 +1,106 @@
+"""
+Micro-benchmark: rows/sec for task status updates
+
+Compares the legacy update path (UPDATE + COMMIT + re-SELECT) with
+UPDATE ... RETURNING, the no-fetch variant, and the no-fetch variant
+inside a single unit of work.
+
+Usage (from backend/):
+    python -m benchmarks.bench_status_updates --rows 2000
+"""
+import argparse
+import asyncio
+import json
+import os
+import tempfile
+import time
+
+# 使用独立的临时数据库，避免污染 rpa_app.db
+_DB_DIR = tempfile.mkdtemp(prefix="rpa_bench_")
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_DB_DIR}/bench.db"
+
+from sqlalchemy import select, update  # noqa: E402
+
+from app.core.database import AsyncSessionLocal, Base, engine, unit_of_work  # noqa: E402
+from app.models.task import Task  # noqa: E402
+from app.repositories.task_repository import TaskRepository  # noqa: E402
+
+
+async def _seed(rows: int) -> list[str]:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+    async with AsyncSessionLocal() as session:
+        tasks = [
+            Task(
+                task_name=f"task-{i}",
+                shadow_bot_account=f"bot-{i % 50}",
+                host_ip="10.0.0.1",
+                app_name=f"app-{i}",
+                status="pending",
+            )
+            for i in range(rows)
+        ]
+        session.add_all(tasks)
+        await session.commit()
+        return [task.id for task in tasks]
+
+
+async def _legacy(repo: TaskRepository, task_id: str, status: str) -> None:
+    """The pre-RETURNING BaseRepository.update: UPDATE, COMMIT, SELECT"""
+    await repo.db.execute(update(Task).where(Task.id == task_id).values(status=status))
+    await repo.db.commit()
+    result = await repo.db.execute(select(Task).where(Task.id == task_id))
+    result.scalar_one_or_none()
+
+
+async def _returning(repo: TaskRepository, task_id: str, status: str) -> None:
+    await repo.update(task_id, {"status": status})
+
+
+async def _no_fetch(repo: TaskRepository, task_id: str, status: str) -> None:
+    await repo.update_no_fetch(task_id, {"status": status})
+
+
+async def _run(name: str, ids: list[str], status: str, fn, batched: bool = False) -> dict:
+    async with AsyncSessionLocal() as session:
+        repo = TaskRepository(session)
+        start = time.perf_counter()
+        if batched:
+            async with unit_of_work(session):
+                for task_id in ids:
+                    await fn(repo, task_id, status)
+        else:
+            for task_id in ids:
+                await fn(repo, task_id, status)
+        elapsed = time.perf_counter() - start
+
+    return {
+        "variant": name,
+        "rows": len(ids),
+        "seconds": round(elapsed, 4),
+        "rows_per_sec": round(len(ids) / elapsed, 1),
+    }
+
+
+async def main(rows: int) -> list[dict]:
+    engine.echo = False
+    ids = await _seed(rows)
+
+    results = [
+        await _run("legacy_update_commit_select", ids, "running", _legacy),
+        await _run("update_returning", ids, "pending", _returning),
+        await _run("update_no_fetch", ids, "running", _no_fetch),
+        await _run("update_no_fetch_unit_of_work", ids, "pending", _no_fetch, batched=True),
+    ]
+    await engine.dispose()
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2000, help="Number of task rows to update")
+    args = parser.parse_args()
+
+    print(json.dumps(asyncio.run(main(args.rows)), indent=2))
@@ -0,0 +1,551 @@
+"""
+Load test: replay robot webhook traffic and dashboard reads against the app
+
+Seeds a synthetic fleet (robots with two accounts each, tasks per robot and
+by default one million execution logs), then runs these phases against the
+real application and reports throughput and p50/p95/p99 latency per phase
+and per endpoint as JSON:
+
+- heartbeat: every robot sends heartbeats
+- confirm: robots confirm START / STOP of their tasks
+- complete_burst: all robots finish at the same moment (upload-urls, PUT
+  of a screenshot and a log to the signed upload URLs, execution-complete)
+- reads: dashboard stats/trends/rank, log/task/account lists, log search,
+  proxied screenshots, log tails and intranet control requests
+- mixed: robots and dashboard users at the same time
+
+In-process runs (the default) send requests through httpx.ASGITransport,
+with SSE subscribers draining events. The shared outbound HTTP client is
+pointed at a local stub that plays the intranet proxy and OSS
+(--stub-latency-ms adds network delay). The same --seed gives the same data
+(relative to the current day) and the same request sequence.
+
+Usage (from backend/):
+    python -m benchmarks.loadtest --logs 1000000 --output before.json
+    python -m benchmarks.loadtest --logs 1000000 --compare before.json
+
+Against a running server (e.g. several uvicorn workers) seed a database
+file first and start the server on it; proxy reads are skipped:
+    python -m benchmarks.loadtest --db load.db --seed-only
+    DATABASE_URL=sqlite+aiosqlite:///load.db uvicorn app.main:app --workers 4
+    python -m benchmarks.loadtest --db load.db --url http://127.0.0.1:8000
+"""
+import argparse
+import asyncio
+import io
+import json
+import math
+import os
+import random
+import tempfile
+import time
+import uuid
+from collections import defaultdict
+from datetime import datetime, timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional
+
+# 数据库和缓存目录必须在导入 app 之前确定（--db 指定时复用该文件）
+_pre_parser = argparse.ArgumentParser(add_help=False)
+_pre_parser.add_argument("--db")
+_WORK_DIR = Path(tempfile.mkdtemp(prefix="rpa_load_"))
+_DB_PATH = Path(_pre_parser.parse_known_args()[0].db or _WORK_DIR / "load.db").resolve()
+
+STUB_HOST = "stub.loadtest"
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_DB_PATH}"
+os.environ["INTRANET_PROXY_BASE_URL"] = f"http://{STUB_HOST}/yingdao"
+# 不配置 OSS：机器人上传到本地签名上传接口，不会写到真实 bucket
+os.environ["OSS_ACCESS_KEY_ID"] = ""
+os.environ["PROXY_CACHE_DIR"] = str(_WORK_DIR / "proxy")
+os.environ["THUMBNAIL_CACHE_DIR"] = str(_WORK_DIR / "thumbnails")
+os.environ.setdefault("THUMBNAIL_WORKERS", "0")
+
+import httpx  # noqa: E402
+from PIL import Image  # noqa: E402
+from sqlalchemy import func, select  # noqa: E402
+from starlette.applications import Starlette  # noqa: E402
+from starlette.requests import Request  # noqa: E402
+from starlette.responses import JSONResponse, Response  # noqa: E402
+from starlette.routing import Route  # noqa: E402
+
+from app import main as app_main  # noqa: E402
+from app.api.v1 import resources  # noqa: E402
+from app.core import http_client  # noqa: E402
+from app.core.database import Base, engine  # noqa: E402
+from app.models.account import Account  # noqa: E402
+from app.models.execution_log import ExecutionLog  # noqa: E402
+from app.models.task import Task  # noqa: E402
+from app.services.sse_service import SSEService, set_sse_service  # noqa: E402
+
+API = "/api/v1"
+
+ACCOUNTS_PER_ROBOT = 2
+SEED_CHUNK = 10000
+LOG_BODY_LINES = 4000
+
+Operation = Callable[["Recorder", random.Random], Awaitable[None]]
+
+
+# ==================== 数据 ====================
+
+
+def _robot(i: int) -> str:
+    return f"robot-{i:03d}"
+
+
+def _app(j: int) -> str:
+    return f"云仓收藏-{j:02d}"
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _oss_url(kind: str, day: datetime, rng: random.Random) -> str:
+    name = "step.png" if kind == "screenshots" else "run.log"
+    return f"http://{STUB_HOST}/oss/{kind}/{day:%Y%m%d}/{rng.getrandbits(64):016x}/{name}"
+
+
+async def _seed(args: argparse.Namespace) -> dict:
+    started = time.perf_counter()
+    rng = random.Random(args.seed)
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+
+        accounts, tasks = [], []
+        for i in range(args.robots):
+            for k in range(ACCOUNTS_PER_ROBOT):
+                host_ip = f"10.{k}.{i // 250}.{i % 250 + 1}"
+                accounts.append({
+                    "id": _uuid(rng),
+                    "shadow_bot_account": _robot(i),
+                    "host_ip": host_ip,
+                    "port": 8000,
+                    "status": "completed",
+                    "recent_app": _app(0),
+                    "end_time": today,
+                    "task_control": f"{_robot(i)}-{host_ip}:8000",
+                    "task_count": args.apps,
+                })
+            for j in range(args.apps):
+                tasks.append({
+                    "id": _uuid(rng),
+                    "task_name": f"{_robot(i)} {_app(j)}",
+                    "shadow_bot_account": _robot(i),
+                    "host_ip": f"10.0.{i // 250}.{i % 250 + 1}",
+                    "app_name": _app(j),
+                    "status": "pending",
+                    "config_info": True,
+                    "config_json": json.dumps({"shop": f"店铺{j}", "retry": 3}, ensure_ascii=False),
+                })
+        await conn.execute(Account.__table__.insert(), accounts)
+        await conn.execute(Task.__table__.insert(), tasks)
+
+        # 日志分批插入（Core executemany），百万行约一两分钟
+        span = args.days * 24 * 3600
+        for offset in range(0, args.logs, SEED_CHUNK):
+            rows = []
+            for _ in range(min(SEED_CHUNK, args.logs - offset)):
+                i, j = rng.randrange(args.robots), rng.randrange(args.apps)
+                start = today - timedelta(seconds=rng.randrange(span))
+                duration = round(rng.uniform(30, 1800), 2)
+                status = "completed" if rng.random() < 0.9 else "failed"
+                has_artifacts = rng.random() < 0.5
+                rows.append({
+                    "id": _uuid(rng),
+                    "text": f"执行 {_app(j)} 完成，状态: {status} | 成功: {rng.randrange(500)}, 失败: {rng.randrange(5)}",
+                    "app_name": _app(j),
+                    "shadow_bot_account": _robot(i),
+                    "status": status,
+                    "start_time": start,
+                    "end_time": start + timedelta(seconds=duration),
+                    "duration": duration,
+                    "host_ip": f"10.0.{i // 250}.{i % 250 + 1}",
+                    "log_info": has_artifacts,
+                    "screenshot": has_artifacts,
+                    "screenshot_path": _oss_url("screenshots", start, rng) if has_artifacts else None,
+                    "log_content": _oss_url("logs", start, rng) if has_artifacts else None,
+                    "created_at": start,
+                })
+            await conn.execute(ExecutionLog.__table__.insert(), rows)
+
+    return {"seconds": round(time.perf_counter() - started, 1)}
+
+
+async def _count_logs() -> Optional[int]:
+    try:
+        async with engine.connect() as conn:
+            return (await conn.execute(select(func.count()).select_from(ExecutionLog))).scalar_one()
+    except Exception:
+        return None
+
+
+async def _sample_artifact_urls(limit: int) -> List[str]:
+    async with engine.connect() as conn:
+        result = await conn.execute(
+            select(ExecutionLog.screenshot_path, ExecutionLog.log_content)
+            .where(ExecutionLog.screenshot_path.isnot(None))
+            .limit(limit)
+        )
+        return [url for row in result for url in row]
+
+
+# ==================== 上游替身（内网穿透 / OSS） ====================
+
+
+@lru_cache(maxsize=None)
+def _png_body() -> bytes:
+    image = Image.new("RGB", (1280, 720))
+    image.putdata([((x * 7) % 256, (x * 13) % 256, (x * 29) % 256) for x in range(1280 * 720)])
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+@lru_cache(maxsize=None)
+def _log_body() -> bytes:
+    lines = [f"2026-01-21 10:{n // 60 % 60:02d}:{n % 60:02d} INFO 步骤 {n}: 处理店铺数据完成" for n in range(LOG_BODY_LINES)]
+    return ("\n".join(lines) + "\n").encode()
+
+
+def _stub_app(latency: float) -> Starlette:
+    """Intranet control endpoint and OSS objects with Range support"""
+    bodies = {"png": _png_body(), "log": _log_body()}
+
+    async def intranet(request: Request) -> Response:
+        await asyncio.sleep(latency)
+        return JSONResponse({"code": 0, "message": "ok"})
+
+    async def oss_object(request: Request) -> Response:
+        await asyncio.sleep(latency)
+        path = request.path_params["path"]
+        body = bodies["png"] if path.endswith(".png") else bodies["log"]
+        headers = {"accept-ranges": "bytes", "etag": f'"{len(body)}"'}
+        media_type = "image/png" if path.endswith(".png") else "text/plain"
+
+        spec = request.headers.get("range", "").removeprefix("bytes=")
+        if not spec:
+            return Response(body, media_type=media_type, headers=headers)
+        first, _, last = spec.partition("-")
+        if first:
+            start, end = int(first), min(int(last or len(body) - 1), len(body) - 1)
+        else:
+            start, end = max(0, len(body) - int(last)), len(body) - 1
+        headers["content-range"] = f"bytes {start}-{end}/{len(body)}"
+        return Response(body[start:end + 1], status_code=206, media_type=media_type, headers=headers)
+
+    return Starlette(routes=[
+        Route("/yingdao", intranet),
+        Route("/oss/{path:path}", oss_object),
+    ])
+
+
+# ==================== 流量 ====================
+
+
+class Recorder:
+    """Latencies and errors per endpoint for one phase"""
+
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def call(self, name: str, method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            response = None
+        self.latencies[name].append(time.perf_counter() - started)
+        if response is None or response.status_code >= 400:
+            self.errors[name] += 1
+        return response
+
+
+def _percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of sorted values, in ms"""
+    index = max(0, math.ceil(q / 100 * len(values)) - 1)
+    return round(values[index] * 1000, 2)
+
+
+def _summarize(name: str, recorder: Recorder, seconds: float) -> dict:
+    endpoints = []
+    for endpoint, latencies in sorted(recorder.latencies.items()):
+        latencies.sort()
+        endpoints.append({
+            "endpoint": endpoint,
+            "requests": len(latencies),
+            "errors": recorder.errors[endpoint],
+            "throughput_rps": round(len(latencies) / seconds, 1),
+            "p50_ms": _percentile(latencies, 50),
+            "p95_ms": _percentile(latencies, 95),
+            "p99_ms": _percentile(latencies, 99),
+            "max_ms": round(latencies[-1] * 1000, 2),
+        })
+    total = sum(row["requests"] for row in endpoints)
+    return {
+        "phase": name,
+        "seconds": round(seconds, 2),
+        "requests": total,
+        "errors": sum(row["errors"] for row in endpoints),
+        "throughput_rps": round(total / seconds, 1) if seconds else 0,
+        "endpoints": endpoints,
+    }
+
+
+class Fleet:
+    """Robot and dashboard-user operations"""
+
+    def __init__(self, args: argparse.Namespace, artifact_urls: List[str]):
+        self.args = args
+        self.artifact_urls = artifact_urls
+        self.clock = datetime.now().replace(microsecond=0)
+        self.png = _png_body()[:64 * 1024]
+        self.log = _log_body()[:32 * 1024]
+
+    def _body(self, rng: random.Random) -> dict:
+        robot = rng.randrange(self.args.robots)
+        return {"shadow_bot_account": _robot(robot), "app_name": _app(rng.randrange(self.args.apps))}
+
+    async def heartbeat(self, recorder: Recorder, rng: random.Random) -> None:
+        await recorder.call("POST /webhook/heartbeat", "POST", f"{API}/webhook/heartbeat", json=self._body(rng))
+
+    async def confirm(self, recorder: Recorder, rng: random.Random) -> None:
+        body = {**self._body(rng), "action": rng.choice(("START", "STOP"))}
+        await recorder.call("POST /webhook/confirm", "POST", f"{API}/webhook/confirm", json=body)
+
+    async def complete(self, recorder: Recorder, rng: random.Random) -> None:
+        body = self._body(rng)
+        response = await recorder.call("POST /webhook/upload-urls", "POST", f"{API}/webhook/upload-urls", json={
+            **body,
+            "files": [
+                {"kind": "screenshot", "filename": "step.png", "content_type": "image/png"},
+                {"kind": "log", "filename": "run.log", "content_type": "text/plain"},
+            ],
+        })
+        keys = {}
+        if response is not None and response.status_code == 200:
+            for item in response.json()["uploads"]:
+                content = self.png if item["kind"] == "screenshot" else self.log
+                await recorder.call(
+                    "PUT /resources/objects", item["method"], item["upload_url"],
+                    content=content, headers=item["headers"],
+                )
+                keys[f"{item['kind']}_key"] = item["object_key"]
+
+        duration = rng.randrange(30, 1800)
+        start = self.clock - timedelta(seconds=duration)
+        await recorder.call("POST /webhook/execution-complete", "POST", f"{API}/webhook/execution-complete", json={
+            **body,
+            **keys,
+            "status": "completed" if rng.random() < 0.9 else "failed",
+            "start_time": f"{start:%Y-%m-%d %H:%M:%S}",
+            "end_time": f"{self.clock:%Y-%m-%d %H:%M:%S}",
+            "duration_seconds": duration,
+            "result_summary": {"total_items": 120, "success_items": 118, "failed_items": 2},
+            "log_info": True,
+            "screenshot": True,
+        })
+
+    async def read(self, recorder: Recorder, rng: random.Random) -> None:
+        operations = [
+            (3, "GET /dashboard/stats", f"{API}/dashboard/stats", {}),
+            (2, "GET /dashboard/performance", f"{API}/dashboard/performance", {"days": 30}),
+            (1, "GET /dashboard/execution-rank", f"{API}/dashboard/execution-rank", {}),
+            (4, "GET /logs", f"{API}/logs", {"page": rng.randint(1, 50), "exact_count": "false"}),
+            (2, "GET /logs?search", f"{API}/logs", {"search": _app(rng.randrange(self.args.apps)), "exact_count": "false"}),
+            (2, "GET /logs?shadow_bot_account", f"{API}/logs", {"shadow_bot_account": _robot(rng.randrange(self.args.robots))}),
+            (2, "GET /tasks", f"{API}/tasks", {"page_size": 50}),
+            (2, "GET /accounts", f"{API}/accounts", {"page_size": 50}),
+        ]
+        if not self.args.url and self.artifact_urls:
+            url = rng.choice(self.artifact_urls)
+            if url.endswith(".png"):
+                proxied = ("GET /resources/proxy", f"{API}/resources/proxy", {"url": url})
+            else:
+                proxied = ("GET /resources/log", f"{API}/resources/log", {"url": url, "tail": 65536})
+            operations += [
+                (2, *proxied),
+                (1, "GET /resources/proxy/intranet", f"{API}/resources/proxy/intranet", {
+                    "backend_ip": "10.0.0.1", "backend_port": 8000, "tak": _app(0), "target": "START",
+                }),
+            ]
+        _, name, url, params = rng.choices(operations, weights=[op[0] for op in operations])[0]
+        await recorder.call(name, "GET", url, params=params)
+
+    async def robot_mix(self, recorder: Recorder, rng: random.Random) -> None:
+        operation = rng.choices((self.heartbeat, self.confirm, self.complete), weights=(6, 2, 1))[0]
+        await operation(recorder, rng)
+
+
+async def _worker(operation: Operation, recorder: Recorder, rng: random.Random, iterations: int) -> None:
+    for _ in range(iterations):
+        await operation(recorder, rng)
+
+
+async def _run_phase(name: str, client: httpx.AsyncClient, workers: List[tuple], seed: int) -> dict:
+    """workers: (operation, iterations) per concurrent worker"""
+    recorder = Recorder(client)
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        _worker(operation, recorder, random.Random(f"{seed}-{name}-{n}"), iterations)
+        for n, (operation, iterations) in enumerate(workers)
+    ))
+    return _summarize(name, recorder, time.perf_counter() - started)
+
+
+async def _complete_bursts(client: httpx.AsyncClient, fleet: Fleet, args: argparse.Namespace) -> dict:
+    """All robots finish together, args.bursts times"""
+    recorder = Recorder(client)
+    started = time.perf_counter()
+    for burst in range(args.bursts):
+        await asyncio.gather(*(
+            fleet.complete(recorder, random.Random(f"{args.seed}-burst-{burst}-{n}"))
+            for n in range(args.robots)
+        ))
+    return _summarize("complete_burst", recorder, time.perf_counter() - started)
+
+
+# ==================== 对比 ====================
+
+
+def _compare(results: dict, baseline: dict) -> List[dict]:
+    """Change of throughput and p95/p99 against a previous run, per endpoint"""
+    before = {
+        (phase["phase"], row["endpoint"]): row
+        for phase in baseline.get("phases", [])
+        for row in phase["endpoints"]
+    }
+
+    def change(new: float, old: float) -> Optional[float]:
+        return round((new - old) / old * 100, 1) if old else None
+
+    rows = []
+    for phase in results["phases"]:
+        for row in phase["endpoints"]:
+            old = before.get((phase["phase"], row["endpoint"]))
+            if old:
+                rows.append({
+                    "phase": phase["phase"],
+                    "endpoint": row["endpoint"],
+                    "throughput_change_pct": change(row["throughput_rps"], old["throughput_rps"]),
+                    "p95_change_pct": change(row["p95_ms"], old["p95_ms"]),
+                    "p99_change_pct": change(row["p99_ms"], old["p99_ms"]),
+                })
+    return rows
+
+
+# ==================== 入口 ====================
+
+
+async def _drain(queue: asyncio.Queue) -> None:
+    while True:
+        await queue.get()
+
+
+async def main(args: argparse.Namespace) -> dict:
+    engine.echo = False
+    results = {
+        "meta": {
+            "seed": args.seed,
+            "robots": args.robots,
+            "accounts": args.robots * ACCOUNTS_PER_ROBOT,
+            "tasks": args.robots * args.apps,
+            "target": args.url or "in-process",
+            "database": str(_DB_PATH),
+            "started_at": datetime.now().isoformat(timespec="seconds"),
+        },
+    }
+
+    # --url 且未指定 --db 时，数据由被测服务器自己的数据库提供
+    if not (args.url and not args.db) and (args.reseed or not await _count_logs()):
+        results["seed"] = await _seed(args)
+    results["meta"]["logs"] = await _count_logs()
+    if args.seed_only:
+        await engine.dispose()
+        return results
+
+    sse_tasks = []
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=60)
+        artifact_urls = []
+    else:
+        resources.STATIC_ROOT = _WORK_DIR / "static"
+        # 共享出站客户端指向本地替身（内网穿透 / OSS），仍经过指标采集的 transport
+        http_client._http_client = httpx.AsyncClient(
+            transport=http_client.InstrumentedTransport(
+                httpx.ASGITransport(app=_stub_app(args.stub_latency_ms / 1000))
+            ),
+            **http_client._CLIENT_OPTIONS,
+        )
+        service = SSEService()
+        set_sse_service(service)
+        app_main.sse_service = service
+        for n in range(args.sse_clients):
+            subscriber = await service.add_client(f"loadtest-{n}")
+            sse_tasks.append(asyncio.create_task(_drain(subscriber.queue)))
+        # 应用异常按 500 记为错误，而不是中断压测
+        client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app_main.app, raise_app_exceptions=False),
+            base_url="http://loadtest",
+            timeout=60,
+        )
+        artifact_urls = await _sample_artifact_urls(200)
+
+    fleet = Fleet(args, artifact_urls)
+    def workers(operation: Operation, count: int) -> List[tuple]:
+        return [(operation, args.iterations)] * count
+
+    async with client:
+        results["phases"] = [
+            await _run_phase("heartbeat", client, workers(fleet.heartbeat, args.robots), args.seed),
+            await _run_phase("confirm", client, workers(fleet.confirm, args.robots), args.seed),
+            await _complete_bursts(client, fleet, args),
+            await _run_phase("reads", client, workers(fleet.read, args.readers), args.seed),
+            await _run_phase(
+                "mixed",
+                client,
+                workers(fleet.robot_mix, args.robots) + workers(fleet.read, args.readers),
+                args.seed,
+            ),
+        ]
+
+    for task in sse_tasks:
+        task.cancel()
+    await http_client.close_http_client()
+    await engine.dispose()
+
+    if args.compare:
+        results["comparison"] = _compare(results, json.loads(Path(args.compare).read_text()))
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--db", help="SQLite file to seed / reuse (default: a temporary file)")
+    parser.add_argument("--reseed", action="store_true", help="Recreate the data even if --db already has logs")
+    parser.add_argument("--seed-only", action="store_true", help="Only seed the database")
+    parser.add_argument("--url", help="Base URL of a running server instead of the in-process app")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for data and traffic")
+    parser.add_argument("--robots", type=int, default=50, help="Number of ShadowBot robots")
+    parser.add_argument("--apps", type=int, default=5, help="Tasks (apps) per robot")
+    parser.add_argument("--logs", type=int, default=1_000_000, help="Execution logs to seed")
+    parser.add_argument("--days", type=int, default=180, help="Days of history the logs span")
+    parser.add_argument("--iterations", type=int, default=20, help="Operations per robot / reader and phase")
+    parser.add_argument("--bursts", type=int, default=5, help="Rounds in which all robots complete at once")
+    parser.add_argument("--readers", type=int, default=10, help="Concurrent dashboard users")
+    parser.add_argument("--sse-clients", type=int, default=5, help="SSE subscribers (in-process only)")
+    parser.add_argument("--stub-latency-ms", type=float, default=20, help="Delay of the intranet/OSS stub")
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    parser.add_argument("--compare", help="Previous JSON report to compare against")
+    args = parser.parse_args()
+
+    report = json.dumps(asyncio.run(main(args)), indent=2, ensure_ascii=False)
+    if args.output:
+        Path(args.output).write_text(report + "\n", encoding="utf-8")
+    print(report)
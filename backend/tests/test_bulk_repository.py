@@ -0,0 +1,72 @@
+"""
+Test BaseRepository bulk operations
+"""
+import pytest
+
+from app.repositories.task_repository import TaskRepository
+
+
+def _task(i: int) -> dict:
+    return {
+        "task_name": f"bulk-task-{i}",
+        "shadow_bot_account": "bulk_bot",
+        "host_ip": "192.168.1.1",
+        "app_name": f"bulk_app_{i}",
+    }
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_update_delete(db_session):
+    """
+    Rows are created in input order, updated by id and deleted by id
+    """
+    repo = TaskRepository(db_session)
+
+    tasks = await repo.bulk_create([_task(i) for i in range(5)])
+    assert [task.task_name for task in tasks] == [f"bulk-task-{i}" for i in range(5)]
+    ids = [task.id for task in tasks]
+    assert all(ids)
+
+    count = await repo.bulk_update([
+        {"id": ids[0], "status": "running"},
+        {"id": ids[1], "remark": "updated", "status": None},
+        {"id": "missing", "status": "running"},
+    ])
+    # 不存在的 ID 不计入
+    assert count == 2
+
+    db_session.expire_all()
+    first, second = await repo.get(ids[0]), await repo.get(ids[1])
+    assert first.status == "running"
+    assert second.remark == "updated"
+    assert second.status == "pending"
+
+    deleted = await repo.bulk_delete(ids + ["missing"])
+    assert deleted == 5
+    assert await repo.count(filters={"shadow_bot_account": "bulk_bot"}) == 0
+
+
+@pytest.mark.asyncio
+async def test_update_status_by_account_and_app_matches_name_literally(db_session):
+    """
+    app_name matches case-insensitively; LIKE wildcards in it are literal
+    """
+    repo = TaskRepository(db_session)
+    names = ["Daily_Report", "dailyXreport", "Daily%", "Daily Summary"]
+    await repo.bulk_create([
+        {**_task(i), "shadow_bot_account": "status_bot", "app_name": name}
+        for i, name in enumerate(names)
+    ])
+
+    assert await repo.update_status_by_account_and_app("status_bot", "daily_REPORT", "running") == 1
+    assert await repo.update_status_by_account_and_app("status_bot", "daily%", "running") == 1
+    assert await repo.update_status_by_account_and_app("other_bot", "Daily_Report", "running") == 0
+
+    db_session.expire_all()
+    statuses = {task.app_name: task.status for task in await repo.get_by_shadow_bot_account("status_bot")}
+    assert statuses == {
+        "Daily_Report": "running",
+        "dailyXreport": "pending",
+        "Daily%": "running",
+        "Daily Summary": "pending",
+    }
@@ -0,0 +1,68 @@
+"""
+Test response compression middleware
+"""
+import gzip
+
+import pytest
+from httpx import AsyncClient
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, StreamingResponse
+from starlette.routing import Route
+
+from app.core.compression import CompressionMiddleware
+
+ITEMS = [{"id": i, "shadow_bot_account": f"bot-{i}", "status": "completed"} for i in range(200)]
+
+
+async def _list(request):
+    return JSONResponse({"items": ITEMS[: int(request.query_params.get("n", 200))]})
+
+
+async def _stream(request):
+    async def lines():
+        for item in ITEMS:
+            yield f"{item}\n".encode()
+
+    return StreamingResponse(lines(), media_type=request.query_params.get("type", "text/plain"))
+
+
+@pytest.fixture
+async def compressed_client():
+    app = Starlette(routes=[Route("/list", _list), Route("/stream", _stream)])
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        yield client
+
+
+@pytest.mark.asyncio
+async def test_json_compressed_above_threshold(compressed_client):
+    """
+    Large JSON is gzipped with a matching Content-Length; small JSON is not
+    """
+    async with compressed_client.stream("GET", "/list", headers={"Accept-Encoding": "gzip"}) as response:
+        raw = b"".join([chunk async for chunk in response.aiter_raw()])
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) == len(raw)
+    assert gzip.decompress(raw) == JSONResponse({"items": ITEMS}).body
+
+    response = await compressed_client.get("/list", params={"n": 1}, headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+    response = await compressed_client.get("/list", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_streaming_compressed_but_sse_untouched(compressed_client):
+    """
+    Streaming bodies are compressed chunk by chunk; text/event-stream passes through
+    """
+    response = await compressed_client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.text.count("\n") == len(ITEMS)
+
+    response = await compressed_client.get(
+        "/stream", params={"type": "text/event-stream"}, headers={"Accept-Encoding": "gzip"}
+    )
+    assert "content-encoding" not in response.headers
@@ -0,0 +1,57 @@
+"""
+Test task config endpoints used by ShadowBot
+"""
+import pytest
+
+TASK = {
+    "task_name": "config_task",
+    "shadow_bot_account": "config_bot",
+    "host_ip": "192.168.1.1",
+    "app_name": "config_app",
+    "config_info": True,
+    "config_json": '{"a": 1}',
+}
+
+
+@pytest.mark.asyncio
+async def test_config_get_etag_and_invalidation(client):
+    """
+    Unchanged config answers 304; a task update changes the ETag
+    """
+    task = (await client.post("/api/v1/tasks", json=TASK)).json()
+    body = {"shadow_bot_account": "config_bot", "app_name": "config_app"}
+
+    response = await client.post("/api/v1/resources/config/get", json=body)
+    assert response.status_code == 200
+    assert response.json()["config_json"] == '{"a": 1}'
+    etag = response.headers["etag"]
+
+    response = await client.post(
+        "/api/v1/resources/config/get", json=body, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 304
+
+    await client.put(f"/api/v1/tasks/{task['id']}", json={"config_json": '{"a": 2}'})
+    response = await client.post(
+        "/api/v1/resources/config/get", json=body, headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.json()["config_json"] == '{"a": 2}'
+    assert response.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_config_batch(client):
+    """
+    Batch returns found configs keyed by app name and lists the missing ones
+    """
+    await client.post("/api/v1/tasks", json={**TASK, "app_name": "config_app_b"})
+
+    response = await client.post(
+        "/api/v1/resources/config/batch",
+        json={"shadow_bot_account": "config_bot", "app_names": ["config_app_b", "missing"]},
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["configs"]["config_app_b"]["config_info"] is True
+    assert data["not_found"] == ["missing"]
@@ -0,0 +1,63 @@
+"""
+Test deduplicated config file storage
+"""
+import pytest
+
+from app.services import config_storage_service
+from app.services.config_storage_service import ConfigStorageService
+
+
+@pytest.fixture
+def static_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(config_storage_service, "STATIC_DIR", tmp_path)
+    return tmp_path
+
+
+async def _upload(client, content: bytes, filename: str = "店铺分类表.xlsx") -> dict:
+    response = await client.post(
+        "/api/v1/resources/upload/config",
+        files={"file": (filename, content)},
+        data={"shadow_bot_account": "blob_bot", "app_name": "blob_app"},
+    )
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.asyncio
+async def test_identical_uploads_are_stored_once(client, static_dir):
+    """
+    Re-uploading the same content returns the existing URL without a new file
+    """
+    first = await _upload(client, b"same workbook")
+    second = await _upload(client, b"same workbook", filename="copy.xlsx")
+
+    assert first["deduplicated"] is False
+    assert second["deduplicated"] is True
+    assert second["file_url"] == first["file_url"]
+    assert len(list((static_dir / "configs" / "blobs").glob("*/*"))) == 1
+
+
+@pytest.mark.asyncio
+async def test_gc_keeps_referenced_blobs(client, db_session, static_dir):
+    """
+    Only blobs that no task references are collected
+    """
+    used = await _upload(client, b"used config")
+    unused = await _upload(client, b"unused config")
+    await client.post("/api/v1/tasks", json={
+        "task_name": "blob_task",
+        "shadow_bot_account": "blob_bot",
+        "host_ip": "192.168.1.1",
+        "app_name": "blob_app",
+        "config_file": True,
+        "config_file_path": used["file_url"],
+    })
+
+    service = ConfigStorageService(db_session)
+    preview = await service.collect_garbage(min_age_hours=0, dry_run=True)
+    assert unused["file_url"] in preview["urls"]
+    assert used["file_url"] not in preview["urls"]
+
+    await service.collect_garbage(min_age_hours=0, dry_run=False)
+    assert (await _upload(client, b"unused config"))["deduplicated"] is False
+    assert (await _upload(client, b"used config"))["deduplicated"] is True
@@ -0,0 +1,83 @@
+"""
+Test account/task directory cache
+"""
+import pytest
+
+from app.core.database import unit_of_work
+from app.repositories.account_repository import AccountRepository
+from app.services.directory_cache import ACCOUNTS, DirectoryCache
+
+
+def _account(name: str, port: int = 8000) -> dict:
+    return {
+        "shadow_bot_account": name,
+        "host_ip": "192.168.1.1",
+        "port": port,
+        "status": "pending",
+        "task_control": f"{name}-192.168.1.1:{port}",
+    }
+
+
+@pytest.mark.asyncio
+async def test_directory_cache_detects_other_worker_writes(db_session):
+    """
+    A write invalidated by one worker is picked up by another on its next check
+    """
+    repo = AccountRepository(db_session)
+    reader = DirectoryCache(check_interval=0)
+    writer = DirectoryCache(check_interval=0)
+
+    account = await repo.create(_account("dir_cache_a"))
+    entries = await reader.get_accounts(db_session, "dir_cache_a")
+    assert [entry.port for entry in entries] == [8000]
+
+    async with unit_of_work(db_session):
+        await repo.update(account.id, {"port": 9000})
+        await writer.invalidate(db_session, ACCOUNTS)
+
+    entries = await reader.get_accounts(db_session, "dir_cache_a")
+    assert [entry.port for entry in entries] == [9000]
+
+
+@pytest.mark.asyncio
+async def test_directory_cache_serves_within_interval(db_session):
+    """
+    Within the check interval lookups are served from memory
+    """
+    repo = AccountRepository(db_session)
+    cache = DirectoryCache(check_interval=60)
+
+    await repo.create(_account("dir_cache_b"))
+    assert len(await cache.get_accounts(db_session, "dir_cache_b")) == 1
+    misses = cache.misses
+
+    await repo.create(_account("dir_cache_c"))
+    assert await cache.get_accounts(db_session, "dir_cache_c") == []
+    assert cache.misses == misses
+
+    # 本进程的写路径会在提交后清除本地副本
+    await cache.invalidate(db_session, ACCOUNTS)
+    assert len(await cache.get_accounts(db_session, "dir_cache_c")) == 1
+
+
+@pytest.mark.asyncio
+async def test_directory_cache_discards_load_overtaken_by_invalidate(db_session, monkeypatch):
+    """
+    A load that was in flight when the cache was cleared does not store its snapshot
+    """
+    repo = AccountRepository(db_session)
+    cache = DirectoryCache(check_interval=60)
+    load = cache._load
+
+    async def load_then_clear(db, namespace):
+        snapshot = await load(db, namespace)
+        # 模拟加载期间另一个请求提交写入并清除缓存
+        await repo.create(_account("dir_cache_d"))
+        cache.clear(namespace)
+        return snapshot
+
+    monkeypatch.setattr(cache, "_load", load_then_clear)
+    assert await cache.get_accounts(db_session, "dir_cache_d") == []
+    monkeypatch.setattr(cache, "_load", load)
+
+    assert len(await cache.get_accounts(db_session, "dir_cache_d")) == 1
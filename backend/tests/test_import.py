@@ -0,0 +1,130 @@
+"""
+Test CSV / XLSX bulk import of accounts and tasks
+"""
+import io
+import uuid
+
+import openpyxl
+import pytest
+from sqlalchemy import select
+
+from app.models.account import Account
+from app.models.task import Task
+from app.services.import_service import IMPORT_CHUNK_SIZE
+
+
+def _csv(rows) -> bytes:
+    return "\n".join(",".join(str(cell) for cell in row) for row in rows).encode("utf-8-sig")
+
+
+def _xlsx(rows) -> bytes:
+    workbook = openpyxl.Workbook()
+    for row in rows:
+        workbook.active.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+async def _import(client, kind: str, filename: str, content: bytes) -> dict:
+    response = await client.post(f"/api/v1/{kind}/import", files={"file": (filename, content)})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+@pytest.mark.asyncio
+async def test_import_tasks_csv_upserts_and_reports_rows(client, db_session):
+    """
+    Chinese headers are mapped, (account, app) is upserted and bad rows are reported by row number
+    """
+    bot = f"import_bot_{uuid.uuid4().hex[:8]}"
+    header = ["任务名称", "影刀账号", "主机IP", "应用名称", "备注"]
+
+    report = await _import(client, "tasks", "tasks.csv", _csv([
+        header,
+        ["日报", bot, "10.0.0.1", "daily", "first"],
+        ["周报", bot, "10.0.0.1", "", "missing app"],
+        ["月报", bot, "10.0.0.1", "monthly", ""],
+        ["日报2", bot, "10.0.0.1", "daily", "duplicate"],
+    ]))
+    assert report["total_rows"] == 4
+    assert (report["created"], report["updated"], report["failed"]) == (2, 0, 2)
+    assert [error["row"] for error in report["errors"]] == [3, 5]
+    assert "app_name" in report["errors"][0]["errors"][0]
+
+    report = await _import(client, "tasks", "tasks.csv", _csv([
+        header,
+        ["日报", bot, "10.0.0.1", "daily", "second"],
+        ["季报", bot, "10.0.0.1", "quarterly", ""],
+    ]))
+    assert (report["created"], report["updated"], report["failed"]) == (1, 1, 0)
+
+    result = await db_session.execute(
+        select(Task.app_name, Task.remark).where(Task.shadow_bot_account == bot)
+    )
+    assert dict(result.all()) == {"daily": "second", "monthly": None, "quarterly": None}
+    daily = await db_session.execute(
+        select(Task.id).where(Task.shadow_bot_account == bot, Task.app_name == "daily")
+    )
+    assert len(daily.scalars().all()) == 1
+
+
+@pytest.mark.asyncio
+async def test_import_accounts_xlsx_counts_created_updated_skipped(client, db_session):
+    """
+    XLSX rows upsert on task_control; rows with nothing to change are skipped
+    """
+    prefix = f"import_acc_{uuid.uuid4().hex[:8]}"
+    header = ["影刀账号", "主机IP", "端口", "状态"]
+
+    report = await _import(client, "accounts", "accounts.xlsx", _xlsx([
+        header,
+        [f"{prefix}_a", "10.0.0.1", 8000, "pending"],
+        [f"{prefix}_b", "10.0.0.2", 99999, "pending"],
+        [f"{prefix}_c", "10.0.0.3", 8000, None],
+    ]))
+    assert (report["created"], report["updated"], report["skipped"], report["failed"]) == (2, 0, 0, 1)
+    assert report["errors"][0]["row"] == 3
+    assert "port" in report["errors"][0]["errors"][0]
+
+    report = await _import(client, "accounts", "accounts.xlsx", _xlsx([
+        header,
+        [f"{prefix}_a", "10.0.0.1", 8000, "running"],
+        [f"{prefix}_c", "10.0.0.3", 8000, None],
+    ]))
+    assert (report["created"], report["updated"], report["skipped"], report["failed"]) == (0, 1, 1, 0)
+
+    result = await db_session.execute(
+        select(Account.status).where(Account.shadow_bot_account == f"{prefix}_a")
+    )
+    assert result.scalar_one() == "running"
+
+
+@pytest.mark.asyncio
+async def test_import_tasks_spanning_several_chunks(client, db_session):
+    """
+    Files larger than one chunk are imported completely and keep file row numbers
+    """
+    bot = f"import_big_{uuid.uuid4().hex[:8]}"
+    count = IMPORT_CHUNK_SIZE * 2 + 1
+    rows = [["task_name", "shadow_bot_account", "host_ip", "app_name"]]
+    rows += [[f"task-{i}", bot, "10.0.0.1", f"app-{i}"] for i in range(count)]
+    rows.append(["broken", bot, "", "app-broken"])
+
+    report = await _import(client, "tasks", "big.csv", _csv(rows))
+
+    assert report["total_rows"] == count + 1
+    assert report["created"] == count
+    assert [error["row"] for error in report["errors"]] == [count + 2]
+    result = await db_session.execute(select(Task.id).where(Task.shadow_bot_account == bot))
+    assert len(result.scalars().all()) == count
+
+
+@pytest.mark.asyncio
+async def test_import_rejects_unsupported_file(client):
+    """
+    Only CSV / XLSX files are accepted
+    """
+    response = await client.post("/api/v1/tasks/import", files={"file": ("tasks.txt", b"a,b")})
+    assert response.status_code == 400
+    assert response.json()["error"]["message"]["code"] == "INVALID_FILE"
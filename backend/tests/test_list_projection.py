@@ -0,0 +1,105 @@
+"""
+Test column-projected list queries
+"""
+import pytest
+
+from app.repositories.task_repository import TaskRepository
+from app.repositories.log_repository import ExecutionLogRepository
+from app.schemas.task import TaskListItem
+from app.services.execution_log_service import ExecutionLogService
+from app.services.task_service import LIST_COLUMNS, TaskService
+
+
+@pytest.mark.asyncio
+async def test_list_tasks_matches_orm_validation(db_session):
+    """
+    Pages built from projected rows equal the per-instance model_validate
+    result; config_json is only returned by the detail lookup
+    """
+    repo = TaskRepository(db_session)
+    await repo.bulk_create([
+        {
+            "task_name": f"projection-task-{i}",
+            "shadow_bot_account": "projection_bot",
+            "host_ip": "192.168.1.2",
+            "app_name": f"projection_app_{i}",
+            "config_json": '{"retry": 3}',
+        }
+        for i in range(3)
+    ])
+
+    rows = await repo.search(search_term="projection-task", columns=LIST_COLUMNS)
+    assert all(isinstance(row, dict) and set(row) == set(LIST_COLUMNS) for row in rows)
+
+    page = await TaskService(db_session).list_tasks(search="projection-task", page_size=10)
+    expected = [TaskListItem.model_validate(task) for task in await repo.search(search_term="projection-task")]
+    assert page["total"] == 3
+    assert page["items"] == expected
+    assert "config_json" not in LIST_COLUMNS
+
+    detail = await TaskService(db_session).get_task(page["items"][0].id)
+    assert detail.config_json == '{"retry": 3}'
+
+    await repo.bulk_delete([item.id for item in page["items"]])
+
+
+@pytest.mark.asyncio
+async def test_list_logs_flags_log_content_without_loading_it(db_session):
+    """
+    Log list items carry has_log_content instead of the log_content text
+    """
+    repo = ExecutionLogRepository(db_session)
+    for i, content in enumerate(["x" * 10000, None]):
+        await repo.create_log(
+            text=f"projection-log-{i}",
+            app_name="projection_app",
+            shadow_bot_account="projection_bot",
+            status="completed",
+            start_time=f"2026-01-21 10:00:0{i}",
+            end_time=f"2026-01-21 10:01:0{i}",
+            duration=60,
+            host_ip="192.168.1.2",
+            log_content=content,
+        )
+
+    page = await ExecutionLogService(db_session).list_logs(search="projection-log", page_size=10, order="asc")
+    assert [item.has_log_content for item in page["items"]] == [True, False]
+    assert "log_content" not in page["items"][0].model_dump()
+
+    for item in page["items"]:
+        await repo.delete(item.id)
+
+
+@pytest.mark.asyncio
+async def test_search_page_total_in_one_query(db_session):
+    """
+    Page totals come from COUNT(*) OVER(); capped counts stop at the cap
+    """
+    repo = TaskRepository(db_session)
+    tasks = await repo.bulk_create([
+        {
+            "task_name": f"page-task-{i}",
+            "shadow_bot_account": "page_bot",
+            "host_ip": "192.168.1.3",
+            "app_name": f"page_app_{i}",
+        }
+        for i in range(5)
+    ])
+
+    page = await repo.search_page(search_term="page-task", skip=2, limit=2, columns=LIST_COLUMNS)
+    assert (len(page.items), page.total, page.capped) == (2, 5, False)
+    assert set(page.items[0]) == set(LIST_COLUMNS)
+
+    # ORM 实例和越界页码
+    page = await repo.get_page(skip=0, limit=10, filters={"shadow_bot_account": "page_bot"})
+    assert page.total == 5 and page.items[0].task_name.startswith("page-task-")
+    page = await repo.search_page(search_term="page-task", skip=10, limit=2)
+    assert (page.items, page.total) == ([], 5)
+
+    page = await repo.search_page(search_term="page-task", limit=2, count_cap=3)
+    assert (len(page.items), page.total, page.capped) == (2, 3, True)
+
+    result = await TaskService(db_session).list_tasks(search="page-task", page_size=2, count_cap=10)
+    assert (result["total"], result["total_pages"], result["total_capped"]) == (5, 3, False)
+
+    await repo.bulk_delete([task.id for task in tasks])
@@ -0,0 +1,100 @@
+"""
+Test ranged log viewing
+"""
+import httpx
+import pytest
+
+from app.api.v1 import resources
+from app.services.proxy_cache import ProxyCache
+
+
+@pytest.fixture
+def log_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(resources, "STATIC_ROOT", tmp_path)
+    (tmp_path / "logs").mkdir()
+    lines = [f"第{i:04d}行 执行日志\n".encode() for i in range(1000)]
+    (tmp_path / "logs" / "run.log").write_bytes(b"".join(lines))
+    return lines
+
+
+@pytest.mark.asyncio
+async def test_log_tail_starts_at_line_boundary(client, log_file):
+    """
+    Tail returns whole lines from the end with the real range in Content-Range
+    """
+    response = await client.get(
+        "/api/v1/resources/log", params={"url": "/static/logs/run.log", "tail": 100}
+    )
+    assert response.status_code == 206
+    assert response.content.endswith(log_file[-1])
+    assert response.content.startswith("第".encode())
+
+    size = sum(len(line) for line in log_file)
+    start = size - len(response.content)
+    assert response.headers["content-range"] == f"bytes {start}-{size - 1}/{size}"
+
+
+@pytest.mark.asyncio
+async def test_log_offset_and_range_header(client, log_file):
+    """
+    offset+length and the Range header return exact byte slices
+    """
+    response = await client.get(
+        "/api/v1/resources/log",
+        params={"url": "/static/logs/run.log", "offset": 0, "length": len(log_file[0])},
+    )
+    assert response.status_code == 206
+    assert response.content == log_file[0]
+
+    response = await client.get(
+        "/api/v1/resources/log",
+        params={"url": "/static/logs/run.log"},
+        headers={"Range": f"bytes={len(log_file[0])}-{len(log_file[0]) * 2 - 1}"},
+    )
+    assert response.content == log_file[1]
+
+    response = await client.get(
+        "/api/v1/resources/log",
+        params={"url": "/static/logs/run.log"},
+        headers={"Range": "bytes=99999999-"},
+    )
+    assert response.status_code == 416
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("sized", [True, False])
+async def test_log_upstream_ignoring_range_is_sliced(client, tmp_path, monkeypatch, sized):
+    """
+    An upstream that answers a Range request with the full log (200) still yields the requested slice
+    """
+    lines = [f"line {i:04d}\n".encode() for i in range(1000)]
+    body = b"".join(lines)
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        if sized:
+            return httpx.Response(200, content=body)
+        # 大小未知的响应无法缓存
+        return httpx.Response(200, stream=httpx.ByteStream(body))
+
+    cache = ProxyCache(
+        cache_dir=str(tmp_path),
+        max_bytes=1024 * 1024,
+        max_object_bytes=1024 * 1024,
+        revalidate_seconds=60,
+        client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+    )
+    monkeypatch.setattr(resources, "get_proxy_cache", lambda: cache)
+
+    for _ in range(2):
+        response = await client.get(
+            "/api/v1/resources/log", params={"url": "http://oss/run.log", "tail": 22}
+        )
+        assert response.status_code == 206
+        # 从完整的一行开始
+        assert response.content == b"".join(lines[-2:])
+        assert response.headers["content-range"] == f"bytes {len(body) - 20}-{len(body) - 1}/{len(body)}"
+
+    assert calls[0].headers["range"] == "bytes=-22"
+    assert len(calls) == (1 if sized else 2)
@@ -0,0 +1,91 @@
+"""
+Test the Prometheus metrics endpoint
+"""
+import pytest
+
+from app.core import metrics
+from app.core.security import settings as security_settings
+from app.services import sse_service
+from app.services.sse_service import EVENTS_DROPPED, SSEService
+
+
+def test_histogram_exposition_is_cumulative():
+    """
+    Bucket counts are cumulative and label values are escaped
+    """
+    histogram = metrics.Histogram("test_seconds", "Test histogram", ("route",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, 'a"b')
+
+    lines = histogram.render().splitlines()
+    assert lines[1] == "# TYPE test_seconds histogram"
+    assert 'test_seconds_bucket{route="a\\"b",le="0.1"} 1' in lines
+    assert 'test_seconds_bucket{route="a\\"b",le="1.0"} 2' in lines
+    assert 'test_seconds_bucket{route="a\\"b",le="+Inf"} 3' in lines
+    assert 'test_seconds_count{route="a\\"b"} 3' in lines
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_reports_routes_and_db(client):
+    """
+    /metrics lists request latency per route template and query durations
+    """
+    await client.get("/api/v1/tasks/00000000-0000-0000-0000-000000000000")
+
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    body = response.text
+    assert 'rpa_http_request_duration_seconds_count{method="GET",route="/api/v1/tasks/{task_id}"}' in body
+    assert 'rpa_http_requests_total{method="GET",route="/api/v1/tasks/{task_id}",status="404"}' in body
+    assert 'rpa_db_query_duration_seconds_count{operation="SELECT"}' in body
+    assert "rpa_db_pool_checkout_wait_seconds_count" in body
+
+
+@pytest.mark.asyncio
+async def test_sse_full_queue_drops_oldest_event():
+    """
+    A client that stops reading keeps only the newest events
+    """
+    service = SSEService(queue_size=2)
+    client = await service.add_client("slow")
+    dropped = EVENTS_DROPPED.value()
+
+    for i in range(3):
+        await service.broadcast({"type": "log_created", "data": {"i": i}})
+
+    assert service.queue_depths() == {"slow": 2}
+    assert service.dropped_events == 1 and EVENTS_DROPPED.value() == dropped + 1
+    assert '"i":1' in client.queue.get_nowait()[1]
+
+
+@pytest.mark.asyncio
+async def test_metrics_sse_queue_gauges_are_aggregated(client, monkeypatch):
+    """
+    Queue depth is exported as a total and a maximum, not one series per client
+    """
+    service = SSEService(queue_size=10)
+    monkeypatch.setattr(sse_service, "_sse_service", service)
+    await service.add_client("idle")
+    busy = await service.add_client("busy")
+    for i in range(3):
+        busy.queue.put_nowait(("log_created", str(i)))
+
+    body = (await client.get("/metrics")).text
+    assert "rpa_sse_queued_events 3" in body
+    assert "rpa_sse_client_queue_depth_max 3" in body
+    assert "busy" not in body
+
+
+@pytest.mark.asyncio
+async def test_metrics_requires_token_when_configured(client, monkeypatch):
+    """
+    With METRICS_TOKEN set, /metrics needs the matching Bearer token
+    """
+    monkeypatch.setattr(security_settings, "METRICS_TOKEN", "scrape")
+
+    assert (await client.get("/metrics")).status_code == 401
+    response = await client.get("/metrics", headers={"Authorization": "Bearer wrong"})
+    assert response.status_code == 401
+    response = await client.get("/metrics", headers={"Authorization": "Bearer scrape"})
+    assert response.status_code == 200
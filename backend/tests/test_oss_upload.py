@@ -0,0 +1,127 @@
+"""
+Test batch mode of doc/oss_upload.py (resumable uploads)
+"""
+import hashlib
+import importlib.util
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from oss2.models import PartInfo
+
+from app.services.storage_service import is_artifact_key
+
+SCRIPT = Path(__file__).resolve().parents[2] / "doc" / "oss_upload.py"
+
+
+@pytest.fixture
+def oss_upload(tmp_path, monkeypatch):
+    spec = importlib.util.spec_from_file_location("oss_upload", SCRIPT)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    monkeypatch.setattr(module, "CHECKPOINT_DIR", str(tmp_path / "checkpoints"))
+    # oss2 的最小分片为 100 KB
+    monkeypatch.setattr(module, "RESUMABLE_THRESHOLD", 100 * 1024)
+    monkeypatch.setattr(module, "RESUMABLE_PART_SIZE", 100 * 1024)
+    return module
+
+
+class _FakeBucket:
+    """In-memory bucket with the multipart calls used by oss2.resumable_upload"""
+    bucket_name = "rpa-test"
+    enable_crc = False
+
+    def __init__(self):
+        self.objects = {}
+        self.uploads = {}
+        self.part_calls = []
+        self.fail_part = None
+        self._lock = threading.Lock()
+
+    def put_object_from_file(self, key, filename):
+        self.objects[key] = Path(filename).read_bytes()
+
+    def init_multipart_upload(self, key, headers=None, params=None):
+        upload_id = f"upload-{len(self.uploads)}"
+        self.uploads[upload_id] = {}
+        return SimpleNamespace(upload_id=upload_id)
+
+    def upload_part(self, key, upload_id, part_number, data, headers=None):
+        with self._lock:
+            self.part_calls.append(part_number)
+        if part_number == self.fail_part:
+            raise ConnectionError("connection reset")
+        body = data.read()
+        etag = hashlib.md5(body).hexdigest()
+        self.uploads[upload_id][part_number] = (etag, body)
+        return SimpleNamespace(etag=etag, crc=None)
+
+    def list_parts(self, key, upload_id, marker="", max_parts=1000, headers=None):
+        parts = [
+            PartInfo(number, etag, size=len(body))
+            for number, (etag, body) in sorted(self.uploads[upload_id].items())
+        ]
+        return SimpleNamespace(parts=parts, is_truncated=False, next_marker="")
+
+    def complete_multipart_upload(self, key, upload_id, parts, headers=None):
+        stored = self.uploads.pop(upload_id)
+        self.objects[key] = b"".join(stored[part.part_number][1] for part in sorted(parts, key=lambda p: p.part_number))
+
+
+def _uploader(module, bucket):
+    uploader = module.OSSUploader.__new__(module.OSSUploader)
+    uploader.bucket = bucket
+    uploader.bucket_name = bucket.bucket_name
+    uploader.endpoint = "oss-test.aliyuncs.com"
+    return uploader
+
+
+def test_interrupted_batch_resumes_with_same_keys(oss_upload, tmp_path):
+    """
+    Re-running a batch reuses its object keys, so a large file continues from its checkpoint
+    """
+    run = tmp_path / "run"
+    run.mkdir()
+    big = run / "run.log"
+    big.write_bytes(bytes(range(256)) * 400 * 5)  # 5 个分片
+    (run / "step.png").write_bytes(b"png")
+    files = oss_upload.collect_files(str(run))
+
+    bucket = _FakeBucket()
+    uploader = _uploader(oss_upload, bucket)
+    bucket.fail_part = 3
+    first = uploader.upload_batch(files, folder="logs", workers=2)
+    assert first["failed"] == 1
+
+    bucket.fail_part = None
+    bucket.part_calls.clear()
+    second = uploader.upload_batch(files, folder="logs", workers=2)
+
+    assert second["failed"] == 0
+    assert [f["object_key"] for f in second["files"]] == [f["object_key"] for f in first["files"]]
+    # 只补传上次失败的分片
+    assert bucket.part_calls == [3]
+    key = next(f["object_key"] for f in second["files"] if f["path"] == str(big))
+    assert bucket.objects[key] == big.read_bytes()
+
+
+def test_batch_id_is_stable_and_can_be_passed_back(oss_upload, tmp_path):
+    """
+    The derived batch id depends only on the files; an explicit id keeps the key prefix
+    """
+    log = tmp_path / "run.log"
+    log.write_bytes(b"ok\n")
+    files = [log]
+
+    batch_id = oss_upload.batch_id_for(files, "logs")
+    assert oss_upload.batch_id_for(files, "logs") == batch_id
+    assert oss_upload.batch_id_for(files, "screenshots") != batch_id
+
+    manifest = _uploader(oss_upload, _FakeBucket()).upload_batch(files, folder="logs", batch_id=batch_id)
+    assert manifest["batch_id"] == batch_id
+    assert manifest["files"][0]["object_key"] == f"logs/{batch_id}/run.log"
+    assert is_artifact_key(manifest["files"][0]["object_key"])
+
+    with pytest.raises(ValueError):
+        oss_upload.parse_batch_id("not-a-batch")
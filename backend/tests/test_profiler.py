@@ -0,0 +1,63 @@
+"""
+Test the sampling profiler and event-loop monitor
+"""
+import asyncio
+import time
+
+import pytest
+
+from app.core import profiler
+from app.core.security import settings as security_settings
+
+ADMIN = {"X-Admin-Token": "secret"}
+
+
+def _block_loop(seconds: float) -> None:
+    time.sleep(seconds)
+
+
+@pytest.mark.asyncio
+async def test_loop_monitor_reports_blocking_call():
+    """
+    A synchronous call that holds the loop is reported with its stack
+    """
+    monitor = profiler.LoopMonitor(interval=0.02, threshold=0.1)
+    monitor.start()
+    await asyncio.sleep(0.05)
+    _block_loop(0.3)
+    await asyncio.sleep(0.05)
+    await monitor.stop()
+
+    assert monitor.blocked == 1
+    assert monitor.max_lag >= 0.2
+    block = monitor.status()["recent_blocks"][0]
+    assert block["blocked_ms"] >= 100
+    assert any("_block_loop" in line for line in block["stack"])
+
+
+@pytest.mark.asyncio
+async def test_profiler_start_stop_writes_folded_stacks(client, monkeypatch, tmp_path):
+    """
+    Admin start/stop produces a folded-stack file under the output directory
+    """
+    monkeypatch.setattr(security_settings, "ADMIN_TOKEN", "secret")
+    monkeypatch.setattr(profiler, "_profiler", profiler.SamplingProfiler(tmp_path))
+
+    response = await client.post("/api/v1/admin/profiler/start", params={"interval_ms": 1}, headers=ADMIN)
+    assert response.json()["running"] is True
+    response = await client.post("/api/v1/admin/profiler/start", headers=ADMIN)
+    assert response.status_code == 409
+
+    _block_loop(0.05)
+    response = await client.post("/api/v1/admin/profiler/stop", headers=ADMIN)
+    result = response.json()
+    assert result["samples"] > 0
+    assert result["url"] == f"/static/profiles/{result['file']}"
+    # 文件名带 32 位随机十六进制后缀，无法从时间戳猜出
+    assert len(result["file"].rsplit("-", 1)[1]) == len("0" * 32 + ".folded")
+
+    lines = (tmp_path / result["file"]).read_text().splitlines()
+    stack, count = lines[0].rsplit(" ", 1)
+    assert int(count) > 0
+    assert any("_block_loop" in line for line in lines)
+    assert (await client.post("/api/v1/admin/profiler/stop", headers=ADMIN)).status_code == 409
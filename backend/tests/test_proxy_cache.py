@@ -0,0 +1,229 @@
+"""
+Test proxied resource disk cache
+"""
+import asyncio
+import os
+import time
+
+import httpx
+import pytest
+
+from app.services.proxy_cache import STALE_FILE_SECONDS, ProxyCache
+
+
+def _upstream(bodies: dict, calls: list) -> httpx.AsyncClient:
+    """Upstream that serves bodies by path with ETag / 304 support"""
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        await asyncio.sleep(0.01)
+        body = bodies[request.url.path]
+        etag = f'"{len(body)}"'
+        if request.headers.get("if-none-match") == etag:
+            return httpx.Response(304, headers={"ETag": etag})
+        return httpx.Response(200, content=body, headers={"ETag": etag})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def _cache(tmp_path, client, max_bytes=1000) -> ProxyCache:
+    return ProxyCache(
+        cache_dir=str(tmp_path),
+        max_bytes=max_bytes,
+        max_object_bytes=max_bytes,
+        revalidate_seconds=60,
+        client=client,
+    )
+
+
+@pytest.mark.asyncio
+async def test_proxy_cache_single_flight_and_revalidation(tmp_path):
+    """
+    Concurrent misses fetch once; expired entries revalidate with If-None-Match
+    """
+    calls = []
+    cache = _cache(tmp_path, _upstream({"/a.log": b"x" * 100}, calls))
+
+    entries = await asyncio.gather(*(cache.get("http://oss/a.log") for _ in range(5)))
+    assert len(calls) == 1
+    assert cache.blob_path(entries[0]).read_bytes() == b"x" * 100
+
+    await cache.get("http://oss/a.log")
+    assert len(calls) == 1
+
+    await cache.get("http://oss/a.log", max_age=0)
+    assert len(calls) == 2
+    assert calls[1].headers["if-none-match"] == '"100"'
+    assert cache.revalidated == 1
+
+
+@pytest.mark.asyncio
+async def test_proxy_cache_evicts_least_recently_used(tmp_path):
+    """
+    Identical bodies share one blob; the size bound evicts the oldest URL
+    """
+    calls = []
+    bodies = {"/a": b"a" * 400, "/b": b"a" * 400, "/c": b"c" * 400, "/d": b"d" * 400}
+    cache = _cache(tmp_path, _upstream(bodies, calls))
+
+    await cache.get("http://oss/a")
+    await cache.get("http://oss/b")
+    assert cache.total_bytes == 400
+
+    await cache.get("http://oss/c")
+    await cache.get("http://oss/a")
+    await cache.get("http://oss/d")
+
+    # b、c 最久未使用被淘汰；b 与 a 共享 blob，因此还需淘汰 c 才能回到上限内
+    assert cache.total_bytes == 800
+    assert cache.stats()["entries"] == 2
+    calls.clear()
+    await cache.get("http://oss/a")
+    assert len(calls) == 0
+    await cache.get("http://oss/c")
+    assert len(calls) == 1
+
+
+def test_proxy_cache_startup_keeps_recent_files_of_other_workers(tmp_path):
+    """
+    Startup cleanup only removes temp files and unreferenced blobs older than the grace period
+    """
+    stale = time.time() - STALE_FILE_SECONDS - 60
+    files = {}
+    for name in ("recent", "stale"):
+        tmp_file = tmp_path / "tmp" / name
+        blob = tmp_path / "blobs" / "ab" / f"ab{name}"
+        for path in (tmp_file, blob):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(b"partial")
+        files[name] = (tmp_file, blob)
+    for path in files["stale"]:
+        os.utime(path, (stale, stale))
+
+    _cache(tmp_path, _upstream({}, []))._ensure_loaded()
+
+    assert all(path.exists() for path in files["recent"])
+    assert not any(path.exists() for path in files["stale"])
+
+
+class _SlowStream(httpx.AsyncByteStream):
+    """Body that yields its first chunk, then waits for release"""
+
+    def __init__(self, chunks, release: asyncio.Event):
+        self.chunks = chunks
+        self.release = release
+
+    async def __aiter__(self):
+        yield self.chunks[0]
+        await self.release.wait()
+        for chunk in self.chunks[1:]:
+            yield chunk
+
+
+@pytest.mark.asyncio
+async def test_proxy_cache_relays_miss_while_filling(tmp_path):
+    """
+    The first chunk reaches the caller before the download ends; the entry is committed once complete
+    """
+    calls = []
+    release = asyncio.Event()
+    chunks = [b"a" * 100, b"b" * 100]
+
+    async def handler(request):
+        calls.append(request)
+        return httpx.Response(
+            200,
+            headers={"Content-Length": "200", "ETag": '"v1"'},
+            stream=_SlowStream(chunks, release),
+        )
+
+    cache = _cache(tmp_path, httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    result = await cache.fetch("http://oss/shot.png")
+    assert result.filling
+
+    body = result.body.__aiter__()
+    assert await body.__anext__() == chunks[0]
+    assert cache.stats()["entries"] == 0
+
+    release.set()
+    assert [chunk async for chunk in body] == [chunks[1]]
+    await result.response.aclose()
+
+    entry = await cache.fetch("http://oss/shot.png")
+    assert cache.blob_path(entry).read_bytes() == b"".join(chunks)
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_proxy_cache_aborted_fill_is_discarded(tmp_path):
+    """
+    A client that disconnects mid-download leaves no cache entry or temp file
+    """
+    release = asyncio.Event()
+
+    async def handler(request):
+        return httpx.Response(
+            200,
+            headers={"Content-Length": "200"},
+            stream=_SlowStream([b"a" * 100, b"b" * 100], release),
+        )
+
+    cache = _cache(tmp_path, httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+    result = await cache.fetch("http://oss/shot.png")
+    await result.body.__anext__()
+    await result.body.aclose()
+    await result.response.aclose()
+
+    assert cache.stats()["entries"] == 0
+    assert list((tmp_path / "tmp").iterdir()) == []
+
+
+@pytest.mark.asyncio
+async def test_proxy_cache_passes_through_uncacheable_responses(tmp_path):
+    """
+    Unknown-size and non-200 responses are relayed from the single upstream request
+    """
+    calls = []
+
+    async def handler(request):
+        calls.append(request)
+        if request.url.path == "/missing":
+            return httpx.Response(404, content=b"not found")
+        return httpx.Response(200, stream=_SlowStream([b"x" * 10], asyncio.Event()))
+
+    cache = _cache(tmp_path, httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+
+    result = await cache.fetch("http://oss/missing")
+    assert not result.filling and result.response.status_code == 404
+    assert b"".join([chunk async for chunk in result.body]) == b"not found"
+
+    result = await cache.fetch("http://oss/unknown-size")
+    assert not result.filling
+    assert await result.body.__anext__() == b"x" * 10
+    await result.response.aclose()
+
+    assert len(calls) == 2
+    assert cache.stats()["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_proxy_endpoint_relays_miss_then_serves_from_disk(client, tmp_path, monkeypatch):
+    """
+    /resources/proxy streams a miss from one upstream request and serves the next request from the cache
+    """
+    from app.api.v1 import resources
+
+    calls = []
+    cache = _cache(tmp_path, _upstream({"/shot.png": b"p" * 300}, calls))
+    monkeypatch.setattr(resources, "get_proxy_cache", lambda: cache)
+
+    for _ in range(2):
+        response = await client.get(
+            "/api/v1/resources/proxy", params={"url": "http://oss/shot.png"}
+        )
+        assert response.status_code == 200
+        assert response.content == b"p" * 300
+
+    assert len(calls) == 1
+    assert cache.hits == 1
+    assert not cache._filling
@@ -0,0 +1,63 @@
+"""
+Test request-scoped query instrumentation
+"""
+import logging
+
+import pytest
+
+from app.core import query_stats
+from app.core.security import settings as security_settings
+
+
+@pytest.mark.asyncio
+async def test_server_timing_and_route_totals(client, monkeypatch):
+    """
+    Responses carry Server-Timing; totals are keyed by route template and
+    served to admins only
+    """
+    query_stats.reset_route_stats()
+
+    response = await client.get("/api/v1/tasks", params={"page_size": 5})
+    assert response.status_code == 200
+    assert response.headers["server-timing"].startswith("db;dur=")
+    assert 'queries", app;dur=' in response.headers["server-timing"]
+    await client.get("/api/v1/tasks/00000000-0000-0000-0000-000000000000")
+
+    response = await client.get("/api/v1/admin/query-stats")
+    assert response.status_code == 403
+
+    monkeypatch.setattr(security_settings, "ADMIN_TOKEN", "secret")
+    response = await client.get(
+        "/api/v1/admin/query-stats", params={"reset": True}, headers={"X-Admin-Token": "secret"}
+    )
+    routes = {row["route"]: row for row in response.json()["routes"]}
+    assert routes["GET /api/v1/tasks"]["requests"] == 1
+    assert routes["GET /api/v1/tasks"]["queries"] >= 1
+    assert "GET /api/v1/tasks/{task_id}" in routes
+    # 重置后只剩本次 admin 请求自身
+    assert [row["route"] for row in query_stats.route_stats()] == ["GET /api/v1/admin/query-stats"]
+
+
+class _Records(logging.Handler):
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.messages = []
+
+    def emit(self, record):
+        self.messages.append(record.getMessage())
+
+
+@pytest.mark.asyncio
+async def test_slow_query_logged_with_parameters(client, monkeypatch):
+    """
+    Queries above the threshold are logged together with their parameters
+    """
+    handler = _Records()
+    monkeypatch.setattr(query_stats, "_slow_seconds", 1e-9)
+    query_stats.logger.addHandler(handler)
+    try:
+        await client.get("/api/v1/tasks", params={"search": "slow-query-marker"})
+    finally:
+        query_stats.logger.removeHandler(handler)
+
+    assert any("Slow query" in message and "slow-query-marker" in message for message in handler.messages)
@@ -0,0 +1,45 @@
+"""
+Test orjson serialization of responses and SSE events
+"""
+import json
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from app.core.responses import ORJSONResponse, dumps
+from app.services.sse_service import SSEService
+
+
+def test_orjson_response_matches_stdlib_content():
+    """
+    Same JSON value as the stdlib, UTF-8 without escaping, extra types handled
+    """
+    content = {"app_name": "云仓收藏", "count": 3, "ratio": Decimal("0.5"), 1: None}
+    body = ORJSONResponse(content).body
+
+    assert "云仓收藏".encode() in body
+    assert json.loads(body) == {"app_name": "云仓收藏", "count": 3, "ratio": 0.5, "1": None}
+    assert dumps({"end_time": datetime(2026, 1, 21, 10, 0)}) == b'{"end_time":"2026-01-21T10:00:00"}'
+
+
+@pytest.mark.asyncio
+async def test_sse_broadcast_queues_serialized_event():
+    """
+    Events are serialized once and queued together with their type
+    """
+    service = SSEService()
+    first = await service.add_client("a")
+    second = await service.add_client("b", account_id="acc-1")
+
+    await service.broadcast({"type": "log_created", "data": {"log_id": "1"}})
+    await service.send_to_account("acc-1", {"type": "account_updated", "data": {"end_time": datetime(2026, 1, 21)}})
+
+    event_type, data = first.queue.get_nowait()
+    assert event_type == "log_created"
+    assert second.queue.get_nowait() == (event_type, data)
+
+    event_type, data = second.queue.get_nowait()
+    assert event_type == "account_updated"
+    assert json.loads(data)["data"]["end_time"] == "2026-01-21T00:00:00"
+    assert first.queue.empty()
@@ -0,0 +1,84 @@
+"""
+Test precompressed static serving
+"""
+import asyncio
+
+import pytest
+from httpx import AsyncClient
+from starlette.applications import Starlette
+from starlette.routing import Mount
+
+from app.core import static_files
+from app.core.static_files import PrecompressedStaticFiles, precompress_file, schedule_precompress
+
+
+@pytest.fixture
+async def static_client(tmp_path):
+    log = tmp_path / "logs" / "run.log"
+    log.parent.mkdir()
+    log.write_bytes(b"".join(f"[{i:05d}] step ok\n".encode() for i in range(5000)))
+    assert [p.name for p in precompress_file(log)][-1] == "run.log.gz"
+
+    blob = tmp_path / "configs" / "blobs" / ("a" * 64) / "config.json"
+    blob.parent.mkdir(parents=True)
+    blob.write_text('{"k": "v"}')
+
+    app = Starlette(routes=[Mount("/static", PrecompressedStaticFiles(directory=tmp_path))])
+    async with AsyncClient(app=app, base_url="http://test") as client:
+        yield client, log
+
+
+@pytest.mark.asyncio
+async def test_serves_gzip_variant(static_client):
+    """
+    Clients accepting gzip get the .gz file; others and Range requests get the original
+    """
+    client, log = static_client
+    response = await client.get("/static/logs/run.log", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) * 5 < log.stat().st_size
+    assert response.content == log.read_bytes()
+
+    response = await client.get("/static/logs/run.log", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.content == log.read_bytes()
+
+    response = await client.get(
+        "/static/logs/run.log", headers={"Accept-Encoding": "gzip", "Range": "bytes=0-9"}
+    )
+    assert response.status_code == 206
+    assert response.headers["content-range"] == f"bytes 0-9/{log.stat().st_size}"
+    assert response.content == log.read_bytes()[:10]
+
+
+@pytest.mark.asyncio
+async def test_stale_variant_and_cache_headers(static_client):
+    """
+    A variant older than its original is ignored; content-addressed paths are immutable
+    """
+    client, log = static_client
+    log.write_bytes(b"rewritten\n" * 500)
+    response = await client.get("/static/logs/run.log", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+    assert response.headers["cache-control"] == "no-cache"
+
+    response = await client.get(f"/static/configs/blobs/{'a' * 64}/config.json")
+    assert "immutable" in response.headers["cache-control"]
+
+
+@pytest.mark.asyncio
+async def test_schedule_precompress_runs_in_background(tmp_path):
+    """
+    Scheduling returns at once; the variant appears when the background task finishes
+    """
+    log = tmp_path / "upload.log"
+    log.write_bytes(b"line ok\n" * 1000)
+
+    schedule_precompress(log)
+    schedule_precompress(tmp_path / "image.png")
+    assert not log.with_name("upload.log.gz").exists()
+    assert len(static_files._background) == 1
+
+    await asyncio.gather(*static_files._background)
+    assert log.with_name("upload.log.gz").exists()
@@ -0,0 +1,104 @@
+"""
+Test screenshot thumbnails
+"""
+import asyncio
+import io
+import os
+import time
+
+import pytest
+from PIL import Image
+
+from app.api.v1 import resources
+from app.services import thumbnail_service
+from app.services.thumbnail_service import ThumbnailService
+
+
+@pytest.fixture
+def thumbnails(tmp_path, monkeypatch):
+    static_root = tmp_path / "static"
+    (static_root / "uploads" / "screenshots").mkdir(parents=True)
+    Image.new("RGB", (1920, 1080), "steelblue").save(static_root / "uploads" / "screenshots" / "shot.png")
+    (static_root / "uploads" / "screenshots" / "notes.png").write_bytes(b"not an image")
+
+    service = ThumbnailService(
+        str(tmp_path / "cache"), workers=1, max_bytes=1024 * 1024, static_root=static_root
+    )
+    monkeypatch.setattr(thumbnail_service, "_thumbnail_service", service)
+    monkeypatch.setattr(resources, "STATIC_ROOT", static_root)
+    yield service
+    service.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_thumbnail_rendered_once_and_served(client, thumbnails):
+    """
+    Concurrent requests share one render; the response is a small WebP
+    """
+    url = "/static/uploads/screenshots/shot.png"
+    responses = await asyncio.gather(*[
+        client.get("/api/v1/resources/proxy", params={"url": url, "size": "thumb"})
+        for _ in range(5)
+    ])
+
+    assert thumbnails.rendered == 1
+    for response in responses:
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/webp"
+        assert Image.open(io.BytesIO(response.content)).size == (160, 90)
+
+
+@pytest.mark.asyncio
+async def test_non_image_falls_back_to_original(client, thumbnails):
+    """
+    Files that cannot be decoded are served as-is and not retried
+    """
+    params = {"url": "/static/uploads/screenshots/notes.png", "size": "small"}
+    for _ in range(2):
+        response = await client.get("/api/v1/resources/proxy", params=params)
+        assert response.status_code == 200
+        assert response.content == b"not an image"
+    assert thumbnails.rendered == 0
+
+
+@pytest.mark.asyncio
+async def test_thumbnail_cache_evicts_least_recently_used(thumbnails):
+    """
+    The size bound removes the derivatives of the image used longest ago
+    """
+    screenshots = thumbnails.static_root / "uploads" / "screenshots"
+    for name, color in (("a.png", "red"), ("b.png", "green"), ("c.png", "blue")):
+        Image.new("RGB", (640, 480), color).save(screenshots / name)
+
+    first = await thumbnails.get("/static/uploads/screenshots/a.png", "thumb")
+    thumbnails.max_bytes = thumbnails.total_bytes * 2
+    second = await thumbnails.get("/static/uploads/screenshots/b.png", "thumb")
+    assert await thumbnails.get("/static/uploads/screenshots/a.png", "thumb") == first
+
+    third = await thumbnails.get("/static/uploads/screenshots/c.png", "thumb")
+    assert first.exists() and third.exists()
+    assert not second.parent.exists()
+    assert thumbnails.stats()["entries"] == 2
+    assert thumbnails.total_bytes <= thumbnails.max_bytes
+
+
+@pytest.mark.asyncio
+async def test_failed_marker_expires(thumbnails):
+    """
+    A source that failed to render is retried once its marker is older than the TTL
+    """
+    url = "/static/uploads/screenshots/notes.png"
+    assert await thumbnails.get(url, "thumb") is None
+    marker = next(thumbnails.root.glob(f"*/*/{thumbnail_service.FAILED_MARKER}"))
+    expired = time.time() - thumbnail_service.FAILED_MARKER_TTL_SECONDS - 60
+    os.utime(marker, (expired, expired))
+
+    assert await thumbnails.get(url, "thumb") is None
+    # 重新尝试渲染后标记被刷新
+    assert marker.stat().st_mtime > expired + 60
+
+    # 重启时清理过期的失败标记
+    os.utime(marker, (expired, expired))
+    restarted = ThumbnailService(str(thumbnails.root), workers=1, max_bytes=1024 * 1024)
+    restarted._ensure_loaded()
+    assert not marker.parent.exists()
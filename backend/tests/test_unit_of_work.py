@@ -0,0 +1,93 @@
+"""
+Test unit of work transactions
+"""
+import pytest
+from sqlalchemy import select
+
+from app.core.database import AsyncSessionLocal, unit_of_work
+from app.models.account import Account
+from app.models.task import Task
+from app.repositories.account_repository import AccountRepository
+
+
+def _account(name: str) -> dict:
+    return {
+        "shadow_bot_account": name,
+        "host_ip": "192.168.1.1",
+        "port": 8000,
+        "status": "pending",
+        "task_control": f"{name}-192.168.1.1:8000",
+    }
+
+
+async def _exists(name: str) -> bool:
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(Account).where(Account.shadow_bot_account == name)
+        )
+        return result.scalar_one_or_none() is not None
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_commits_once(db_session):
+    """
+    Writes inside a unit of work become visible only after the block exits
+    """
+    repo = AccountRepository(db_session)
+
+    async with unit_of_work(db_session):
+        account = await repo.create(_account("uow_commit"))
+        await repo.update(account.id, {"status": "running"})
+        assert not await _exists("uow_commit")
+
+    assert await _exists("uow_commit")
+    updated = await repo.get(account.id)
+    assert updated.status == "running"
+
+
+@pytest.mark.asyncio
+async def test_unit_of_work_rolls_back_on_error(db_session):
+    """
+    An exception inside the block discards every write, including nested blocks
+    """
+    repo = AccountRepository(db_session)
+
+    with pytest.raises(RuntimeError):
+        async with unit_of_work(db_session):
+            await repo.create(_account("uow_rollback_a"))
+            async with unit_of_work(db_session):
+                await repo.create(_account("uow_rollback_b"))
+            raise RuntimeError("boom")
+
+    assert not await _exists("uow_rollback_a")
+    assert not await _exists("uow_rollback_b")
+
+
+@pytest.mark.asyncio
+async def test_failed_task_count_sync_rolls_back_task_creation(db_session, monkeypatch):
+    """
+    A failing step inside a service operation discards the writes before it
+    """
+    from app.schemas.task import TaskCreate
+    from app.services.task_service import TaskService
+
+    service = TaskService(db_session)
+
+    async def fail(*args, **kwargs):
+        raise RuntimeError("sync failed")
+
+    monkeypatch.setattr(service.account_repo, "update_by_shadow_bot_account", fail)
+
+    with pytest.raises(RuntimeError):
+        await service.create_task(TaskCreate(
+            task_name="uow_task_sync",
+            shadow_bot_account="uow_task_sync_account",
+            host_ip="192.168.1.1",
+            app_name="uow_task_sync_app",
+        ))
+
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(Task).where(Task.task_name == "uow_task_sync")
+        )
+        assert result.scalar_one_or_none() is None
@@ -0,0 +1,102 @@
+"""
+Test pre-signed artifact uploads
+"""
+from urllib.parse import urlsplit
+
+import pytest
+
+from app.api.v1 import resources
+from app.services import storage_service
+
+
+@pytest.fixture
+def static_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(resources, "STATIC_ROOT", tmp_path)
+    return tmp_path
+
+
+async def _request_upload_urls(client, files):
+    response = await client.post("/api/v1/webhook/upload-urls", json={
+        "shadow_bot_account": "upload_bot",
+        "app_name": "upload_app",
+        "files": files,
+    })
+    assert response.status_code == 200
+    return response.json()
+
+
+@pytest.mark.asyncio
+async def test_local_presigned_upload_flow(client, static_dir):
+    """
+    Robots PUT to the signed URL and report only the object key
+    """
+    issued = await _request_upload_urls(client, [
+        {"kind": "screenshot", "filename": "step.png", "content_type": "image/png"},
+        {"kind": "log", "filename": "run.log", "content_type": "text/plain"},
+    ])
+    screenshot, log = issued["uploads"]
+
+    for item, body in ((screenshot, b"\x89PNG"), (log, "执行完成\n".encode())):
+        url = urlsplit(item["upload_url"])
+        response = await client.put(f"{url.path}?{url.query}", content=body, headers=item["headers"])
+        assert response.status_code == 200
+    assert (static_dir / "uploads" / log["object_key"]).read_bytes() == "执行完成\n".encode()
+
+    response = await client.post("/api/v1/webhook/execution-complete", json={
+        "shadow_bot_account": "upload_bot",
+        "app_name": "upload_app",
+        "status": "completed",
+        "start_time": "2026-01-21 10:00:00",
+        "end_time": "2026-01-21 10:01:00",
+        "duration_seconds": 60,
+        "screenshot_key": screenshot["object_key"],
+        "log_key": log["object_key"],
+    })
+    assert response.status_code == 200
+    assert response.json()["screenshot_url"] == f"/static/uploads/{screenshot['object_key']}"
+    assert response.json()["log_url"] == log["url"]
+
+
+@pytest.mark.asyncio
+async def test_local_upload_rejects_bad_signature(client, static_dir):
+    """
+    A tampered signature, a malformed Content-Length or a key outside the issued layout is refused
+    """
+    issued = await _request_upload_urls(client, [{"kind": "log", "filename": "run.log"}])
+    url = urlsplit(issued["uploads"][0]["upload_url"])
+
+    response = await client.put(f"{url.path}?{url.query.replace('signature=', 'signature=0')}", content=b"x")
+    assert response.status_code == 403
+
+    response = await client.put(f"{url.path}?{url.query}", content=b"x", headers={"Content-Length": "1x"})
+    assert response.status_code == 400
+    assert response.json()["error"]["message"]["code"] == "INVALID_CONTENT_LENGTH"
+
+    response = await client.post("/api/v1/webhook/execution-complete", json={
+        "shadow_bot_account": "upload_bot",
+        "app_name": "upload_app",
+        "status": "completed",
+        "start_time": "2026-01-21 10:00:00",
+        "end_time": "2026-01-21 10:01:00",
+        "duration_seconds": 60,
+        "log_key": "../../etc/passwd",
+    })
+    assert response.status_code == 422
+
+
+def test_oss_presigned_put(monkeypatch):
+    """
+    With OSS configured the URL is an OSS signature (signed locally, no request)
+    """
+    monkeypatch.setattr(storage_service.settings, "OSS_ACCESS_KEY_ID", "test-id")
+    monkeypatch.setattr(storage_service.settings, "OSS_ACCESS_KEY_SECRET", "test-secret")
+    monkeypatch.setattr(storage_service, "_bucket", None)
+
+    key = "screenshots/20260121/" + "0" * 32 + "/step.png"
+    signed = storage_service.presign_put(key, "image/png", 900, "http://unused")
+
+    url = urlsplit(signed["upload_url"])
+    assert url.netloc == f"{storage_service.settings.OSS_BUCKET_NAME}.{storage_service.settings.OSS_ENDPOINT}"
+    assert url.path == f"/{key}"
+    assert "Signature=" in url.query and "Expires=" in url.query
+    assert signed["headers"] == {"Content-Type": "image/png"}
@@ -7,14 +7,27 @@
     python oss_upload.py /path/to/file.txt
     python oss_upload.py /path/to/file.txt --folder logs
     python oss_upload.py /path/to/file.txt --folder screenshots --rename myfile.png
+
+批量模式（目录或通配符，多线程并发上传，stdout 输出 JSON 清单）:
+    python oss_upload.py /path/to/screenshots --batch --folder screenshots
+    python oss_upload.py "/path/to/run/*.png" --batch --folder screenshots --manifest manifest.json
+
+批量上传中断后重新执行同一命令即可续传（文件未变化时 object key 不变）；
+文件有增减时加上开始时打印的 --batch-id 保持原来的 key。
 """
 
 import os
+import re
 import sys
 import argparse
+import glob
+import hashlib
+import json
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
 
 try:
     import oss2
@@ -30,6 +43,17 @@ OSS_ACCESS_KEY_SECRET = os.getenv("OSS_ACCESS_KEY_SECRET", "")
 OSS_BUCKET_NAME = "rpa-workbench"
 OSS_ENDPOINT = "oss-cn-shenzhen.aliyuncs.com"
 
+# ==================== 批量上传配置 ====================
+# 并发上传线程数
+BATCH_WORKERS = 16
+# 超过该大小的文件使用断点续传（分片 + checkpoint）
+RESUMABLE_THRESHOLD = 10 * 1024 * 1024  # 10 MB
+RESUMABLE_PART_SIZE = 5 * 1024 * 1024  # 5 MB
+# 断点续传 checkpoint 目录（中断后重新执行同一命令即可续传）
+CHECKPOINT_DIR = os.path.join(Path.home(), ".oss_upload_checkpoints")
+# 批次 ID 格式：<yyyymmdd>/<32 位十六进制>，与 execution-complete 接受的 key 目录一致
+BATCH_ID_PATTERN = re.compile(r"^(\d{8})/([0-9a-f]{32})$")
+
 
 class OSSUploader:
     """OSS 上传工具类"""
@@ -133,6 +157,97 @@ class OSSUploader:
 
         return url
 
+    def put_file(self, oss_key: str, local_path: Path) -> None:
+        """
+        上传单个文件：小文件一次 PUT，大文件断点续传
+
+        Args:
+            oss_key: OSS 对象 key
+            local_path: 本地文件路径
+        """
+        if local_path.stat().st_size >= RESUMABLE_THRESHOLD:
+            oss2.resumable_upload(
+                self.bucket,
+                oss_key,
+                str(local_path),
+                store=oss2.ResumableStore(root=CHECKPOINT_DIR),
+                multipart_threshold=RESUMABLE_THRESHOLD,
+                part_size=RESUMABLE_PART_SIZE,
+                num_threads=4,
+            )
+        else:
+            self.bucket.put_object_from_file(oss_key, str(local_path))
+
+    def upload_batch(
+        self,
+        local_paths: List[Path],
+        folder: str = "uploads",
+        workers: int = BATCH_WORKERS,
+        batch_id: Optional[str] = None,
+    ) -> Dict:
+        """
+        并发上传一批文件
+
+        每批使用独立目录（{folder}/{yyyymmdd}/{id}/{文件名}），key 不会与
+        已有文件冲突，因此无需逐个检查是否存在。未指定 batch_id 时由文件
+        列表推导（见 batch_id_for），中断后重新上传同一批文件得到相同的
+        key，大文件从 checkpoint 续传。
+        单个文件失败不影响其它文件，结果记录在清单中。
+
+        Args:
+            local_paths: 本地文件列表
+            folder: OSS 文件夹名称
+            workers: 并发线程数
+            batch_id: 批次 ID（<yyyymmdd>/<32 位十六进制>），续传时传入上次的值
+
+        Returns:
+            上传清单（可直接用于 webhook 回调）
+        """
+        date, batch_hex = parse_batch_id(batch_id or batch_id_for(local_paths, folder))
+        batch_id = f"{date}/{batch_hex}"
+        prefix = f"{folder}/{batch_id}"
+
+        # 同名文件（来自不同子目录）加序号
+        keys = []
+        used = set()
+        for local_path in local_paths:
+            name, n = local_path.name, 1
+            while name in used:
+                name = f"{local_path.stem}_{n}{local_path.suffix}"
+                n += 1
+            used.add(name)
+            keys.append(f"{prefix}/{name}")
+
+        def upload_one(item) -> Dict:
+            oss_key, local_path = item
+            entry = {
+                "path": str(local_path),
+                "object_key": oss_key,
+                "url": self.get_url(oss_key),
+                "size": local_path.stat().st_size,
+            }
+            try:
+                self.put_file(oss_key, local_path)
+                entry["ok"] = True
+            except Exception as e:
+                entry["ok"] = False
+                entry["error"] = str(e)
+            print(f"{'上传成功' if entry['ok'] else '上传失败'}: {local_path} -> oss://{oss_key}", file=sys.stderr)
+            return entry
+
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            files = list(executor.map(upload_one, zip(keys, local_paths)))
+
+        succeeded = sum(1 for entry in files if entry["ok"])
+        return {
+            "batch_id": batch_id,
+            "folder": folder,
+            "prefix": prefix,
+            "succeeded": succeeded,
+            "failed": len(files) - succeeded,
+            "files": files,
+        }
+
     def _exists(self, oss_key: str) -> bool:
         """检查 OSS 文件是否存在"""
         try:
@@ -146,6 +261,59 @@ class OSSUploader:
         return f"https://{self.bucket_name}.{self.endpoint}/{oss_key}"
 
 
+def batch_id_for(local_paths: List[Path], folder: str) -> str:
+    """
+    由文件列表推导批次 ID：路径、大小、修改时间都不变时结果相同
+
+    日期取最新文件的修改日期，跨天重新执行也不会改变 key。
+
+    Args:
+        local_paths: 本地文件列表
+        folder: OSS 文件夹名称
+
+    Returns:
+        批次 ID（<yyyymmdd>/<32 位十六进制>）
+    """
+    digest = hashlib.sha256(folder.encode("utf-8"))
+    latest = 0.0
+    for local_path in local_paths:
+        stat = local_path.stat()
+        latest = max(latest, stat.st_mtime)
+        digest.update(f"\0{local_path.resolve()}\0{stat.st_size}\0{stat.st_mtime_ns}".encode("utf-8"))
+    return f"{datetime.fromtimestamp(latest).strftime('%Y%m%d')}/{digest.hexdigest()[:32]}"
+
+
+def parse_batch_id(batch_id: str) -> Tuple[str, str]:
+    """
+    校验并拆分批次 ID
+
+    Returns:
+        (yyyymmdd, 32 位十六进制)
+    """
+    match = BATCH_ID_PATTERN.match(batch_id)
+    if not match:
+        raise ValueError(f"批次 ID 格式错误（应为 yyyymmdd/32 位十六进制）: {batch_id}")
+    return match.group(1), match.group(2)
+
+
+def collect_files(pattern: str) -> List[Path]:
+    """
+    展开批量上传的路径：目录（递归）或通配符
+
+    Args:
+        pattern: 目录路径或通配符（如 /tmp/run/*.png）
+
+    Returns:
+        排序后的文件列表
+    """
+    path = Path(pattern)
+    if path.is_dir():
+        candidates: Iterable[Path] = path.rglob("*")
+    else:
+        candidates = (Path(p) for p in glob.glob(pattern, recursive=True))
+    return sorted(p for p in candidates if p.is_file())
+
+
 def main():
     """命令行入口"""
     parser = argparse.ArgumentParser(
@@ -162,6 +330,12 @@ def main():
     # 自定义文件名
     python oss_upload.py /tmp/data.json --rename backup.json
 
+    # 批量上传目录（输出 JSON 清单，key 可直接作为 webhook 的 screenshot_key / log_key）
+    python oss_upload.py /tmp/run_screenshots --batch --folder screenshots
+
+    # 目录内容有变化后续传上一次的批次（批次 ID 在开始上传时打印）
+    python oss_upload.py /tmp/run_screenshots --batch --folder screenshots --batch-id 20260121/0123...
+
 环境变量:
     OSS_ACCESS_KEY_ID     - 阿里云 AccessKey ID
     OSS_ACCESS_KEY_SECRET - 阿里云 AccessKey Secret
@@ -170,7 +344,7 @@ def main():
         """,
     )
 
-    parser.add_argument("local_path", help="本地文件路径")
+    parser.add_argument("local_path", help="本地文件路径（批量模式下为目录或通配符）")
     parser.add_argument(
         "--folder", "-f",
         default="uploads",
@@ -202,6 +376,28 @@ def main():
         help="OSS 节点地址"
     )
 
+    parser.add_argument(
+        "--batch", "-b",
+        action="store_true",
+        help="批量模式：上传目录或通配符匹配的所有文件"
+    )
+    parser.add_argument(
+        "--workers", "-w",
+        type=int,
+        default=BATCH_WORKERS,
+        help=f"批量模式并发线程数 (默认: {BATCH_WORKERS})"
+    )
+    parser.add_argument(
+        "--batch-id",
+        default=None,
+        help="批量模式批次 ID（yyyymmdd/32 位十六进制），续传上一次的批次时使用"
+    )
+    parser.add_argument(
+        "--manifest", "-m",
+        default=None,
+        help="批量模式清单另存为 JSON 文件（默认只输出到 stdout）"
+    )
+
     args = parser.parse_args()
 
     try:
@@ -212,6 +408,23 @@ def main():
             endpoint=args.endpoint,
         )
 
+        if args.batch:
+            files = collect_files(args.local_path)
+            if not files:
+                raise FileNotFoundError(f"没有匹配的文件: {args.local_path}")
+
+            batch_id = args.batch_id or batch_id_for(files, args.folder)
+            parse_batch_id(batch_id)
+            print(f"批次 ID: {batch_id}（中断后重新执行，或加 --batch-id {batch_id} 续传）", file=sys.stderr)
+            manifest = uploader.upload_batch(
+                files, folder=args.folder, workers=args.workers, batch_id=batch_id
+            )
+            output = json.dumps(manifest, ensure_ascii=False, indent=2)
+            if args.manifest:
+                Path(args.manifest).write_text(output, encoding="utf-8")
+            print(output)
+            return 0 if manifest["failed"] == 0 else 1
+
         url = uploader.upload(
             local_path=args.local_path,
             folder=args.folder,
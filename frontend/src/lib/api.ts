@@ -18,6 +18,7 @@ interface ApiResponse<T> {
   page?: number;
   page_size?: number;
   total_pages?: number;
+  total_capped?: boolean;  // total 达到计数上限（实际更多，显示为 "10000+"）
   [key: string]: any;
 }
 
@@ -47,7 +48,7 @@ export interface Task {
   config_file: boolean;
   config_info: boolean;
   config_file_path?: string | null;  // 配置文件 OSS URL
-  config_json?: string | null;        // 配置信息 JSON
+  config_json?: string | null;        // 配置信息 JSON（仅详情接口返回）
   trigger_time?: string | null;
   remark?: string | null;             // 任务备注
   account_port?: number;  // 从关联账号获取的端口
@@ -69,7 +70,8 @@ export interface ExecutionLog {
   screenshot: boolean;
   // 资源路径（本地或云端 URL）
   screenshot_path?: string | null;  // 截图文件路径/URL
-  log_content?: string | null;      // 详细日志内容（本地）或日志 URL（云端）
+  log_content?: string | null;      // 详细日志内容（本地）或日志 URL（云端），仅详情接口返回
+  has_log_content?: boolean;        // 列表接口：是否有 log_content
   created_at: string;
 }
 
@@ -105,6 +107,16 @@ export function getDownloadUrl(path?: string | null): string {
   return path.startsWith('/') ? `${baseUrl}${path}` : path;
 }
 
+// 获取图片缩略图 URL（本地路径和云端 URL 都经后端生成 WebP/AVIF 缩略图）
+// size: thumb(160px) / small(480px) / medium(1280px)
+export function getThumbnailUrl(
+  path?: string | null,
+  size: 'thumb' | 'small' | 'medium' = 'thumb',
+): string {
+  if (!path) return '';
+  return `${API_BASE_URL}/resources/proxy?url=${encodeURIComponent(path)}&size=${size}`;
+}
+
 // 兼容旧函数名
 export const getScreenshotUrl = getResourceUrl;
 
@@ -403,6 +415,7 @@ export const logsApi = {
     page_size?: number;
     sort_by?: string;      // 排序字段: start_time, created_at, duration
     order?: "asc" | "desc"; // 排序方向
+    exact_count?: boolean;  // false: 总数最多计到上限，大表分页更快
   }): Promise<ApiResponse<ExecutionLog>> {
     const searchParams = new URLSearchParams();
     if (params?.search) searchParams.append('search', params.search);
@@ -411,11 +424,17 @@ export const logsApi = {
     if (params?.page_size) searchParams.append('page_size', params.page_size.toString());
     if (params?.sort_by) searchParams.append('sort_by', params.sort_by);
     if (params?.order) searchParams.append('order', params.order);
+    if (params?.exact_count === false) searchParams.append('exact_count', 'false');
 
     const query = searchParams.toString() ? `?${searchParams.toString()}` : '';
     return request<ApiResponse<ExecutionLog>>(`/logs${query}`);
   },
 
+  // 获取单条日志（包含 log_content）
+  async getLog(id: string): Promise<ExecutionLog> {
+    return request<ExecutionLog>(`/logs/${id}`);
+  },
+
   // 导出日志
   async exportLogs(): Promise<Blob> {
     const response = await fetch(`${API_BASE_URL}/logs/export`);
@@ -14,7 +14,7 @@ import {
   Image as ImageIcon,
 } from "lucide-react";
 import { toast } from "sonner";
-import { logsApi, ExecutionLog, ApiError, getResourceUrl, getDownloadUrl } from "../lib/api";
+import { logsApi, ExecutionLog, ApiError, getResourceUrl, getDownloadUrl, getThumbnailUrl } from "../lib/api";
 import { useSSE, SSEEvent } from "../hooks/useSSE";
 
 export default function ExecutionLogs() {
@@ -28,6 +28,7 @@ export default function ExecutionLogs() {
   const [currentPage, setCurrentPage] = useState(1);
   const [pageSize, setPageSize] = useState(25);
   const [total, setTotal] = useState(0);
+  const [totalCapped, setTotalCapped] = useState(false);
   const [totalPages, setTotalPages] = useState(0);
 
   // 排序状态
@@ -76,9 +77,11 @@ export default function ExecutionLogs() {
         page_size: pageSizeRef.current,
         sort_by: sortByRef.current,
         order: sortOrderRef.current,
+        exact_count: false,
       });
       setLogs(response.items || []);
       setTotal(response.total || 0);
+      setTotalCapped(response.total_capped || false);
       setTotalPages(response.total_pages || 0);
     } catch (error) {
       console.error('Failed to load logs:', error);
@@ -103,9 +106,11 @@ export default function ExecutionLogs() {
         page_size: pageSize,
         sort_by: sortByRef.current,
         order: sortOrderRef.current,
+        exact_count: false,
       });
       setLogs(response.items || []);
       setTotal(response.total || 0);
+      setTotalCapped(response.total_capped || false);
       setTotalPages(response.total_pages || 0);
       // 同时更新状态
       setCurrentPage(page);
@@ -329,10 +334,24 @@ export default function ExecutionLogs() {
     setLogText("");
     setLogLoading(true);
 
-    if (log.log_content) {
+    // 列表接口不返回 log_content，打开时按需获取详情
+    let logContent = log.log_content;
+    if (!logContent && log.has_log_content) {
+      try {
+        const detail = await logsApi.getLog(log.id);
+        logContent = detail.log_content;
+        setSelectedLog(detail);
+      } catch {
+        setLogText("加载日志内容失败");
+        setLogLoading(false);
+        return;
+      }
+    }
+
+    if (logContent) {
       try {
         // 通过后端代理加载日志内容（浏览器 HTTP 缓存 15 天）
-        const proxyUrl = getResourceUrl(log.log_content);
+        const proxyUrl = getResourceUrl(logContent);
         const response = await fetch(proxyUrl);
         const text = await response.text();
         setLogText(text);
@@ -578,7 +597,7 @@ export default function ExecutionLogs() {
                         </span>
                       </td>
                       <td className="px-6 py-4 whitespace-nowrap">
-                        {log.log_info || log.log_content ? (
+                        {log.log_info || log.has_log_content || log.log_content ? (
                           <button
                             onClick={() => openLogModal(log)}
                             className="text-indigo-600 dark:text-indigo-400 hover:text-indigo-800 dark:hover:text-indigo-300"
@@ -601,8 +620,9 @@ export default function ExecutionLogs() {
                           >
                             <div className="w-10 h-10 rounded-lg overflow-hidden bg-slate-100 dark:bg-slate-700 border border-slate-200 dark:border-slate-600">
                               <img
-                                src={getResourceUrl(log.screenshot_path)}
+                                src={getThumbnailUrl(log.screenshot_path)}
                                 alt="截图"
+                                loading="lazy"
                                 className="w-full h-full object-cover"
                                 onError={(e) => {
                                   const target = e.target as HTMLImageElement;
@@ -647,7 +667,7 @@ export default function ExecutionLogs() {
 
               {/* 分页信息 */}
               <div className="text-sm text-slate-500 dark:text-slate-400">
-                共 <span className="font-medium text-slate-900 dark:text-white">{total}</span> 条记录，
+                共 <span className="font-medium text-slate-900 dark:text-white">{total}{totalCapped ? "+" : ""}</span> 条记录，
                 第 <span className="font-medium text-slate-900 dark:text-white">{currentPage}</span>/<span className="font-medium text-slate-900 dark:text-white">{totalPages}</span> 页
               </div>
 
@@ -440,7 +440,15 @@ export default function TaskControl() {
     }
   };
 
-  const openEditModal = (task: Task) => {
+  const openEditModal = async (task: Task) => {
+    // 列表接口不返回 config_json，编辑时获取任务详情
+    try {
+      task = await tasksApi.getTask(task.id);
+    } catch (error) {
+      console.error('Failed to load task detail:', error);
+      toast.error('加载任务详情失败');
+      return;
+    }
     setSelectedTask(task);
     setFormData({
       task_name: task.task_name,